@@ -3,6 +3,8 @@ Composant Liste des Vidéos
 Tableau affichant la liste des vidéos avec options de renommage et suppression.
 Remplace l'ancien Explorateur_dossier.py pour la vue de Tri.
 """
+import os
+
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, 
     QPushButton, QHeaderView
@@ -18,9 +20,11 @@ class VideoList(QWidget):
     video_selected = pyqtSignal(str)  # Émet le nom de la vidéo
     rename_requested = pyqtSignal()   # Demande de renommage
     delete_requested = pyqtSignal()   # Demande de suppression
+    storyboards_requested = pyqtSignal()  # Storyboards de toute la campagne
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._lignes_par_chemin = {} # Chemin normalisé -> ligne du tableau
         self.init_ui()
         
     def init_ui(self):
@@ -93,6 +97,14 @@ class VideoList(QWidget):
         self.btn_delete.setStyleSheet(self.get_button_style())
         self.btn_delete.clicked.connect(self.delete_requested.emit)
         buttons_layout.addWidget(self.btn_delete)
+
+        self.btn_storyboards = QPushButton("Storyboards")
+        self.btn_storyboards.setFixedHeight(32)
+        self.btn_storyboards.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_storyboards.setToolTip("Générer les storyboards de toutes les vidéos de la campagne")
+        self.btn_storyboards.setStyleSheet(self.get_button_style())
+        self.btn_storyboards.clicked.connect(self.storyboards_requested.emit)
+        buttons_layout.addWidget(self.btn_storyboards)
         
         layout.addLayout(buttons_layout)
         self.setLayout(layout)
@@ -118,16 +130,35 @@ class VideoList(QWidget):
     def update_video_list(self, videos):
         """Met à jour la liste des vidéos affichées."""
         self.table.setRowCount(len(videos))
+        self._lignes_par_chemin = {}
         self.table.blockSignals(True) # Éviter de déclencher selectionChanged pendant le remplissage
         
         for row, video in enumerate(videos):
-            self.table.setItem(row, 0, QTableWidgetItem(video.nom))
+            item_nom = QTableWidgetItem(video.nom)
+            # Chemin de la vidéo : identifie la ligne (deux dossiers peuvent avoir le même nom de vidéo)
+            cle = self._cle_chemin(video.chemin)
+            item_nom.setData(Qt.ItemDataRole.UserRole, cle)
+            self._lignes_par_chemin[cle] = row
+            self.table.setItem(row, 0, item_nom)
             self.table.setItem(row, 1, QTableWidgetItem(video.taille))
             self.table.setItem(row, 2, QTableWidgetItem(video.duree))
             self.table.setItem(row, 3, QTableWidgetItem(video.date))
             
         self.table.blockSignals(False)
 
+    def update_video_duration(self, video_path, duree):
+        """Met à jour la durée d'une vidéo déjà affichée (lue en arrière-plan), retrouvée par son chemin."""
+        cle = self._cle_chemin(video_path)
+        row = self._lignes_par_chemin.get(cle)
+        item = self.table.item(row, 0) if row is not None else None
+        # La ligne est revérifiée : la liste a pu être réaffichée depuis
+        if item is not None and item.data(Qt.ItemDataRole.UserRole) == cle:
+            self.table.setItem(row, 2, QTableWidgetItem(duree))
+
+    @staticmethod
+    def _cle_chemin(chemin):
+        return os.path.normcase(os.path.abspath(str(chemin))) if chemin else ""
+
     def select_video(self, video_name):
         """Sélectionne une vidéo par son nom."""
         items = self.table.findItems(video_name, Qt.MatchFlag.MatchExactly)
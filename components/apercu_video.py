@@ -3,19 +3,20 @@ import os
 import subprocess
 import time
 from pathlib import Path
-import cv2
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QFrame, QGridLayout, QSizePolicy
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread, QTimer
 from PyQt6.QtGui import QPixmap, QImage
 
+from kosmos_processing.decoders import open_decoder
+
 # ═══════════════════════════════════════════════════════════════
 # WIDGET MINIATURE (Extrait de tri_view.py)
 # ═══════════════════════════════════════════════════════════════
 
 class AnimatedThumbnailLabel(QLabel):
-    """QLabel personnalisé qui gère l'affichage d'un Pixmap statique et le remplace par une lecture OpenCV lors du survol"""
+    """QLabel personnalisé qui gère l'affichage d'un Pixmap statique et le remplace par une lecture vidéo lors du survol"""
     def __init__(self, parent=None):
         super().__init__(parent)
         self.static_pixmap = None
@@ -59,13 +60,21 @@ class AnimatedThumbnailLabel(QLabel):
         """Survol : démarre la lecture OpenCV"""
         if self.video_path and not self.playback_timer.isActive():
             try:
-                self.cap = cv2.VideoCapture(self.video_path)
+                # Frames déjà réduites à la taille du label et en RGB, une sur deux (lecture x2).
+                # Backend OpenCV : l'ouverture se fait dans le thread GUI, sans ffprobe ni ffmpeg
+                self.cap = open_decoder(
+                    self.video_path,
+                    backend='opencv',
+                    max_side=max(self.width(), self.height(), 160),
+                    pix_fmt='rgb24',
+                    stride=2
+                )
                 if not self.cap.isOpened():
                     print(f"Erreur ouverture vidéo: {self.video_path}")
                     self.cap = None
                     return
                 
-                self.cap.set(cv2.CAP_PROP_POS_MSEC, self.seek_time_sec * 1000)
+                self.cap.seek_ms(self.seek_time_sec * 1000)
                 self.playback_start_time = time.time()
                 self.playback_timer.start(33) 
             except Exception as e:
@@ -101,18 +110,12 @@ class AnimatedThumbnailLabel(QLabel):
             self.leaveEvent(None) 
             return
 
-        ret, _ = self.cap.read() 
-        if not ret:
-            self.leaveEvent(None) 
-            return
-        
-        ret, frame = self.cap.read() 
+        ret, rgb_image = self.cap.read()
         if not ret:
             self.leaveEvent(None) 
             return
 
         try:
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             h, w, ch = rgb_image.shape
             bytes_per_line = ch * w
             
@@ -268,6 +271,16 @@ class ApercuVideos(QWidget):
         thumbnails_widget.setLayout(thumbnails_layout)
         layout.addWidget(thumbnails_widget, 1)
 
+        # Storyboard de la vidéo (image pré-calculée, aucune lecture de la vidéo)
+        self.storyboard_label = QLabel("Storyboard en préparation...")
+        self.storyboard_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.storyboard_label.setStyleSheet("background-color: black; border: none; border-top: 1px solid #444; color: #888; font-size: 10px;")
+        self.storyboard_label.setMinimumHeight(60)
+        self.storyboard_label.setMaximumHeight(180)
+        self.storyboard_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Preferred)
+        self.storyboard_pixmap = None
+        layout.addWidget(self.storyboard_label)
+
     def charger_previews(self, video_path, seek_info):
         """Lance l'extraction et l'affichage des miniatures pour une vidéo donnée"""
         # Arrêter le thread précédent s'il existe
@@ -297,6 +310,28 @@ class ApercuVideos(QWidget):
         self.preview_extractor.thumbnail_ready.connect(self.afficher_miniature)
         self.preview_extractor.start()
 
+    def afficher_storyboard(self, chemin):
+        """Affiche la planche storyboard (fichier image) ou un message d'attente si chemin est None."""
+        pixmap = QPixmap(chemin) if chemin else QPixmap()
+        self.storyboard_pixmap = None if pixmap.isNull() else pixmap
+        if self.storyboard_pixmap is None:
+            self.storyboard_label.setPixmap(QPixmap())
+            self.storyboard_label.setText("Storyboard en préparation...")
+            return
+        self.storyboard_label.setText("")
+        self._ajuster_storyboard()
+
+    def _ajuster_storyboard(self):
+        if self.storyboard_pixmap is not None:
+            self.storyboard_label.setPixmap(self.storyboard_pixmap.scaled(
+                self.storyboard_label.width(), self.storyboard_label.maximumHeight(),
+                Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+            ))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._ajuster_storyboard()
+
     def afficher_miniature(self, index, pixmap):
         """Slot appelé quand une miniature est prête"""
         if index < len(self.thumbnails):
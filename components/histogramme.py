@@ -3,14 +3,23 @@ Composant Histogramme
 Affiche l'histogramme RGB avec informations de la caméra
 """
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
-from PyQt6.QtCore import Qt, QRect, QPoint
-from PyQt6.QtGui import QPainter, QColor, QPen, QPolygon
+from PyQt6.QtCore import Qt, QRect, QPoint, QPointF
+from PyQt6.QtGui import QPainter, QColor, QPen, QPolygon, QPainterPath
 import random
+import numpy as np
 
 
 class HistogramWidget(QWidget):
     """Widget personnalisé pour dessiner l'histogramme RGB"""
     
+    # Séries dessinées (densité en fond, puis RVB) : (attribut, couleur, alpha remplissage, alpha trait)
+    SERIES = (
+        ('data_density', "#FFFFFF", 40, 120),
+        ('data_r', "#EF4444", 70, 180),
+        ('data_g', "#22C55E", 70, 180),
+        ('data_b', "#3B82F6", 70, 180),
+    )
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumHeight(150) # Réduit de 200 à 150
@@ -18,6 +27,10 @@ class HistogramWidget(QWidget):
         self.data_g = self.generate_sample_data()
         self.data_b = self.generate_sample_data()
         self.data_density = self._compute_density_from_channels()
+
+        # Chemins pré-calculés, reconstruits uniquement si les données ou la taille changent
+        self._cached_paths = None
+        self._cached_rect = None
         
     def generate_sample_data(self, points=256):
         """Génère des données d'exemple pour l'histogramme"""
@@ -28,28 +41,66 @@ class HistogramWidget(QWidget):
             if 60 < i < 100 or 150 < i < 200:
                 value += random.randint(0, 80)
             data.append(value)
-        return data
+        return np.asarray(data, dtype=np.float32)
 
     def _compute_density_from_channels(self):
         """Moyenne simple des trois canaux pour afficher la densité."""
-        if not (self.data_r and self.data_g and self.data_b):
+        if any(d is None or len(d) == 0 for d in (self.data_r, self.data_g, self.data_b)):
             return self.generate_sample_data()
-        return [int((r + g + b) / 3) for r, g, b in zip(self.data_r, self.data_g, self.data_b)]
+        return (np.asarray(self.data_r, dtype=np.float32)
+                + np.asarray(self.data_g, dtype=np.float32)
+                + np.asarray(self.data_b, dtype=np.float32)) / 3.0
         
     def update_data(self, data_r=None, data_g=None, data_b=None, data_density=None):
-        """Met à jour les données de l'histogramme"""
+        """Met à jour les données de l'histogramme (listes ou tableaux NumPy)."""
         if data_r is not None:
-            self.data_r = data_r
+            self.data_r = np.asarray(data_r, dtype=np.float32)
         if data_g is not None:
-            self.data_g = data_g
+            self.data_g = np.asarray(data_g, dtype=np.float32)
         if data_b is not None:
-            self.data_b = data_b
+            self.data_b = np.asarray(data_b, dtype=np.float32)
         if data_density is not None:
-            self.data_density = data_density
+            self.data_density = np.asarray(data_density, dtype=np.float32)
         else:
             # Recalculer la densité si de nouvelles données de canaux sont fournies
             self.data_density = self._compute_density_from_channels()
+        self._cached_paths = None
         self.update()
+
+    def _build_path(self, data, graph_rect):
+        """Construit le contour en escalier (barres jointives) d'une série."""
+        path = QPainterPath()
+        data = np.asarray(data, dtype=np.float32)
+        if data.size == 0:
+            return path
+
+        max_value = float(data.max())
+        if max_value <= 0:
+            max_value = 1.0
+        left = graph_rect.left()
+        bottom = graph_rect.bottom()
+        bar_width = graph_rect.width() / data.size
+        heights = bottom - (data / max_value) * graph_rect.height()
+
+        path.moveTo(QPointF(left, bottom))
+        for i, y in enumerate(heights.tolist()):
+            x = left + i * bar_width
+            path.lineTo(QPointF(x, y))
+            path.lineTo(QPointF(x + bar_width, y))
+        path.lineTo(QPointF(left + data.size * bar_width, bottom))
+        path.closeSubpath()
+        return path
+
+    def _ensure_paths(self, graph_rect):
+        """Reconstruit les chemins si les données ou la zone de dessin ont changé."""
+        if self._cached_paths is not None and self._cached_rect == graph_rect:
+            return self._cached_paths
+        self._cached_paths = [
+            (self._build_path(getattr(self, attr), graph_rect), color, alpha_fill, alpha_line)
+            for attr, color, alpha_fill, alpha_line in self.SERIES
+        ]
+        self._cached_rect = QRect(graph_rect)
+        return self._cached_paths
         
     def paintEvent(self, event):
         """Dessine l'histogramme"""
@@ -124,39 +175,15 @@ class HistogramWidget(QWidget):
         y_mid = int(graph_rect.bottom() - 0.5 * graph_rect.height())
         painter.drawLine(graph_rect.left(), y_mid, graph_rect.right(), y_mid)
 
-        # Fonction pour dessiner des barres semi-transparentes
-        def draw_bars(data, color, alpha_fill=80, alpha_line=180):
-            if not data:
-                return
-            
-            step = max(1, graph_rect.width() / max(1, len(data)))
-            max_value = max(data) if data else 1
-
+        # Dessiner les séries à partir des chemins en cache (densité en fond, puis RVB)
+        for path, color, alpha_fill, alpha_line in self._ensure_paths(graph_rect):
             fill_color = QColor(color)
             fill_color.setAlpha(alpha_fill)
             pen_color = QColor(color)
             pen_color.setAlpha(alpha_line)
             painter.setPen(QPen(pen_color, 1))
             painter.setBrush(fill_color)
-
-            for i, value in enumerate(data):
-                # Ajustement pour rester dans graph_rect
-                if i >= len(data): break
-                
-                x = int(graph_rect.left() + i * (graph_rect.width() / len(data)))
-                bar_height = int((value / max_value) * graph_rect.height())
-                
-                # Largeur de barre ajustée pour ne pas dépasser
-                bar_width = max(1, int(graph_rect.width() / len(data)) + 1)
-                
-                bar_rect = QRect(x, graph_rect.bottom() - bar_height, bar_width, bar_height)
-                painter.drawRect(bar_rect)
-
-        # Dessiner les barres (densité en fond, puis RVB)
-        draw_bars(self.data_density, "#FFFFFF", alpha_fill=40, alpha_line=120)
-        draw_bars(self.data_r, "#EF4444", alpha_fill=70, alpha_line=180)      # Rouge
-        draw_bars(self.data_g, "#22C55E", alpha_fill=70, alpha_line=180)      # Vert
-        draw_bars(self.data_b, "#3B82F6", alpha_fill=70, alpha_line=180)      # Bleu
+            painter.drawPath(path)
         
         # Triangle rouge en haut à droite (indicateur clipping)
         triangle_size = 10
@@ -234,6 +261,7 @@ class Histogram(QWidget):
         self.histogram_widget.data_g = self.histogram_widget.generate_sample_data()
         self.histogram_widget.data_b = self.histogram_widget.generate_sample_data()
         self.histogram_widget.data_density = self.histogram_widget._compute_density_from_channels()
+        self.histogram_widget._cached_paths = None
         self.histogram_widget.update()
 
 
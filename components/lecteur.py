@@ -5,7 +5,7 @@ Utilise OpenCV dans un QThread pour l'affichage vidéo avec overlay personnalis
 """
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QStackedLayout,
                              QPushButton, QSlider, QFrame)
-from PyQt6.QtCore import Qt, pyqtSignal, QRect, QSize, QPoint, QThread
+from PyQt6.QtCore import Qt, pyqtSignal, QRect, QSize, QPoint, QThread, QTimer
 from PyQt6.QtGui import QColor, QPalette, QPainter, QPen, QPixmap, QIcon, QBrush, QCursor, QImage
 from pathlib import Path
 import sys
@@ -13,6 +13,22 @@ import time
 import cv2
 import numpy as np
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from kosmos_processing.algos_correction import compute_histograms
+from kosmos_processing.decoders import open_decoder
+from kosmos_processing.frame_cache import GopFrameCache
+from models.timeseries import TimeseriesData
+
+
+# Plus grand côté des frames gardées pour la navigation arrière : au-delà, l'écran
+# ne montre pas plus de détail et le cache tiendrait moins de frames
+FRAME_CACHE_MAX_SIDE = 1920
+
+# Calcul des histogrammes hors du thread GUI, limité à ~10 Hz.
+# Un seul worker partagé : une frame en attente remplace la précédente.
+HISTOGRAM_INTERVAL_MS = 100
+_histogram_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kosmos-histogram")
 
 
 class VideoThread(QThread):
@@ -34,6 +50,14 @@ class VideoThread(QThread):
         self.loop = False #Attribut pour la lecture en boucle
         self.speed = 1.0
         self._last_frame_time = 0
+        # Navigation arrière : sens de lecture, pas à pas et cache de blocs décodés
+        self.direction = 1
+        self.step_request = 0
+        # Rempli seulement par la navigation arrière (fill_block), vidé à la pause et au
+        # déchargement ; frames réduites à une taille d'affichage
+        self.frame_cache = GopFrameCache(max_side=FRAME_CACHE_MAX_SIDE)
+        self._cache_clear_requested = False
+        self._cap_needs_seek = False # La position de cap ne suit plus current_frame
         
     def stop(self):
         """Arrête proprement le thread."""
@@ -42,7 +66,7 @@ class VideoThread(QThread):
     def load_video(self, video_path):
         """
         Demande au thread de charger une nouvelle vidéo.
-        Ne manipule pas cv2.VideoCapture directement.
+        Ne manipule pas le décodeur directement.
         """
         self.video_path_to_load = video_path
         
@@ -52,8 +76,25 @@ class VideoThread(QThread):
         self._last_frame_time = time.time()
         
     def pause(self):
-        """Met en pause la lecture."""
+        """Met en pause la lecture et libère le cache de navigation arrière."""
+        self.is_paused = True
+        self._cache_clear_requested = True
+
+    def _drop_cache(self):
+        """Vide le cache de frames (dans le thread vidéo) en gardant la taille annoncée."""
+        self.frame_cache.clear()
+        if self.cap and self.cap.isOpened():
+            self.frame_cache.set_frame_size(self.cap.out_width, self.cap.out_height)
+
+    def set_direction(self, direction: int):
+        """Sens de lecture : 1 (avant) ou -1 (arrière)."""
+        self.direction = -1 if direction < 0 else 1
+        self._last_frame_time = time.time()
+
+    def step(self, delta: int):
+        """Avance (delta > 0) ou recule (delta < 0) de quelques frames, en pause."""
         self.is_paused = True
+        self.step_request += delta
         
     def seek(self, frame_number):
         """Aller à une frame spécifique."""
@@ -61,6 +102,22 @@ class VideoThread(QThread):
             target_frame = max(0, min(frame_number, self.total_frames - 1))
             self.seek_frame = target_frame
 
+    def _frame_at(self, index):
+        """
+        Frame d'index donné, depuis le cache ou en décodant vers l'avant le bloc
+        qui la contient (un seul seek pour tout le bloc).
+        """
+        frame = self.frame_cache.get(index)
+        if frame is None:
+            frame = self.frame_cache.fill_block(self.cap, index, self.total_frames)
+            self._cap_needs_seek = True
+        return frame
+
+    def _emit_frame(self, frame):
+        self.frame_ready.emit(frame)
+        position_ms = int((self.current_frame / self.fps) * 1000)
+        self.position_changed.emit(position_ms)
+
     def set_looping(self, loop: bool):
         """Active ou désactive la lecture en boucle."""
         self.loop = loop
@@ -77,12 +134,18 @@ class VideoThread(QThread):
             if self.video_path_to_load:
                 if self.cap:
                     self.cap.release()
-                self.cap = cv2.VideoCapture(str(self.video_path_to_load))
+                # Le lecteur a besoin de seeks précis à la frame : backend OpenCV
+                self.cap = open_decoder(self.video_path_to_load, backend='opencv')
                 
                 """Vérifier si la vidéo a été ouverte correctement"""
+                self.frame_cache.clear()
+                self.direction = 1
+                self.step_request = 0
+                self._cap_needs_seek = False
                 if self.cap.isOpened():
-                    self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                    self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 25
+                    self.total_frames = self.cap.frame_count
+                    self.fps = self.cap.fps or 25
+                    self.frame_cache.set_frame_size(self.cap.out_width, self.cap.out_height)
                     duration_ms = int((self.total_frames / self.fps) * 1000)
                     self.duration_changed.emit(duration_ms)
                     
@@ -99,6 +162,10 @@ class VideoThread(QThread):
                 self.video_path_to_load = None # Réinitialiser la demande
                 self._last_frame_time = time.time()
 
+            if self._cache_clear_requested:
+                self._cache_clear_requested = False
+                self._drop_cache()
+
             # --- LECTURE DE LA VIDÉO ---
             if not self.cap or not self.cap.isOpened():
                 self.msleep(100)
@@ -106,17 +173,57 @@ class VideoThread(QThread):
 
             # Gestion de la recherche
             if self.seek_frame != -1:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.seek_frame)
                 self.current_frame = self.seek_frame
                 self.seek_frame = -1
-                
-                ret, frame = self.cap.read()
-                if ret:
-                    self.frame_ready.emit(frame)
-                    position_ms = int((self.current_frame / self.fps) * 1000)
-                    self.position_changed.emit(position_ms)
+
+                frame = self.frame_cache.get(self.current_frame)
+                if frame is not None:
+                    # Déjà décodée (aller-retour autour d'un évènement) : pas de seek
+                    self._cap_needs_seek = True
+                else:
+                    self.cap.seek_frame(self.current_frame)
+                    self._cap_needs_seek = False
+                    ret, frame = self.cap.read()
+                    if not ret:
+                        frame = None
+                if frame is not None:
+                    self._emit_frame(frame)
                 self._last_frame_time = time.time()
 
+            # Pas à pas (avant/arrière) demandé en pause
+            if self.step_request:
+                target = max(0, min(self.current_frame + self.step_request, self.total_frames - 1))
+                self.step_request = 0
+                if target != self.current_frame:
+                    frame = self._frame_at(target)
+                    if frame is not None:
+                        self.current_frame = target
+                        self._emit_frame(frame)
+
+            # Lecture inversée : les frames viennent du cache de blocs
+            if not self.is_paused and self.direction < 0:
+                frames_back = max(1, int(self.speed)) if self.speed > 2.0 else 1
+                target = self.current_frame - frames_back
+                if target < 0:
+                    if self.loop:
+                        self.seek(self.total_frames - 1)
+                        continue
+                    self.is_paused = True # Début de la vidéo
+                    continue
+                frame = self._frame_at(target)
+                if frame is None:
+                    self.is_paused = True
+                    continue
+                self.current_frame = target
+                self._emit_frame(frame)
+                self.msleep(int((1000 / self.fps) / self.speed))
+                continue
+
+            # Reprendre la lecture séquentielle après un passage par le cache
+            if not self.is_paused and self._cap_needs_seek:
+                self.cap.seek_frame(self.current_frame + 1)
+                self._cap_needs_seek = False
+
             # Lecture normale si pas en pause
             if not self.is_paused:
                 current_time = time.time()
@@ -152,6 +259,293 @@ class VideoThread(QThread):
         
         if self.cap:
             self.cap.release()
+        self.frame_cache.clear()
+
+
+class _StreamDecoder:
+    """
+    Décodeur d'un flux d'une lecture multi-flux.
+    Conserve la dernière frame décodée et son index pour avancer au plus court
+    (grab des frames intermédiaires) vers un temps source donné.
+    """
+
+    def __init__(self, path, offset_ms=0):
+        self.path = str(path)
+        self.offset_ms = offset_ms
+        self.cap = None
+        self.fps = 25
+        self.total_frames = 0
+        self.frame = None
+        self.index = -1 # Index de self.frame dans le flux (-1 : rien de décodé)
+
+    def open(self) -> bool:
+        self.cap = open_decoder(self.path, backend='opencv')
+        if not self.cap.isOpened():
+            self.cap = None
+            return False
+        self.fps = self.cap.fps or 25
+        self.total_frames = self.cap.frame_count
+        return True
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+        self.cap = None
+        self.frame = None
+        self.index = -1
+
+    @property
+    def duration_ms(self) -> int:
+        return int((self.total_frames / self.fps) * 1000)
+
+    def _target_index(self, source_ms):
+        """Index de la frame affichée au temps source (None hors du flux)."""
+        if source_ms < 0:
+            return None
+        target = int(source_ms * self.fps / 1000)
+        if target >= self.total_frames:
+            return None
+        return target
+
+    def seek(self, source_ms):
+        """Repositionne le flux (décodage depuis la keyframe précédente)."""
+        target = self._target_index(source_ms)
+        if target is None or not self.cap:
+            return None
+        self.cap.seek_frame(target)
+        ret, frame = self.cap.read()
+        self.frame, self.index = (frame, target) if ret else (None, -1)
+        return self.frame
+
+    def advance_to(self, source_ms):
+        """Avance jusqu'à la frame du temps source ; repositionne si recul ou saut trop long."""
+        target = self._target_index(source_ms)
+        if target is None or not self.cap:
+            return None
+        if self.frame is not None and target == self.index:
+            return self.frame
+        delta = target - self.index
+        if delta < 0 or delta > 2 * self.fps:
+            return self.seek(source_ms)
+        for _ in range(delta - 1):
+            if not self.cap.grab():
+                return None
+        ret, frame = self.cap.read()
+        self.frame, self.index = (frame, target) if ret else (None, -1)
+        return self.frame
+
+
+# Pool partagé par toutes les lectures multi-flux : cv2 libère le GIL pendant
+# le décodage, les N flux sont donc décodés en parallèle.
+_stream_decode_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kosmos-stream")
+
+
+def _apply_filter_chain(frame, filters):
+    """Applique une chaîne de filtres (nom -> (fonction, kwargs)) ; un filtre en erreur est ignoré."""
+    if frame is None:
+        return None
+    for name, (filter_func, kwargs) in filters.items():
+        try:
+            frame = filter_func(frame, **kwargs)
+        except Exception as e:
+            print(f"❌ Erreur en appliquant le filtre '{name}': {e}")
+    return frame
+
+
+class MultiStreamVideoThread(QThread):
+    """
+    Lecture synchronisée de N vidéos (stations stéréo *_Kstereo).
+    Une horloge de présentation unique pilote les décodeurs ; les frames sont
+    appariées par temps (temps de référence + décalage du flux), filtrées flux par
+    flux en parallèle, puis assemblées côte à côte dans ce thread : l'UI ne reçoit
+    qu'une seule image par tick, déjà filtrée.
+    Expose la même interface que VideoThread (le premier flux sert de référence),
+    sauf frame_ready, remplacé par composed_frame_ready.
+    """
+    composed_frame_ready = pyqtSignal(np.ndarray, int) # assemblage filtré, largeur du flux de référence
+    position_changed = pyqtSignal(int)
+    duration_changed = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.streams = []
+        self.streams_to_load = None
+        self._is_running = True
+        self.is_paused = False
+        self.current_frame = 0
+        self.total_frames = 0
+        self.fps = 25
+        self.seek_frame = -1
+        self.loop = False
+        self.speed = 1.0
+        # Horloge : frame de référence affichée à l'instant _clock_origin
+        self._clock_origin = time.time()
+        self._clock_frame = 0
+        # Chaîne de filtres (copie de celle du lecteur) et dernières frames brutes par flux
+        self.filters = OrderedDict()
+        self._last_frames = None
+        self._refresh_requested = False
+
+    def stop(self):
+        """Arrête proprement le thread."""
+        self._is_running = False
+
+    def set_filters(self, filters):
+        """Remplace la chaîne de filtres ; l'image affichée est refiltrée (même en pause)."""
+        self.filters = OrderedDict(filters)
+        self._refresh_requested = True
+
+    def load_videos(self, video_paths, offsets_ms=None):
+        """Demande le chargement de plusieurs vidéos, avec un décalage (ms) par flux."""
+        offsets_ms = list(offsets_ms or [])
+        offsets_ms += [0] * (len(video_paths) - len(offsets_ms))
+        self.streams_to_load = list(zip(video_paths, offsets_ms))
+
+    def set_stream_offsets(self, offsets_ms):
+        """Modifie les décalages des flux puis réaligne toutes les vues."""
+        for stream, offset in zip(self.streams, offsets_ms):
+            stream.offset_ms = offset
+        self.seek(self.current_frame)
+
+    def play(self):
+        """Reprend la lecture."""
+        self.is_paused = False
+        self._reset_clock()
+
+    def pause(self):
+        """Met en pause la lecture."""
+        self.is_paused = True
+
+    def seek(self, frame_number):
+        """Aller à une frame (du flux de référence) ; tous les flux suivent."""
+        if self.total_frames > 0:
+            self.seek_frame = max(0, min(frame_number, self.total_frames - 1))
+
+    def set_looping(self, loop: bool):
+        """Active ou désactive la lecture en boucle."""
+        self.loop = loop
+
+    def set_speed(self, speed):
+        """Définit la vitesse de lecture."""
+        self.speed = speed
+        self._reset_clock()
+
+    def _reset_clock(self):
+        self._clock_origin = time.time()
+        self._clock_frame = self.current_frame
+
+    def _open_streams(self, streams_spec):
+        for stream in self.streams:
+            stream.release()
+        self.streams = []
+        for path, offset in streams_spec:
+            stream = _StreamDecoder(path, offset)
+            if stream.open():
+                self.streams.append(stream)
+            else:
+                print(f"Erreur: Impossible d'ouvrir la vidéo {path}")
+        if not self.streams:
+            self.total_frames = 0
+            return
+        reference = self.streams[0]
+        self.fps = reference.fps
+        self.total_frames = reference.total_frames
+        self.current_frame = 0
+        self.duration_changed.emit(reference.duration_ms)
+        self._present(0, seek=True)
+        self._reset_clock()
+        print(f"Lecture multi-flux chargée: {len(self.streams)} flux, {self.total_frames} frames à {self.fps} fps")
+
+    def _present(self, frame_index, seek=False):
+        """Décode et filtre en parallèle la frame de chaque flux pour cet instant et émet l'assemblage."""
+        position_ms = int((frame_index / self.fps) * 1000)
+        filters = self.filters
+        futures = [
+            _stream_decode_executor.submit(self._decode_and_filter, stream.seek if seek else stream.advance_to,
+                                           position_ms + stream.offset_ms, filters)
+            for stream in self.streams
+        ]
+        results = [future.result() for future in futures]
+        if results[0][0] is None:
+            return False
+        self._last_frames = [raw for raw, _ in results]
+        self._emit_composed([filtered for _, filtered in results])
+        self.position_changed.emit(position_ms)
+        return True
+
+    @staticmethod
+    def _decode_and_filter(decode, source_ms, filters):
+        frame = decode(source_ms)
+        return frame, _apply_filter_chain(frame, filters)
+
+    def _refilter(self):
+        """Réapplique les filtres aux dernières frames décodées, sans redécoder."""
+        filters = self.filters
+        futures = [_stream_decode_executor.submit(_apply_filter_chain, frame, filters) for frame in self._last_frames]
+        self._emit_composed([future.result() for future in futures])
+
+    def _emit_composed(self, frames):
+        # L'histogramme de l'UI ne porte que sur le flux de référence (à gauche)
+        self.composed_frame_ready.emit(self._compose(frames), frames[0].shape[1])
+
+    @staticmethod
+    def _compose(frames):
+        """Assemble les frames côte à côte à la hauteur du flux de référence (noir si absente)."""
+        reference = frames[0]
+        height = reference.shape[0]
+        tiles = []
+        for frame in frames:
+            if frame is None:
+                frame = np.zeros_like(reference)
+            elif frame.shape[0] != height:
+                width = max(1, int(frame.shape[1] * height / frame.shape[0]))
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            tiles.append(frame)
+        return cv2.hconcat(tiles) if len(tiles) > 1 else tiles[0]
+
+    def run(self):
+        """Boucle principale : horloge de présentation commune à tous les flux."""
+        while self._is_running:
+            if self.streams_to_load is not None:
+                streams_spec, self.streams_to_load = self.streams_to_load, None
+                self._open_streams(streams_spec)
+
+            if not self.streams:
+                self.msleep(100)
+                continue
+
+            if self._refresh_requested:
+                self._refresh_requested = False
+                if self._last_frames and self.seek_frame == -1:
+                    self._refilter()
+
+            # Recherche coordonnée : tous les flux se repositionnent ensemble
+            if self.seek_frame != -1:
+                self.current_frame, self.seek_frame = self.seek_frame, -1
+                self._present(self.current_frame, seek=True)
+                self._reset_clock()
+
+            if self.is_paused:
+                self.msleep(50)
+                continue
+
+            # Frame due selon l'horloge (les frames en retard sont sautées)
+            elapsed = time.time() - self._clock_origin
+            due_frame = self._clock_frame + int(elapsed * self.fps * self.speed)
+            if due_frame > self.current_frame:
+                if due_frame >= self.total_frames or not self._present(due_frame):
+                    if self.loop:
+                        self.seek(0)
+                        continue
+                    self.is_paused = True # Fin de la vidéo
+                    continue
+                self.current_frame = due_frame
+
+            next_due = self._clock_origin + (self.current_frame + 1 - self._clock_frame) / (self.fps * self.speed)
+            self.msleep(max(1, int((next_due - time.time()) * 1000)))
+
+        for stream in self.streams:
+            stream.release()
 
 
 class CustomVideoWidget(QLabel):
@@ -167,6 +561,10 @@ class CustomVideoWidget(QLabel):
         self.metadata_lines = []
         self.show_metadata = True
         self.current_pixmap = None
+        self.current_image = None # QImage d'affichage (partage la mémoire de _rgb_buffer)
+        self._last_frame = None # Référence (sans copie) vers la dernière frame reçue
+        self._resized_buffer = None # Buffers réutilisés d'une frame à l'autre
+        self._rgb_buffer = None
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setStyleSheet("background-color: black; border: none;")
         self.setMinimumSize(640, 360)
@@ -199,42 +597,69 @@ class CustomVideoWidget(QLabel):
         self.show_metadata = show
         self.update()
 
+    def _display_size(self, frame_width, frame_height):
+        """
+        Calcule la taille d'affichage (en pixels physiques) de la frame dans le widget,
+        en conservant le ratio. On ne fait que réduire, jamais agrandir.
+        """
+        ratio = self.devicePixelRatioF()
+        max_width = max(1, int(self.width() * ratio))
+        max_height = max(1, int(self.height() * ratio))
+        scale = min(1.0, max_width / frame_width, max_height / frame_height)
+        return max(1, int(frame_width * scale)), max(1, int(frame_height * scale))
+
     def update_frame(self, frame):
-        """Met à jour l'affichage avec une nouvelle frame OpenCV."""
-        height, width, channel = frame.shape
-        bytes_per_line = 3 * width
-        q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888).rgbSwapped()
-        
-        # Utiliser QPainter pour une conversion de haute qualité de QImage vers QPixmap
-        # afin d'éviter la pixellisation potentielle de fromImage().
-        pixmap = QPixmap(q_image.size())
-        painter = QPainter(pixmap)
-        painter.drawImage(0, 0, q_image)
-        painter.end()
-        self.current_pixmap = pixmap
+        """
+        Met à jour l'affichage avec une nouvelle frame OpenCV (BGR).
+        La frame est d'abord réduite à la taille du widget, puis convertie en RGB
+        une seule fois dans un buffer réutilisé, enveloppé par un QImage sans copie.
+        """
+        self._last_frame = frame
+        frame_height, frame_width = frame.shape[:2]
+        target_width, target_height = self._display_size(frame_width, frame_height)
+
+        if (target_width, target_height) != (frame_width, frame_height):
+            if self._resized_buffer is None or self._resized_buffer.shape != (target_height, target_width, 3):
+                self._resized_buffer = np.empty((target_height, target_width, 3), dtype=np.uint8)
+            small = cv2.resize(frame, (target_width, target_height), dst=self._resized_buffer,
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = frame
+
+        if self._rgb_buffer is None or self._rgb_buffer.shape != small.shape:
+            self._rgb_buffer = np.empty(small.shape, dtype=np.uint8)
+        self._rgb_buffer = cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+
+        height, width = self._rgb_buffer.shape[:2]
+        q_image = QImage(self._rgb_buffer.data, width, height, self._rgb_buffer.strides[0],
+                         QImage.Format.Format_RGB888)
+        q_image.setDevicePixelRatio(self.devicePixelRatioF())
+        self.current_image = q_image
+        self.current_pixmap = None # Construit à la demande (capture)
         self.update()
 
+    def resizeEvent(self, event):
+        """Réaffiche la dernière frame à la nouvelle taille du widget."""
+        super().resizeEvent(event)
+        if self._last_frame is not None:
+            self.update_frame(self._last_frame)
+
     def paintEvent(self, event):
         """Dessine le pixmap actuel avec les métadonnées et l'overlay de capture."""
-        if not self.current_pixmap:
+        if self.current_image is None:
             super().paintEvent(event)
             return
 
         painter = QPainter(self)
         
-        # On ne redimensionne que si l'image est plus grande que le lecteur
-        # pour éviter de la pixelliser en l'agrandissant.
-        if self.current_pixmap.width() > self.width() or self.current_pixmap.height() > self.height():
-            # Utiliser SmoothTransformation pour une meilleure qualité de réduction
-            pixmap_to_draw = self.current_pixmap.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-        else:
-            # Si l'image est plus petite, on l'affiche en qualité native (taille originale)
-            pixmap_to_draw = self.current_pixmap
-        
-        # Centrer le pixmap
-        x = (self.width() - pixmap_to_draw.width()) // 2
-        y = (self.height() - pixmap_to_draw.height()) // 2
-        painter.drawPixmap(x, y, pixmap_to_draw)
+        # L'image est déjà réduite à la taille du widget par update_frame :
+        # on la dessine telle quelle, centrée (taille logique = taille / ratio).
+        ratio = self.current_image.devicePixelRatio() or 1.0
+        image_width = int(self.current_image.width() / ratio)
+        image_height = int(self.current_image.height() / ratio)
+        x = (self.width() - image_width) // 2
+        y = (self.height() - image_height) // 2
+        painter.drawImage(x, y, self.current_image)
 
         if self.show_metadata and self.metadata_lines:
             self.draw_metadata(painter)
@@ -287,8 +712,12 @@ class CustomVideoWidget(QLabel):
             y_pos += 20
 
     def get_current_pixmap_for_capture(self):
-        """Retourne le pixmap actuel pour la capture."""
-        return self.current_pixmap.copy() if self.current_pixmap else None
+        """Retourne le pixmap actuel (taille d'affichage) pour la capture."""
+        if self.current_image is None:
+            return None
+        if self.current_pixmap is None:
+            self.current_pixmap = QPixmap.fromImage(self.current_image)
+        return self.current_pixmap.copy()
 
     # --- GESTION DES ÉVÉNEMENTS SOURIS POUR LA CAPTURE ---
     def mousePressEvent(self, event):
@@ -700,9 +1129,9 @@ class VideoPlayer(QWidget):
     # Signaux
     play_pause_clicked = pyqtSignal()
     position_changed = pyqtSignal(int)
-    frame_captured = pyqtSignal(QPixmap)
+    frame_captured = pyqtSignal(object) # ndarray BGR pleine résolution (filtres appliqués)
     detach_requested = pyqtSignal()
-    histogram_data_ready = pyqtSignal(list, list, list, list) # AJOUT: R, G, B, Densité
+    histogram_data_ready = pyqtSignal(object, object, object, object) # R, G, B, Densité (np.ndarray)
     
     filters_reset = pyqtSignal() # Signal pour notifier que les filtres ont été réinitialisés
     
@@ -712,25 +1141,28 @@ class VideoPlayer(QWidget):
         self.duration = 0
         
         # --- OpenCV Video Thread ---
-        self.video_thread = VideoThread()
-        self.video_thread.position_changed.connect(self.on_position_changed)
-        self.video_thread.position_changed.connect(self.update_timeseries_metadata)  # AJOUT pour métadonnées
-        self.video_thread.duration_changed.connect(self.on_duration_changed)
-        self.video_thread.start() # Démarrer le thread une seule fois
+        self.video_thread = None
+        self._install_video_thread(VideoThread())
         
         # --- DONNÉES TEMPORELLES ---
         self.static_metadata = {} # Pour stocker les métadonnées du JSON
-        self.timeseries_data = []
-        self.last_timeseries_index = 0
+        self.timeseries_data = TimeseriesData()
         
         self.current_cv_frame = None # Pour stocker la dernière frame brute OpenCV
+        self._current_frame_filtered = False # Vrai en multi-flux : filtres déjà appliqués par le thread
         self._player_initialized = False # Attribut pour savoir si une vidéo est chargée
         self._was_playing_before_crop = False
         self._capture_in_progress = False
 
         # --- GESTION DES FILTRES D'IMAGE ---
         self.active_filters = OrderedDict()
-        self.video_thread.frame_ready.connect(self.on_frame_ready)
+
+        # --- HISTOGRAMME (calcul asynchrone et limité en fréquence) ---
+        self._histogram_pending_frame = None
+        self._histogram_future = None
+        self._histogram_timer = QTimer(self)
+        self._histogram_timer.setInterval(HISTOGRAM_INTERVAL_MS)
+        self._histogram_timer.timeout.connect(self._flush_histogram)
 
         #fullscreen 
         self.is_fullscreen = False
@@ -739,6 +1171,24 @@ class VideoPlayer(QWidget):
         
         self.init_ui()
 
+    def _install_video_thread(self, thread):
+        """Remplace le thread de lecture (simple ou multi-flux) et rebranche ses signaux."""
+        if self.video_thread is not None:
+            self.video_thread.stop()
+            self.video_thread.wait()
+            self.video_thread.deleteLater()
+        self.video_thread = thread
+        self.video_thread.position_changed.connect(self.on_position_changed)
+        self.video_thread.position_changed.connect(self.update_timeseries_metadata)  # AJOUT pour métadonnées
+        self.video_thread.duration_changed.connect(self.on_duration_changed)
+        if isinstance(thread, MultiStreamVideoThread):
+            # Filtres appliqués flux par flux dans le thread, avant l'assemblage
+            thread.set_filters(self.active_filters)
+            thread.composed_frame_ready.connect(self.on_composed_frame_ready)
+        else:
+            self.video_thread.frame_ready.connect(self.on_frame_ready)
+        self.video_thread.start() # Démarrer le thread une seule fois
+
     # --- MÉTHODES DE GESTION DES FILTRES ---
     def toggle_filter(self, name: str, filter_func: callable, activate: bool, **kwargs):
         """Active ou désactive un filtre."""
@@ -762,47 +1212,74 @@ class VideoPlayer(QWidget):
 
     def _apply_filters_to_current_frame(self):
         """Applique la chaîne de filtres à la frame actuelle et met à jour l'affichage."""
-        if self.current_cv_frame is not None:
+        if isinstance(self.video_thread, MultiStreamVideoThread):
+            self.video_thread.set_filters(self.active_filters)
+        elif self.current_cv_frame is not None:
             self.on_frame_ready(self.current_cv_frame)
 
     def _calculate_and_emit_histogram(self, frame: np.ndarray):
-        """Calcule l'histogramme de la frame et émet le signal."""
-        try:
-            # Calculer l'histogramme pour chaque canal
-            b_hist = cv2.calcHist([frame], [0], None, [256], [0, 256]).flatten().tolist()
-            g_hist = cv2.calcHist([frame], [1], None, [256], [0, 256]).flatten().tolist()
-            r_hist = cv2.calcHist([frame], [2], None, [256], [0, 256]).flatten().tolist()
-
-            # Calculer l'histogramme de luminance pour la densité
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            density_hist = cv2.calcHist([gray_frame], [0], None, [256], [0, 256]).flatten().tolist()
+        """
+        Planifie le calcul de l'histogramme de la frame.
+        Seule la dernière frame reçue est conservée ; le calcul est fait dans un
+        worker au plus toutes les HISTOGRAM_INTERVAL_MS millisecondes.
+        """
+        self._histogram_pending_frame = frame
+        if not self._histogram_timer.isActive():
+            self._flush_histogram()
+            self._histogram_timer.start()
+
+    def _flush_histogram(self):
+        """Envoie la frame en attente au worker si aucun calcul n'est en cours."""
+        if self._histogram_future is not None and not self._histogram_future.done():
+            return
+        frame = self._histogram_pending_frame
+        if frame is None:
+            # Rien de nouveau depuis le dernier calcul : on arrête le minuteur
+            self._histogram_timer.stop()
+            return
+        self._histogram_pending_frame = None
+        self._histogram_future = _histogram_executor.submit(compute_histograms, frame)
+        self._histogram_future.add_done_callback(self._on_histogram_computed)
 
+    def _on_histogram_computed(self, future):
+        """Callback du worker : émet les histogrammes (connexion mise en file par Qt)."""
+        try:
+            r_hist, g_hist, b_hist, density_hist = future.result()
             self.histogram_data_ready.emit(r_hist, g_hist, b_hist, density_hist)
+        except RuntimeError:
+            pass # Le lecteur a été détruit pendant le calcul
         except Exception as e:
             print(f"❌ Erreur calcul histogramme: {e}")
 
     def closeEvent(self, event):
         """S'assure que le thread est bien arrêté à la fermeture."""
+        self._histogram_timer.stop()
         self.video_thread.stop()
         self.video_thread.wait()
 
     def on_frame_ready(self, frame):
         """Reçoit la frame brute, applique les filtres et l'affiche."""
-        self.current_cv_frame = frame.copy() # Stocker la frame brute originale
+        # Stocker une simple référence à la frame brute : le thread alloue une nouvelle
+        # frame à chaque lecture et les filtres ne modifient pas leur entrée en place.
+        # La copie pleine résolution n'est faite que par grab_frame, au moment d'une capture.
+        self.current_cv_frame = frame
+        self._current_frame_filtered = False
         
-        processed_frame = frame
-        if self.active_filters:
-            for name, (filter_func, kwargs) in self.active_filters.items():
-                try:
-                    processed_frame = filter_func(processed_frame, **kwargs)
-                except Exception as e:
-                    print(f"❌ Erreur en appliquant le filtre '{name}': {e}")
+        processed_frame = _apply_filter_chain(frame, self.active_filters)
         
         # Calculer et émettre les données de l'histogramme de l'image traitée
         self._calculate_and_emit_histogram(processed_frame)
 
         self.video_widget.update_frame(processed_frame)
 
+    def on_composed_frame_ready(self, frame, reference_width):
+        """Lecture multi-flux : frame déjà filtrée et assemblée par le thread."""
+        self.current_cv_frame = frame
+        self._current_frame_filtered = True
+        # Histogramme du seul flux de référence (vue sans copie sur la moitié gauche)
+        self._calculate_and_emit_histogram(frame[:, :reference_width])
+        self.video_widget.update_frame(frame)
+
     def init_ui(self):
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -888,10 +1365,23 @@ class VideoPlayer(QWidget):
 
     def load_video(self, video_path):
         """Charge une vidéo dans le thread."""
+        if not isinstance(self.video_thread, VideoThread):
+            self._install_video_thread(VideoThread())
         self.video_thread.load_video(video_path)
         self._player_initialized = True
         self.controls.update_play_pause_button(True) # Met l'icône en pause (car ça joue auto)
 
+    def load_videos(self, video_paths, offsets_ms=None):
+        """
+        Charge plusieurs vidéos synchronisées (ex : station stéréo), affichées côte à côte.
+        offsets_ms : décalage de chaque flux par rapport au premier (en millisecondes).
+        """
+        if not isinstance(self.video_thread, MultiStreamVideoThread):
+            self._install_video_thread(MultiStreamVideoThread())
+        self.video_thread.load_videos(video_paths, offsets_ms)
+        self._player_initialized = True
+        self.controls.update_play_pause_button(True) # Met l'icône en pause (car ça joue auto)
+
     def toggle_play_pause(self):
         """Bascule entre lecture et pause."""
         if not self._player_initialized:
@@ -907,6 +1397,8 @@ class VideoPlayer(QWidget):
     def play(self):
         """Lance la lecture."""
         if self._player_initialized:
+            if hasattr(self.video_thread, 'set_direction'):
+                self.video_thread.set_direction(1)
             self.video_thread.play()
             self.controls.update_play_pause_button(True)
 
@@ -991,18 +1483,19 @@ class VideoPlayer(QWidget):
             print("⚠️ Capture déjà en cours, annulation")
             return
 
-        pixmap_to_capture = self.video_widget.get_current_pixmap_for_capture()
         self._capture_in_progress = True
         
         # CORRECTION: Utiliser la frame OpenCV stockée dans VideoPlayer (self.current_cv_frame)
         # et non une frame inexistante sur le widget d'affichage.
         if self.current_cv_frame is None:
             print("❌ Aucune frame OpenCV disponible pour la capture.")
+            self._capture_in_progress = False
             return
         frame = self.current_cv_frame.copy()
         
         # Appliquer les filtres actifs sur la capture pour qu'elle corresponde à ce qui est affiché
-        if self.active_filters:
+        # (en multi-flux, la frame reçue est déjà filtrée)
+        if self.active_filters and not self._current_frame_filtered:
             for name, (filter_func, kwargs) in self.active_filters.items():
                 try:
                     frame = filter_func(frame, **kwargs)
@@ -1032,9 +1525,7 @@ class VideoPlayer(QWidget):
             
             # Extraire la zone
             if x2 > x1 and y2 > y1:
-                # CORRECTION: Forcer une copie contiguë de la mémoire après le découpage.
-                # Le slicing NumPy peut retourner une "vue" non contiguë, ce qui cause une
-                # TypeError avec QImage. .copy() résout ce problème.
+                # Copie contiguë : la capture est confiée telle quelle au thread d'écriture
                 frame = frame[y1:y2, x1:x2].copy()
                 print(f"✂️ Zone extraite: ({x1},{y1}) -> ({x2},{y2})")
             else:
@@ -1042,14 +1533,10 @@ class VideoPlayer(QWidget):
                 self._capture_in_progress = False
                 return
         
-        # Convertir la frame (potentiellement recadrée) en QPixmap
-        height, width, channel = frame.shape
-        bytes_per_line = 3 * width
-        q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format.Format_RGB888).rgbSwapped()
-        final_pixmap = QPixmap.fromImage(q_image)
-        
-        self.frame_captured.emit(final_pixmap)
-        print(f"✅ Frame OpenCV capturée: {final_pixmap.size()}")
+        # La frame (potentiellement recadrée) est transmise sans conversion QImage/QPixmap :
+        # l'encodage est fait hors du thread GUI par le contrôleur
+        self.frame_captured.emit(frame)
+        print(f"✅ Frame OpenCV capturée: {frame.shape[1]}x{frame.shape[0]}")
         
         # Marquer la capture terminée
         self._capture_in_progress = False
@@ -1061,9 +1548,39 @@ class VideoPlayer(QWidget):
             self.on_cropping_finished_by_child()
             print("🖱️ Sélection de zone annulée.")
             self.video_widget.update()
+        # Navigation image par image et lecture inversée (J / K / L)
+        elif event.key() == Qt.Key.Key_Left:
+            self.step_backward()
+        elif event.key() == Qt.Key.Key_Right:
+            self.step_forward()
+        elif event.key() == Qt.Key.Key_J:
+            self.play_reverse()
+        elif event.key() == Qt.Key.Key_K:
+            self.pause()
+        elif event.key() == Qt.Key.Key_L:
+            self.play()
         else:
             super().keyPressEvent(event)
 
+    def step_forward(self):
+        """Avance d'une frame (met la lecture en pause)."""
+        if self._player_initialized and hasattr(self.video_thread, 'step'):
+            self.video_thread.step(1)
+            self.controls.update_play_pause_button(False)
+
+    def step_backward(self):
+        """Recule d'une frame (met la lecture en pause), depuis le cache de blocs."""
+        if self._player_initialized and hasattr(self.video_thread, 'step'):
+            self.video_thread.step(-1)
+            self.controls.update_play_pause_button(False)
+
+    def play_reverse(self):
+        """Lance la lecture en arrière."""
+        if self._player_initialized and hasattr(self.video_thread, 'set_direction'):
+            self.video_thread.set_direction(-1)
+            self.video_thread.play()
+            self.controls.update_play_pause_button(True)
+
     def on_position_changed(self, position_ms):
         """Appelé quand la position change dans OpenCV (en millisecondes)."""
         if not self._player_initialized:
@@ -1109,8 +1626,9 @@ class VideoPlayer(QWidget):
 
     def set_timeseries_data(self, data):
         """Définit les données temporelles (issues du CSV)."""
+        if not isinstance(data, TimeseriesData):
+            data = TimeseriesData.from_records(data or [])
         self.timeseries_data = data
-        self.last_timeseries_index = 0
         print(f"📈 Données temporelles reçues : {len(data)} points")
 
     def update_timeseries_metadata(self, position_ms):
@@ -1118,26 +1636,12 @@ class VideoPlayer(QWidget):
         current_metadata = self.static_metadata.copy()
         
         if self.timeseries_data:
-            # Réinitialiser si on a reculé
-            if self.last_timeseries_index > 0 and self.last_timeseries_index < len(self.timeseries_data):
-                if self.timeseries_data[self.last_timeseries_index].get('timestamp_ms', 0) > position_ms:
-                    self.last_timeseries_index = 0
-            
-            # Avancer jusqu'au bon point
-            while self.last_timeseries_index < len(self.timeseries_data) - 1:
-                next_point = self.timeseries_data[self.last_timeseries_index + 1]
-                if next_point.get('timestamp_ms', 0) <= position_ms:
-                    self.last_timeseries_index += 1
-                else:
-                    break
-            
-            # Récupérer les données du point courant
-            if 0 <= self.last_timeseries_index < len(self.timeseries_data):
-                point = self.timeseries_data[self.last_timeseries_index]
-                # Mapper les clés pour l'affichage
-                if 'temperature' in point: current_metadata['temp'] = f"{point['temperature']}°C"
-                if 'pression' in point: current_metadata['pression'] = f"{point['pression']} Bar"
-                if 'lux' in point: current_metadata['lux'] = f"{point['lux']} Lux"
+            # Recherche dichotomique : O(log n), quel que soit le sens du seek
+            point = self.timeseries_data.sample_at(position_ms)
+            # Mapper les clés pour l'affichage
+            if 'temperature' in point: current_metadata['temp'] = f"{point['temperature']:g}°C"
+            if 'pression' in point: current_metadata['pression'] = f"{point['pression']:g} Bar"
+            if 'lux' in point: current_metadata['lux'] = f"{point['lux']:g} Lux"
 
         self.video_widget.set_metadata(current_metadata)
 
@@ -1,6 +1,7 @@
 """
 Composant Outils d'Extraction
-Boutons pour capture d'écran, enregistrement, création de short, recadrage
+Boutons pour capture d'écran, enregistrement, création de short, recadrage,
+export par lot et extraction d'images en masse
 """
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton
 from PyQt6.QtCore import Qt, pyqtSignal
@@ -53,6 +54,9 @@ class ExtractionTools(QWidget):
     recording_clicked = pyqtSignal()
     short_clicked = pyqtSignal()
     crop_clicked = pyqtSignal()
+    batch_export_clicked = pyqtSignal()
+    dataset_clicked = pyqtSignal()
+    summary_clicked = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -100,6 +104,21 @@ class ExtractionTools(QWidget):
         self.short_btn.clicked.connect(self.short_clicked.emit)
         buttons_layout.addWidget(self.short_btn)
         
+        # Bouton Export par lot (toutes les vidéos conservées)
+        self.batch_export_btn = ExtractionButton("⇶", "Export par lot")
+        self.batch_export_btn.clicked.connect(self.batch_export_clicked.emit)
+        buttons_layout.addWidget(self.batch_export_btn)
+        
+        # Bouton Extraction d'images (jeu de données sur toute la campagne)
+        self.dataset_btn = ExtractionButton("▦", "Extraction d'images")
+        self.dataset_btn.clicked.connect(self.dataset_clicked.emit)
+        buttons_layout.addWidget(self.dataset_btn)
+        
+        # Bouton Résumé d'activité (passages avec sujets en mouvement)
+        self.summary_btn = ExtractionButton("≋", "Résumé d'activité")
+        self.summary_btn.clicked.connect(self.summary_clicked.emit)
+        buttons_layout.addWidget(self.summary_btn)
+        
         buttons_layout.addStretch()
         
         buttons_container.setLayout(buttons_layout)
@@ -135,6 +154,9 @@ if __name__ == '__main__':
     tools.recording_clicked.connect(lambda: print("⏺ Enregistrement vidéo"))
     tools.short_clicked.connect(lambda: print("▶ Créer un short"))
     tools.crop_clicked.connect(lambda: print("⛶ Recadrer"))
+    tools.batch_export_clicked.connect(lambda: print("⇶ Export par lot"))
+    tools.dataset_clicked.connect(lambda: print("▦ Extraction d'images"))
+    tools.summary_clicked.connect(lambda: print("≋ Résumé d'activité"))
     
     window.setCentralWidget(tools)
     window.show()
@@ -1,34 +1,32 @@
 """
 Fenêtre de dialogue pour prévisualiser un short avant de l'enregistrer.
+L'aperçu est lu depuis un PreviewBuffer alimenté par l'export en cours : il démarre
+dès les premières frames encodées, sans attendre la fin de l'encodage.
 """
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,QMessageBox, QLineEdit)
-from PyQt6.QtCore import Qt, QUrl
-from .lecteur import VideoPlayer
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QImage, QPixmap
 
 
 class ShortPreviewDialog(QDialog):
     """
     Dialogue qui affiche un aperçu vidéo d'un short.
+    Les frames du tampon sont affichées à la cadence de la source (une frame sur deux
+    étant conservée, l'aperçu est accéléré x2), puis en boucle une fois l'export terminé.
     """
-    def __init__(self, temp_video_path, parent=None):
+    def __init__(self, preview, parent=None):
         super().__init__(parent)
-        self.temp_video_path = temp_video_path
+        self.preview = preview
+        self.position = 0
         self.setWindowTitle("Aperçu du Short")
         self.setFixedSize(640, 540)  # Augmenter la hauteur pour le champ de nom
         self.setStyleSheet("background-color: black; color: white;")
 
         self.init_ui()
 
-        if not self.temp_video_path:
-            QMessageBox.critical(self, "Erreur", "Le fichier d'aperçu est introuvable.")
-            self.reject()
-        else:
-            # Charger et jouer la vidéo automatiquement avec le lecteur OpenCV
-            self.video_player.load_video(self.temp_video_path)
-            self.video_player.play()
-            # Activer la lecture en boucle
-            self.video_player.video_thread.set_looping(True)
-
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.next_frame)
+        self.timer.start(max(1, int(1000 / self.preview.fps)))
 
     def init_ui(self):
         """Initialise l'interface utilisateur du dialogue."""
@@ -36,9 +34,16 @@ class ShortPreviewDialog(QDialog):
         main_layout.setContentsMargins(10, 10, 10, 10)
         main_layout.setSpacing(10)
 
-        # Lecteur vidéo
-        self.video_player = VideoPlayer()
-        main_layout.addWidget(self.video_player, stretch=1)
+        # Zone d'affichage de l'aperçu
+        self.video_label = QLabel("Préparation de l'aperçu...")
+        self.video_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.video_label.setMinimumHeight(360)
+        main_layout.addWidget(self.video_label, stretch=1)
+
+        # Avancement de l'encodage du fichier final
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        main_layout.addWidget(self.status_label)
 
         # Champ pour le nom du short
         name_layout = QHBoxLayout()
@@ -94,16 +99,41 @@ class ShortPreviewDialog(QDialog):
         self.accept()
 
 
+    def next_frame(self):
+        """Affiche la frame suivante du tampon ; reste sur la dernière tant que l'export avance."""
+        frame = self.preview.get(self.position)
+        if frame is None:
+            if self.preview.complete and len(self.preview):
+                self.position = 0 # Lecture en boucle une fois le clip complet
+                frame = self.preview.get(0)
+            self.update_status()
+            if frame is None:
+                return
+        self.position += 1
+
+        height, width = frame.shape[:2]
+        q_image = QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_RGB888)
+        pixmap = QPixmap.fromImage(q_image).scaled(
+            self.video_label.size(),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        self.video_label.setPixmap(pixmap)
+        self.update_status()
+
+    def update_status(self):
+        if self.preview.complete:
+            self.status_label.setText("Aperçu x2 — encodage terminé")
+        elif self.preview.total_frames:
+            percent = min(100, int(100 * self.preview.received / self.preview.total_frames))
+            self.status_label.setText(f"Aperçu x2 — encodage du short en cours : {percent} %")
+        else:
+            self.status_label.setText("Aperçu x2 — encodage du short en cours...")
+
     def cleanup(self):
-        """Arrête proprement le lecteur vidéo et libère les ressources."""
-        if self.video_player and self.video_player.video_thread:
-            # Arrêter le thread vidéo pour libérer les ressources
-            self.video_player.video_thread.set_looping(False) # Arrêter la boucle
-            self.video_player.video_thread.stop()
-            # Attendre que le thread se termine pour être sûr que le fichier est libéré
-            self.video_player.video_thread.wait(1000) # Attendre max 1 seconde
-            self.video_player.close() # S'assurer que le widget est détruit
-            print("🗑️ Lecteur de l'aperçu arrêté et ressource libérée.")
+        """Arrête la lecture de l'aperçu (le tampon appartient à l'export)."""
+        self.timer.stop()
+        print("🗑️ Lecture de l'aperçu arrêtée.")
 
     # Redéfinir reject et accept pour nettoyer les ressources
     
@@ -113,4 +143,4 @@ class ShortPreviewDialog(QDialog):
 
     def accept(self):
         self.cleanup()
-        super().accept()
\ No newline at end of file
+        super().accept()
@@ -9,6 +9,9 @@ from PyQt6.QtCore import QObject, pyqtSignal
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from models.app_model import SQLITE_SEUIL_VIDEOS
+from models.campaign_store import JSON_REMPLACE_SUFFIXE, SQLITE_SUFFIXE
+
 
 class AccueilKosmosController(QObject):
     """Contrôleur pour la page d'accueil KOSMOS"""
@@ -76,7 +79,8 @@ class AccueilKosmosController(QObject):
     def on_ouvrir_repertoire(self):
         """
         Ouvre un répertoire de travail existant en sélectionnant son dossier.
-        Cherche le fichier *_config.json pour charger la configuration.
+        Cherche la base *_campagne.sqlite, sinon le fichier *_config.json, pour charger
+        la configuration. Les grosses campagnes JSON sont converties en SQLite.
         """
         if not self.view: return
 
@@ -90,8 +94,8 @@ class AccueilKosmosController(QObject):
         
         dossier_path = Path(dossier_campagne)
         
-        # Chercher un fichier *_config.json dans le dossier
-        config_files = list(dossier_path.glob("*_config.json"))
+        # Chercher une base *_campagne.sqlite, sinon un fichier *_config.json dans le dossier
+        config_files = list(dossier_path.glob(f"*{SQLITE_SUFFIXE}")) or list(dossier_path.glob("*_config.json"))
         
         if not config_files:
             self.view.show_warning(
@@ -115,6 +119,11 @@ class AccueilKosmosController(QObject):
         
         campagne = self.model.campagne_courante
         print(f"✅ Répertoire de travail ouvert : {campagne.nom}")
+
+        # Grosse campagne JSON : proposer la conversion en SQLite (le JSON est gardé,
+        # renommé en *.migre, comme copie de l'ancien format)
+        if campagne.stockage is None and campagne.nb_videos >= SQLITE_SEUIL_VIDEOS:
+            self._proposer_conversion_sqlite(campagne, chemin_config)
         
         # Vérifier/créer le dossier extraction s'il n'existe pas
         if not campagne.workspace_extraction:
@@ -127,6 +136,26 @@ class AccueilKosmosController(QObject):
         self.campagne_ouverte.emit(str(dossier_path))
         self.navigation_demandee.emit('tri')
     
+    def _proposer_conversion_sqlite(self, campagne, chemin_config):
+        """Demande à l'utilisateur s'il veut passer la campagne au format SQLite, puis convertit."""
+        if not self.view.ask_confirmation(
+            "Convertir le répertoire de travail ?",
+            f"Ce répertoire de travail compte {campagne.nb_videos} vidéos.\n\n"
+            f"Le convertir au format SQLite accélère les sauvegardes : seules les vidéos "
+            f"modifiées sont réécrites.\n"
+            f"Le fichier {chemin_config.name} sera conservé sous le nom "
+            f"{chemin_config.name}{JSON_REMPLACE_SUFFIXE} et ne sera plus utilisé.\n\n"
+            f"Convertir maintenant ?"
+        ):
+            return
+        if self.model.convertir_campagne_sqlite(str(chemin_config)):
+            print(f"ℹ️ {campagne.nb_videos} vidéos : campagne convertie en SQLite")
+        else:
+            self.view.show_error(
+                "Erreur",
+                "La conversion a échoué : le répertoire de travail reste au format JSON."
+            )
+
     # Alias pour compatibilité avec l'ancien code
     def on_creer_campagne(self):
         """Alias pour on_creer_repertoire (compatibilité)"""
@@ -10,16 +10,159 @@ import sys
 import cv2
 import numpy as np
 import subprocess
+import threading
 from pathlib import Path
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
 from PyQt6.QtGui import QPixmap
-from PyQt6.QtWidgets import QApplication
 
 # Ajout du chemin racine pour les imports
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from kosmos_processing.algos_correction import UnderwaterFilters
+from kosmos_processing.activity_summary import SUMMARY_PAD_AFTER_S, SUMMARY_PAD_BEFORE_S, export_activity_summary
+from kosmos_processing.capture_writer import CAPTURE_FORMATS, CaptureWriter
+from kosmos_processing.frame_extraction import extract_dataset, parse_sampling_plan
+from kosmos_processing.preview_buffer import PreviewBuffer
+from kosmos_processing.probe import probe_media
+from kosmos_processing.export import (
+    EXPORT_PRESETS,
+    OUTPUT_PROFILES,
+    ExportAnnule,
+    export_multi,
+    export_video,
+    filtres_depuis_json,
+    filtres_preset,
+    filtres_vers_json,
+    sorties_profil,
+)
+from models.export_queue import ANNULE, EN_ATTENTE, EN_COURS, ERREUR, TERMINE, ExportQueue, ExportTache
+
+
+class ExportJob(QThread):
+    """
+    Export filtré d'une portion de vidéo en tâche de fond (décodage, filtres et pipe ffmpeg).
+    Le GUI reste utilisable ; la progression est émise environ 4 fois par seconde.
+    Avec des filtres actifs, l'extrait est réparti sur plusieurs processus (export_video).
+    Avec `preview` (PreviewBuffer), les frames filtrées alimentent l'aperçu pendant l'encodage.
+    Avec `sorties`, toutes les sorties sont produites en une seule passe (export_multi).
+    Avec `resume` (paramètres de marge), seuls les passages actifs sont gardés
+    (export_activity_summary).
+    """
+
+    # frames faites, frames totales, frames/s, temps restant estimé (s, -1 si inconnu)
+    progression = pyqtSignal(int, int, float, float)
+    termine = pyqtSignal(bool, str)
+
+    def __init__(self, source_path, output_path, start_ms, end_ms, filters=None, preview=None, sorties=None,
+                 resume=None, parent=None):
+        super().__init__(parent)
+        self.source_path = source_path
+        self.output_path = output_path
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.filters = filters or {}
+        self.preview = preview
+        self.sorties = sorties or []
+        self.resume = resume
+        self._cancel_event = threading.Event()
+
+    @property
+    def annule(self):
+        return self._cancel_event.is_set()
+
+    def annuler(self):
+        """Demande l'arrêt : le fichier partiel est supprimé par le thread d'export."""
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            if self.sorties:
+                export_multi(
+                    self.source_path,
+                    self.sorties,
+                    self.start_ms,
+                    self.end_ms,
+                    self.filters,
+                    progress_cb=self.progression.emit,
+                    cancel_event=self._cancel_event,
+                    pipe_pix_fmt='yuv420p'
+                )
+                self.termine.emit(True, str(self.output_path))
+                return
+            if self.resume is not None:
+                export_activity_summary(
+                    self.source_path,
+                    self.output_path,
+                    self.start_ms,
+                    self.end_ms,
+                    self.filters,
+                    progress_cb=self.progression.emit,
+                    cancel_event=self._cancel_event,
+                    pipe_pix_fmt='yuv420p',
+                    **self.resume
+                )
+                self.termine.emit(True, str(self.output_path))
+                return
+            export_video(
+                self.source_path,
+                self.output_path,
+                self.start_ms,
+                self.end_ms,
+                self.filters,
+                progress_cb=self.progression.emit,
+                cancel_event=self._cancel_event,
+                frame_cb=self.preview.push if self.preview else None,
+                pipe_pix_fmt='yuv420p' # Moitié moins de données dans le pipe, sortie yuv420p lisible partout
+            )
+            self.termine.emit(True, str(self.output_path))
+        except ExportAnnule as e:
+            self.termine.emit(False, str(e))
+        except Exception as e:
+            print(f"❌ Export échoué : {e}")
+            self.termine.emit(False, str(e))
+        finally:
+            if self.preview:
+                self.preview.finish()
+
+
+class DatasetJob(QThread):
+    """Extraction d'images en masse (jeu de données) en tâche de fond."""
+
+    # images faites, images totales, images/s, temps restant estimé (s, -1 si inconnu)
+    progression = pyqtSignal(int, int, float, float)
+    termine = pyqtSignal(bool, str)
+
+    def __init__(self, sources, output_dir, every_s=None, timestamps_ms=None, filters=None, parent=None):
+        super().__init__(parent)
+        self.sources = sources
+        self.output_dir = output_dir
+        self.every_s = every_s
+        self.timestamps_ms = timestamps_ms
+        self.filters = filters or {}
+        self._cancel_event = threading.Event()
+
+    def annuler(self):
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            manifest = extract_dataset(
+                self.sources,
+                self.output_dir,
+                every_s=self.every_s,
+                timestamps_ms=self.timestamps_ms,
+                filters=self.filters,
+                progress_cb=self.progression.emit,
+                cancel_event=self._cancel_event
+            )
+            self.termine.emit(True, str(manifest))
+        except ExportAnnule as e:
+            self.termine.emit(False, str(e))
+        except Exception as e:
+            print(f"❌ Extraction d'images échouée : {e}")
+            self.termine.emit(False, str(e))
+
 
 class ExtractionKosmosController(QObject):
     """
@@ -29,6 +172,8 @@ class ExtractionKosmosController(QObject):
     
     # Signal pour demander à l'application principale de changer de page
     navigation_demandee = pyqtSignal(str)
+    # Fin d'écriture d'une capture (émis depuis le thread d'écriture) : succès, nom ou erreur
+    capture_terminee = pyqtSignal(bool, str)
     
     def __init__(self, model, parent=None):
         super().__init__(parent)
@@ -38,7 +183,16 @@ class ExtractionKosmosController(QObject):
         # État local pour les corrections
         self.brightness = 0
         self.contrast = 0
-        self.pending_capture_name = None # Pour stocker le nom de la capture
+        self.export_queue = None # File d'export de la campagne (ExportQueue)
+        self.export_jobs = {} # id de tâche -> ExportJob en cours
+        self._export_callbacks = {} # id de tâche -> fonction appelée en fin d'export
+        self._export_echecs = {} # id de tâche -> fonction appelée si l'export échoue ou est annulé
+        self._export_progress = {} # id de tâche -> dernière progression reçue
+        self._export_previews = {} # id de tâche -> PreviewBuffer alimenté pendant l'export
+        self.dataset_job = None # Extraction d'images en cours (DatasetJob)
+        # Captures écrites hors du thread GUI (compression PNG / qualité JPEG-WebP réglables)
+        self.capture_writer = CaptureWriter(png_compression=3, quality=95)
+        self.capture_terminee.connect(self._on_capture_terminee)
         
     def set_view(self, view):
         """Associe la vue à ce contrôleur"""
@@ -87,6 +241,9 @@ class ExtractionKosmosController(QObject):
             
         # Mettre à jour la liste dans la vue
         self.view.update_video_list(videos_data)
+
+        # Relancer les exports restés en attente (file sauvegardée dans le workspace)
+        self._reprendre_file_export()
         
         # Si une vidéo était déjà sélectionnée dans le modèle, on la charge
         if self.model.video_selectionnee:
@@ -126,9 +283,12 @@ class ExtractionKosmosController(QObject):
         if not self.view:
             return
 
+        # Seules les données capteurs de la vidéo affichée restent en mémoire
+        if self.model.campagne_courante:
+            self.model.campagne_courante.liberer_donnees_lourdes(sauf=[video])
+
         # Utilisation des méthodes du modèle (Video) pour charger les données
-        video.charger_metadonnees_propres_json()
-        video.charger_metadonnees_communes_json()
+        video.charger_metadonnees_json()
         video.charger_donnees_timeseries_csv()
         
 
@@ -145,6 +305,13 @@ class ExtractionKosmosController(QObject):
             'timeseries_data': video.timeseries_data 
         }
 
+        # Station stéréo (*_Kstereo) : lire toutes ses vidéos de manière synchronisée,
+        # chacune recalée sur son heure de début
+        station = self.model.obtenir_flux_stereo(video.nom)
+        if station:
+            video_data['stream_paths'] = [v.chemin for v in station]
+            video_data['stream_offsets_ms'] = self.model.decalages_flux(station)
+
         # Demander à la vue de charger cette vidéo
         self.view.update_video_player(video_data)
 
@@ -315,14 +482,18 @@ class ExtractionKosmosController(QObject):
         # Demande au lecteur de capturer l'image, en lui passant la zone à recadrer.
         self.view.video_player.grab_frame(crop_rect)
 
-    def save_captured_frame(self, frame: 'QPixmap'):
+    def save_captured_frame(self, frame):
         """
-        Reçoit le QPixmap (déjà recadré si nécessaire), demande un nom à l'utilisateur,
-        puis sauvegarde l'image.
+        Reçoit la capture (ndarray BGR pleine résolution, déjà recadrée si nécessaire),
+        demande un nom à l'utilisateur, puis confie l'encodage et l'écriture au
+        CaptureWriter : le thread GUI ne fait aucune conversion.
+        Appelé directement par grab_frame : les métadonnées (frame, instant, capteurs)
+        sont relevées ici, avant la boîte de dialogue, pendant laquelle la lecture continue.
         """
-        if not frame:
+        if frame is None:
             self.view.show_message("Impossible de capturer l'image de la vidéo.", "error")
             return
+        metadonnees = self._metadonnees_capture()
 
         # 1. Demander le nom de la capture à la vue
         capture_name = self.view.ask_capture_name()
@@ -331,8 +502,6 @@ class ExtractionKosmosController(QObject):
             self.view.show_message("Capture annulée.", "info")
             return
 
-        self.pending_capture_name = capture_name
-
         # 2. Définir le chemin de sauvegarde
         workspace = self.model.campagne_courante.workspace_extraction
         if not workspace:
@@ -343,128 +512,345 @@ class ExtractionKosmosController(QObject):
         captures_dir = Path(workspace) / "captures"
         captures_dir.mkdir(parents=True, exist_ok=True)
 
-        # 3. Utiliser le nom fourni par l'utilisateur
-        filename = f"{self.pending_capture_name}.png"
+        # 3. Le format est choisi par l'extension saisie (PNG par défaut)
+        filename = capture_name.strip()
+        if Path(filename).suffix.lower() not in CAPTURE_FORMATS:
+            filename += ".png"
         save_path = captures_dir / filename
 
-        # 4. Sauvegarder l'image (qui est déjà recadrée)
-        try:
-            frame.save(str(save_path), "png", -1)
-            self.view.show_message(f"Capture enregistrée : {filename}", "success")
-            print(f"📸 Capture d'écran enregistrée sous : {save_path}")
-        except Exception as e:
-            self.view.show_message(f"Erreur lors de la sauvegarde : {e}", "error")
-            print(f"❌ Erreur sauvegarde capture : {e}")
-        finally:
-            # Réinitialiser le nom pour la prochaine capture
-            self.pending_capture_name = None
+        # 4. Écriture en tâche de fond, avec la fiche de métadonnées
+        self.capture_writer.submit(
+            frame, save_path, metadonnees,
+            on_done=lambda future, name=filename: self._signaler_capture(future, name)
+        )
+
+    def _signaler_capture(self, future, name):
+        """Appelé dans le thread d'écriture : relaie le résultat au thread GUI par signal."""
+        error = future.exception()
+        self.capture_terminee.emit(error is None, name if error is None else str(error))
+
+    def _metadonnees_capture(self):
+        """Instant de la capture dans la vidéo et valeurs des capteurs à cet instant."""
+        video = self.model.video_selectionnee
+        metadata = {'date_capture': datetime.datetime.now().isoformat(timespec='seconds')}
+        if video is not None:
+            metadata['video'] = video.nom
+            metadata['chemin_video'] = str(video.chemin)
+            metadata['debut_video'] = video.start_time_str
+        video_thread = getattr(getattr(self.view, 'video_player', None), 'video_thread', None)
+        if video_thread is not None and video_thread.fps:
+            position_ms = int((video_thread.current_frame / video_thread.fps) * 1000)
+            metadata['frame'] = int(video_thread.current_frame)
+            metadata['timestamp_ms'] = position_ms
+            metadata['horodatage'] = str(datetime.timedelta(milliseconds=position_ms))
+            if video is not None and video.timeseries_data:
+                metadata['capteurs'] = video.timeseries_data.sample_at(position_ms)
+        if self.view and hasattr(self.view, 'video_player'):
+            metadata['filtres'] = list(self.view.video_player.active_filters)
+        return metadata
+
+    def _on_capture_terminee(self, succes, message):
+        """Fin d'écriture d'une capture (thread GUI, via le signal capture_terminee)."""
+        if succes:
+            self.view.show_message(f"Capture enregistrée : {message}", "success")
+        else:
+            self.view.show_message(f"Erreur lors de la sauvegarde : {message}", "error")
+            print(f"❌ Erreur sauvegarde capture : {message}")
             
-    def _export_video_with_filters(self, source_path, output_path, start_ms, end_ms):
+    # ═══════════════════════════════════════════════════════════════
+    # FILE D'EXPORT
+    # ═══════════════════════════════════════════════════════════════
+
+    def _file_export(self):
+        """File d'export de la campagne courante (rechargée si le workspace change)."""
+        campagne = self.model.campagne_courante
+        dossier = campagne.workspace_extraction if campagne else None
+        if self.export_queue is None or self.export_queue.dossier != dossier:
+            if self.export_jobs:
+                # Ne pas changer de file pendant que des exports tournent
+                return self.export_queue
+            self.export_queue = ExportQueue.charger(dossier) if dossier else ExportQueue()
+        return self.export_queue
+
+    def _reprendre_file_export(self):
+        """Relance les exports restés en attente lors de la dernière session."""
+        queue = self._file_export()
+        if queue.en_attente():
+            print(f"🔁 Reprise de {len(queue.en_attente())} export(s) en attente")
+            self._traiter_file_export()
+
+    def _ajouter_export(self, source_path, output_path, start_ms, end_ms, filters=None,
+                        on_success=None, type_export='recording', persistante=True, preview=None,
+                        sorties=None, resume=None, on_failure=None):
         """
-        Exporte une portion de vidéo en appliquant les filtres actifs via OpenCV
-        et en encodant via FFmpeg (pipe).
+        Ajoute un clip à la file d'export avec un instantané de la chaîne de filtres
+        (celle du lecteur si `filters` n'est pas fourni).
+        `on_success(output_path)` est appelé dans le thread GUI à la fin de l'export.
+        `on_failure(message, annule)` remplace le message d'erreur générique si l'export
+        échoue ou est annulé (thread GUI également).
+        `preview` (PreviewBuffer) reçoit les frames filtrées pendant l'encodage.
+        `sorties` : plusieurs sorties produites en une seule passe (voir export_multi).
+        `resume` : paramètres du résumé d'activité (voir export_activity_summary).
         """
-        import cv2
-        
-        cap = cv2.VideoCapture(str(source_path))
-        if not cap.isOpened():
-            raise Exception("Impossible d'ouvrir la vidéo source")
-            
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_ms)
-        
-        duration_ms = end_ms - start_ms
-        duration_s = duration_ms / 1000.0
-        frames_to_process = int(duration_s * fps)
-        
-        start_str = str(datetime.timedelta(milliseconds=start_ms))
-
-        cmd = [
-            'ffmpeg', '-y',
-            '-loglevel', 'error', # Réduire la verbosité pour éviter le blocage du pipe stderr
-            '-f', 'rawvideo',
-            '-vcodec', 'rawvideo',
-            '-s', f'{width}x{height}',
-            '-pix_fmt', 'bgr24',
-            '-r', str(fps),
-            '-i', '-', 
-            '-ss', start_str,
-            '-i', str(source_path),
-            '-t', str(duration_s),
-            '-map', '0:v',
-            '-map', '1:a?', # Audio optionnel
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',
-            '-c:a', 'aac',
-            '-b:a', '128k',
-            str(output_path)
-        ]
-        
-        print(f"🚀 Commande FFmpeg: {' '.join(cmd)}")
-        
-        creation_flags = 0
-        if sys.platform == "win32":
-            creation_flags = subprocess.CREATE_NO_WINDOW
-            
-        process = subprocess.Popen(
-            cmd, 
-            stdin=subprocess.PIPE, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            creationflags=creation_flags
+        if filters is None:
+            filters = {}
+            if self.view and hasattr(self.view, 'video_player'):
+                filters = self.view.video_player.active_filters
+
+        tache = ExportTache(
+            source_path, output_path, start_ms, end_ms,
+            filtres_vers_json(filters),
+            type_export=type_export,
+            persistante=persistante,
+            sorties=sorties,
+            resume=resume
         )
-        
-        filters = []
-        if self.view and hasattr(self.view, 'video_player'):
-            filters = self.view.video_player.active_filters
-            
-        print(f"🎬 Export avec filtres ({len(filters)} actifs)...")
-        
-        try:
-            count = 0
-            while count < frames_to_process:
-                # Garder l'interface réactive
-                QApplication.processEvents()
-                
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                    
-                # Appliquer les filtres
-                if filters:
-                    for name, (filter_func, kwargs) in filters.items():
-                        try:
-                            frame = filter_func(frame, **kwargs)
-                        except Exception as e:
-                            print(f"⚠️ Erreur filtre {name}: {e}")
-                
-                # Écrire dans le pipe
-                try:
-                    process.stdin.write(frame.tobytes())
-                except IOError as e:
-                    print(f"❌ Erreur écriture pipe: {e}")
-                    break
-                    
-                count += 1
-                
-        finally:
-            cap.release()
-            if process.stdin:
-                process.stdin.close()
-            
-            # Attendre la fin du processus et récupérer stderr
-            stdout_data, stderr_data = process.communicate()
-            
-            if process.returncode != 0:
-                stderr_output = stderr_data.decode('utf-8', errors='replace') if stderr_data else "Erreur inconnue"
-                print(f"❌ Erreur FFmpeg (code {process.returncode}): {stderr_output}")
-                raise Exception(f"Erreur lors de l'encodage FFmpeg: {stderr_output[-200:]}")
+        self._file_export().ajouter(tache)
+        if on_success:
+            self._export_callbacks[tache.id] = on_success
+        if on_failure:
+            self._export_echecs[tache.id] = on_failure
+        if preview is not None:
+            self._export_previews[tache.id] = preview
+        self._traiter_file_export()
+        return tache
+
+    def _traiter_file_export(self):
+        """Démarre les tâches en attente dans la limite de max_concurrent."""
+        queue = self._file_export()
+        for tache in queue.prochaines():
+            # Le contrôleur est parent du thread : il survit à la fin de run()
+            job = ExportJob(
+                tache.source, tache.destination, tache.start_ms, tache.end_ms,
+                filtres_depuis_json(tache.filtres),
+                preview=self._export_previews.get(tache.id),
+                sorties=tache.sorties,
+                resume=tache.resume,
+                parent=self
+            )
+            job.finished.connect(job.deleteLater)
+            self.export_jobs[tache.id] = job
+            queue.marquer(tache.id, EN_COURS)
+
+            job.progression.connect(
+                lambda done, total, fps, eta, tache_id=tache.id: self._on_export_progression(tache_id, done, total, fps, eta)
+            )
+            job.termine.connect(
+                lambda succes, message, tache_id=tache.id: self._on_export_termine(tache_id, succes, message)
+            )
+            job.start()
+            print(f"🎬 Export démarré : {tache.nom}")
+
+        if self.export_jobs and self.view and hasattr(self.view, 'open_export_progress'):
+            if getattr(self.view, 'export_progress_dialog', None) is None:
+                self.view.open_export_progress("Export en cours", self.annuler_exports)
+            self._rafraichir_progression_export()
+
+    def _on_export_progression(self, tache_id, done, total, fps, eta):
+        self._export_progress[tache_id] = (done, total, fps, eta)
+        self._rafraichir_progression_export()
+
+    def _rafraichir_progression_export(self):
+        """Progression agrégée des exports en cours (la vue n'affiche qu'une barre)."""
+        if not self.view or not hasattr(self.view, 'update_export_progress'):
+            return
+        running = [self._export_progress.get(tache_id, (0, 0, 0.0, -1.0)) for tache_id in self.export_jobs]
+        done = sum(p[0] for p in running)
+        total = sum(p[1] for p in running)
+        fps = sum(p[2] for p in running)
+        eta = max((p[3] for p in running), default=-1.0)
+        nb_attente = len(self._file_export().en_attente())
+        details = f"{len(running)} export(s) en cours, {nb_attente} en attente"
+        self.view.update_export_progress(done, total, fps, eta, details)
+
+    def _on_export_termine(self, tache_id, succes, message):
+        job = self.export_jobs.pop(tache_id, None)
+        self._export_progress.pop(tache_id, None)
+        self._export_previews.pop(tache_id, None)
+        callback = self._export_callbacks.pop(tache_id, None)
+        echec = self._export_echecs.pop(tache_id, None)
+        queue = self._file_export()
+        tache = queue.obtenir(tache_id)
+
+        if succes:
+            queue.marquer(tache_id, TERMINE)
+            if callback:
+                callback(Path(message))
+            elif tache:
+                self.view.show_message(f"Export '{tache.nom}' terminé !", "success")
+        elif job is not None and job.annule:
+            queue.marquer(tache_id, ANNULE, message)
+            if echec:
+                echec(message, True)
+        else:
+            queue.marquer(tache_id, ERREUR, message)
+            if echec:
+                echec(message, False)
             else:
-                print("✅ Export FFmpeg terminé avec succès.")
+                nom = tache.nom if tache else tache_id
+                self.view.show_message(f"Erreur lors de l'export de '{nom}' : {message}", "error")
+
+        self._traiter_file_export()
+        if not self.export_jobs:
+            queue.purger()
+            if hasattr(self.view, 'close_export_progress'):
+                self.view.close_export_progress()
+
+    def annuler_export(self, tache_id):
+        """Annule une seule tâche : arrêt de l'export en cours ou retrait de la file."""
+        job = self.export_jobs.get(tache_id)
+        if job is not None:
+            job.annuler()
+            return
+        queue = self._file_export()
+        tache = queue.obtenir(tache_id)
+        if tache is not None and tache.statut == EN_ATTENTE:
+            queue.marquer(tache_id, ANNULE)
+        self._export_callbacks.pop(tache_id, None)
+        self._export_echecs.pop(tache_id, None)
+        preview = self._export_previews.pop(tache_id, None)
+        if preview is not None:
+            preview.finish()
+
+    def annuler_exports(self):
+        """Annule les exports en cours et vide la file d'attente."""
+        nb = self._file_export().annuler_en_attente()
+        for job in self.export_jobs.values():
+            job.annuler()
+        self.view.show_message(f"Exports annulés ({len(self.export_jobs)} en cours, {nb} en attente).", "info")
+
+    def on_batch_export(self):
+        """Ajoute à la file l'export complet de toutes les vidéos conservées avec un préréglage."""
+        campagne = self.model.campagne_courante
+        if not self.view or not campagne:
+            return
+
+        videos = campagne.obtenir_videos_conservees()
+        if not videos:
+            self.view.show_message("Aucune vidéo conservée à exporter.", "warning")
+            return
+
+        preset = self.view.ask_export_preset(list(EXPORT_PRESETS))
+        if not preset:
+            self.view.show_message("Export par lot annulé.", "info")
+            return
+
+        # Sorties produites pour chaque vidéo, en une seule passe de décodage
+        profil = self.view.ask_output_profile(list(OUTPUT_PROFILES))
+        if not profil:
+            self.view.show_message("Export par lot annulé.", "info")
+            return
+
+        batch_dir = Path(campagne.workspace_extraction) / "batch" / preset
+        batch_dir.mkdir(parents=True, exist_ok=True)
+        filters = filtres_preset(preset)
+
+        nb = 0
+        for video in videos:
+            duration_ms = int(probe_media(video.chemin)['duree_s'] * 1000)
+            if duration_ms <= 0:
+                print(f"⚠️ Durée inconnue, vidéo ignorée : {video.nom}")
+                continue
+            output_path = batch_dir / f"{Path(video.nom).stem}.mp4"
+            sorties = sorties_profil(profil, output_path) if len(OUTPUT_PROFILES[profil]) > 1 else None
+            self._ajouter_export(video.chemin, output_path, 0, duration_ms, filters, type_export='batch',
+                                 sorties=sorties)
+            nb += 1
+
+        self.view.show_message(f"{nb} vidéo(s) ajoutée(s) à la file d'export ({preset}, {profil}).", "info")
+
+    def on_activity_summary(self):
+        """Ajoute à la file un résumé d'activité (passages avec sujets en mouvement) de chaque vidéo conservée."""
+        campagne = self.model.campagne_courante
+        if not self.view or not campagne:
+            return
+
+        videos = campagne.obtenir_videos_conservees()
+        if not videos:
+            self.view.show_message("Aucune vidéo conservée à résumer.", "warning")
+            return
+
+        options = self.view.ask_summary_options(list(EXPORT_PRESETS), SUMMARY_PAD_BEFORE_S, SUMMARY_PAD_AFTER_S)
+        if not options:
+            self.view.show_message("Résumé d'activité annulé.", "info")
+            return
+        pad_before_s, pad_after_s, preset = options
+
+        resume_dir = Path(campagne.workspace_extraction) / "resumes"
+        resume_dir.mkdir(parents=True, exist_ok=True)
+        filters = filtres_preset(preset)
+        resume = {'pad_before_s': pad_before_s, 'pad_after_s': pad_after_s}
+
+        nb = 0
+        for video in videos:
+            duration_ms = int(probe_media(video.chemin)['duree_s'] * 1000)
+            if duration_ms <= 0:
+                print(f"⚠️ Durée inconnue, vidéo ignorée : {video.nom}")
+                continue
+            output_path = resume_dir / f"{Path(video.nom).stem}_resume.mp4"
+            self._ajouter_export(video.chemin, output_path, 0, duration_ms, filters, type_export='resume',
+                                 resume=resume)
+            nb += 1
+
+        self.view.show_message(f"{nb} résumé(s) d'activité ajouté(s) à la file d'export ({preset}).", "info")
+
+    def on_extract_dataset(self):
+        """Extrait des images de toutes les vidéos conservées selon un plan d'échantillonnage."""
+        campagne = self.model.campagne_courante
+        if not self.view or not campagne:
+            return
+        if self.dataset_job is not None:
+            self.view.show_message("Une extraction d'images est déjà en cours.", "warning")
+            return
+
+        videos = campagne.obtenir_videos_conservees()
+        if not videos:
+            self.view.show_message("Aucune vidéo conservée.", "warning")
+            return
+
+        options = self.view.ask_dataset_options(list(EXPORT_PRESETS))
+        if not options:
+            self.view.show_message("Extraction d'images annulée.", "info")
+            return
+        plan, preset = options
+        try:
+            every_s, timestamps_ms = parse_sampling_plan(plan)
+        except ValueError as e:
+            self.view.show_message(f"Plan d'échantillonnage invalide : {e}", "error")
+            return
+
+        # Valeurs capteurs du manifeste : séries temporelles de chaque vidéo
+        sources = []
+        for video in videos:
+            video.charger_donnees_timeseries_csv()
+            data = video.timeseries_data
+            # La série reste référencée par la source le temps de l'extraction seulement
+            if video is not self.model.video_selectionnee:
+                video.liberer_donnees_lourdes()
+            sources.append({
+                'nom': video.nom,
+                'chemin': video.chemin,
+                'capteurs': data.sample_at if data else None
+            })
+
+        suffixe = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = Path(campagne.workspace_extraction) / "captures" / f"dataset_{suffixe}"
+        job = DatasetJob(sources, output_dir, every_s, timestamps_ms, filtres_preset(preset), parent=self)
+        job.finished.connect(job.deleteLater)
+        job.progression.connect(self.view.update_dataset_progress)
+        job.termine.connect(self._on_dataset_termine)
+        self.dataset_job = job
+        self.view.open_dataset_progress(job.annuler)
+        job.start()
+        print(f"🖼️ Extraction d'images démarrée vers {output_dir}")
+
+    def _on_dataset_termine(self, succes, message):
+        self.dataset_job = None
+        self.view.close_dataset_progress()
+        if succes:
+            self.view.show_message(f"Images extraites. Manifeste : {Path(message).name} ({Path(message).parent.name})", "success")
+        else:
+            self.view.show_message(f"Extraction d'images interrompue : {message}", "warning")
 
     def on_recording(self):
         """Démarre/Arrête l'enregistrement d'un extrait"""
@@ -501,29 +887,22 @@ class ExtractionKosmosController(QObject):
             self.view.show_message("Enregistrement annulé.", "info")
             return
 
-        try:
-            rec_name, final_start_ms, final_end_ms = result
-            
-            final_start_str = str(datetime.timedelta(milliseconds=final_start_ms))
-            final_duration_s = (final_end_ms - final_start_ms) / 1000
+        rec_name, final_start_ms, final_end_ms = result
 
-            recordings_dir = Path(self.model.campagne_courante.workspace_extraction) / "recordings"
-            recordings_dir.mkdir(parents=True, exist_ok=True)
-            final_output_path = recordings_dir / f"{rec_name}.mp4"
+        recordings_dir = Path(self.model.campagne_courante.workspace_extraction) / "recordings"
+        recordings_dir.mkdir(parents=True, exist_ok=True)
+        final_output_path = recordings_dir / f"{rec_name}.mp4"
 
-            self.view.show_message("Enregistrement de l'extrait final...", "info")
-            
-            # Utiliser la nouvelle méthode d'export avec filtres
-            self._export_video_with_filters(
-                self.model.video_selectionnee.chemin,
-                final_output_path,
-                final_start_ms,
-                final_end_ms
-            )
-            
-            self.view.show_message(f"Enregistrement '{rec_name}.mp4' sauvegardé !", "success")
-        except Exception as e:
-            self.view.show_message(f"Erreur enregistrement final: {e}", "error")
+        self.view.show_message("Enregistrement de l'extrait final...", "info")
+
+        # Export avec filtres via la file d'export (tâche de fond)
+        self._ajouter_export(
+            self.model.video_selectionnee.chemin,
+            final_output_path,
+            final_start_ms,
+            final_end_ms,
+            on_success=lambda path: self.view.show_message(f"Enregistrement '{path.name}' sauvegardé !", "success")
+        )
                     
     def on_create_short(self):
         """Crée un short (extrait court format vertical ou spécifique)"""
@@ -570,84 +949,94 @@ class ExtractionKosmosController(QObject):
         shorts_dir = extraction_dir / "shorts"
         shorts_dir.mkdir(parents=True, exist_ok=True)
         
-        temp_filtered_path = shorts_dir / f"~temp_filtered.mp4"
-        temp_preview_path = shorts_dir / f"~preview_temp.mp4"
+        # Nom unique : plusieurs shorts peuvent être dans la file d'export
+        suffixe = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        temp_filtered_path = shorts_dir / f"~temp_filtered_{suffixe}.mp4"
+
+        # 4. Encoder le short une seule fois, en tâche de fond. L'aperçu (x2) est construit
+        #    en mémoire à partir des frames filtrées au fil de l'encodage.
+        fps = video_thread.fps or 25
+        end_ms = start_ms + int(clip_duration_s * 1000)
+        preview = PreviewBuffer(fps=fps, speed=2, total_frames=int(clip_duration_s * fps))
+        short = {'temp': temp_filtered_path, 'dossier': shorts_dir, 'nom': None, 'exporte': False, 'annule': False,
+                 'echec': None}
+        tache = self._ajouter_export(
+            self.model.video_selectionnee.chemin,
+            temp_filtered_path,
+            start_ms,
+            end_ms,
+            on_success=lambda path: self._on_short_exporte(short),
+            on_failure=lambda message, annule: self._on_short_echoue(short, message, annule),
+            type_export='short',
+            persistante=False, # L'aperçu est interactif : pas de reprise au redémarrage
+            preview=preview
+        )
 
-        # 4. Créer un aperçu accéléré avec filtres
-        try:
-            self.view.show_message("Génération de l'aperçu avec filtres...", "info")
-            
-            # Étape 1: Générer le clip filtré à vitesse normale
-            end_ms = start_ms + int(clip_duration_s * 1000)
-            self._export_video_with_filters(
-                self.model.video_selectionnee.chemin,
-                temp_filtered_path,
-                start_ms,
-                end_ms
-            )
-            
-            # Étape 2: Accélérer ce clip pour l'aperçu (x2)
-            cmd_preview = [
-                'ffmpeg', '-y',
-                '-i', str(temp_filtered_path),
-                '-vf', 'setpts=0.5*PTS',
-                '-af', 'atempo=2.0',
-                '-preset', 'ultrafast',
-                '-crf', '28',
-                str(temp_preview_path)
-            ]
-            
-            creation_flags = 0
-            if sys.platform == "win32":
-                creation_flags = subprocess.CREATE_NO_WINDOW
-                
-            subprocess.run(cmd_preview, check=True, capture_output=True, text=True, creationflags=creation_flags)
-            
-        except Exception as e:
-            self.view.show_message(f"Erreur création aperçu: {e}", "error")
-            # Nettoyage en cas d'erreur
-            if temp_filtered_path.exists(): temp_filtered_path.unlink()
+        # 5. Afficher l'aperçu immédiatement, pendant l'encodage
+        short_name = self.view.open_short_preview(preview)
+
+        # 6. Annulé : arrêter l'encodage et nettoyer le fichier temporaire
+        if not short_name:
+            short['annule'] = True
+            self.annuler_export(tache.id)
+            self._supprimer_temp_short(short)
+            self.view.show_message("Enregistrement annulé.", "info")
             return
 
-        # 5. Afficher la boîte de dialogue d'aperçu via la vue
-        short_name = self.view.open_short_preview(str(temp_preview_path))
+        short['nom'] = short_name
+        if short['echec'] is not None:
+            # L'encodage a échoué pendant l'aperçu
+            self._signaler_short_non_enregistre(short)
+        elif short['exporte']:
+            self._enregistrer_short(short)
+        else:
+            self.view.show_message(
+                f"Encodage du short '{short_name}.mp4' en cours : il sera enregistré dès qu'il aboutit.", "info"
+            )
 
-        try:
-            # 6. Si l'utilisateur a cliqué sur "Enregistrer" et entré un nom
-            if short_name:
-                try:
-                    if not short_name:
-                        self.view.show_message("Enregistrement annulé : nom vide.", "warning")
-                        return
-
-                    self.view.show_message("Enregistrement du short final...", "info")
-                    final_output_path = shorts_dir / f"{short_name}.mp4"
-                    
-                    
-                    if temp_filtered_path.exists():
-                        import shutil
-                        shutil.move(str(temp_filtered_path), str(final_output_path))
-                        self.view.show_message(f"Short '{short_name}.mp4' enregistré !", "success")
-                    else:
-                        raise Exception("Le fichier temporaire a disparu.")
-                        
-                except Exception as e:
-                    self.view.show_message(f"Erreur enregistrement final: {e}", "error")
+    def _on_short_exporte(self, short):
+        """Fin de l'encodage d'un short : enregistrement si le nom est déjà choisi."""
+        short['exporte'] = True
+        if short['annule']:
+            self._supprimer_temp_short(short)
+        elif short['nom']:
+            self._enregistrer_short(short)
+
+    def _on_short_echoue(self, short, message, annule):
+        """Encodage d'un short en échec ou annulé : rien n'est enregistré, le fichier temporaire est supprimé."""
+        short['echec'] = "encodage annulé" if annule else message
+        self._supprimer_temp_short(short)
+        if short['annule']:
+            return # Annulé depuis l'aperçu : l'utilisateur est déjà prévenu
+        if short['nom']:
+            self._signaler_short_non_enregistre(short)
+        # Sinon l'aperçu est encore ouvert : prévenu à sa fermeture (on_create_short)
+
+    def _signaler_short_non_enregistre(self, short):
+        print(f"❌ Short '{short['nom']}' non enregistré : {short['echec']}")
+        self.view.show_message(
+            f"Le short '{short['nom']}.mp4' n'a pas été enregistré : {short['echec']}", "error"
+        )
 
-            else:
-                self.view.show_message("Enregistrement annulé.", "info")
+    def _enregistrer_short(self, short):
+        """Renomme le fichier encodé avec le nom choisi dans l'aperçu."""
+        final_output_path = short['dossier'] / f"{short['nom']}.mp4"
+        try:
+            if not short['temp'].exists():
+                raise Exception("Le fichier temporaire a disparu.")
+            import shutil
+            shutil.move(str(short['temp']), str(final_output_path))
+            self.view.show_message(f"Short '{short['nom']}.mp4' enregistré !", "success")
+        except Exception as e:
+            self.view.show_message(f"Erreur enregistrement final: {e}", "error")
+            self._supprimer_temp_short(short)
 
-        finally:
-            # 7. Nettoyer les fichiers temporaires
-            if temp_preview_path.exists():
-                try:
-                    temp_preview_path.unlink()
-                except OSError: pass
-            # Si le fichier filtré n'a pas été déplacé (ex: annulé), on le supprime
-            if temp_filtered_path.exists():
-                try:
-                    temp_filtered_path.unlink()
-                except OSError: pass
+    @staticmethod
+    def _supprimer_temp_short(short):
+        if short['temp'].exists():
+            try:
+                short['temp'].unlink()
+            except OSError: pass
 
 
     def _generer_miniature_video(self, chemin_video):
@@ -659,18 +1048,19 @@ class ExtractionKosmosController(QObject):
             QPixmap ou None si échec
         """
         try:
-            import cv2
             from PyQt6.QtGui import QImage, QPixmap
-            cap = cv2.VideoCapture(chemin_video)
+            from kosmos_processing.decoders import open_decoder
+            # Une miniature n'a pas besoin d'une frame pleine résolution. Backend OpenCV :
+            # pour une seule frame, lancer ffprobe puis ffmpeg coûte plus que le décodage
+            cap = open_decoder(chemin_video, backend='opencv', max_side=320, pix_fmt='rgb24')
             if not cap.isOpened():
                 print(f"⚠️ Impossible d'ouvrir la vidéo : {chemin_video}")
                 return None
-            ret, frame = cap.read()
+            ret, frame_rgb = cap.read()
             cap.release()
-            if not ret or frame is None:
+            if not ret or frame_rgb is None:
                 print(f"⚠️ Impossible de lire la première frame : {chemin_video}")
                 return None
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             height, width, channel = frame_rgb.shape
             bytes_per_line = 3 * width
             q_image = QImage(frame_rgb.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
@@ -4,13 +4,45 @@ Architecture MVC
 """
 import sys
 import os
+import threading
 from pathlib import Path
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 
+class ImportJob(QThread):
+    """
+    Importation d'un dossier de campagne en tâche de fond (pool de threads sur les
+    dossiers de stations). Les vidéos analysées et la progression sont émises au fil de l'eau.
+    Le thread ne fait qu'analyser : `termine` porte l'analyse, appliquée à la campagne
+    dans le thread GUI (appliquer_import_kosmos), seul à modifier ses index.
+    """
+
+    progression = pyqtSignal(int, int) # dossiers analysés, dossiers totaux
+    video_importee = pyqtSignal(str, bool) # nom de la vidéo, métadonnées trouvées
+    termine = pyqtSignal(dict)
+
+    def __init__(self, model, chemin_dossier, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.chemin_dossier = chemin_dossier
+        self._cancel_event = threading.Event()
+
+    def annuler(self):
+        self._cancel_event.set()
+
+    def run(self):
+        analyse = self.model.analyser_import_kosmos(
+            self.chemin_dossier,
+            progress_cb=self.progression.emit,
+            video_cb=lambda video, avec_metadata: self.video_importee.emit(video.nom, avec_metadata),
+            cancel_event=self._cancel_event
+        )
+        self.termine.emit(analyse)
+
+
 class ImportationKosmosController(QObject):
     """Contrôleur pour la page d'importation"""
     
@@ -21,6 +53,7 @@ class ImportationKosmosController(QObject):
         super().__init__(parent)
         self.model = model
         self.view = None
+        self.import_job = None
 
     def set_view(self, view):
         """Associe la vue au contrôleur"""
@@ -37,6 +70,10 @@ class ImportationKosmosController(QObject):
         if not self.model.campagne_courante:
             self.view.show_error("Pas de campagne", "Créez d'abord une campagne depuis Fichier > Créer campagne.")
             return
+
+        if self.import_job is not None:
+            self.view.show_warning("Importation en cours", "Une importation est déjà en cours.")
+            return
         
         print(f"📁 Dossier à importer : {chemin_dossier}")
         
@@ -55,9 +92,30 @@ class ImportationKosmosController(QObject):
             
             print(f"📹 Lancement de l'importation...")
             
-            # Importer les vidéos
-            resultats = self.model.importer_videos_kosmos(chemin_dossier)
+            # Importer les vidéos hors du thread GUI
+            job = ImportJob(self.model, chemin_dossier, parent=self)
+            job.finished.connect(job.deleteLater)
+            job.progression.connect(self.view.update_import_progress)
+            job.video_importee.connect(self.view.add_imported_video)
+            job.termine.connect(self._on_import_termine)
+            self.import_job = job
+            self.view.open_import_progress(job.annuler)
+            job.start()
             
+        except Exception as e:
+            self.view.show_error(
+                "Erreur d'importation",
+                f"Une erreur s'est produite lors de l'importation :\n\n{str(e)}"
+            )
+            print(f"❌ Erreur : {e}")
+
+    def _on_import_termine(self, analyse):
+        """Fin de l'importation (thread GUI) : application à la campagne, sauvegarde, bilan et navigation vers le tri."""
+        self.import_job = None
+        self.view.close_import_progress()
+        try:
+            resultats = self.model.appliquer_import_kosmos(analyse)
+
             # Sauvegarder
             self.model.sauvegarder_campagne()
             
@@ -65,17 +123,26 @@ class ImportationKosmosController(QObject):
             nb_importees = len(resultats['videos_importees'])
             nb_sans_meta = len(resultats['videos_sans_metadata'])
             nb_erreurs = len(resultats['erreurs'])
+            nb_inchangees = len(resultats.get('videos_inchangees', []))
+            nb_mises_a_jour = len(resultats.get('videos_mises_a_jour', []))
+            nb_supprimees = len(resultats.get('videos_supprimees', []))
             
-            if nb_importees == 0:
+            if nb_importees == 0 and nb_inchangees == 0:
                 self.view.show_warning(
                     "Aucune vidéo",
-                    "Aucune vidéo n'a été trouvée dans ce dossier."
+                    "Importation annulée." if resultats.get('annule') else "Aucune vidéo n'a été trouvée dans ce dossier."
                 )
                 return
             
-            message = f"✅ Importation terminée !\n\n"
+            if resultats.get('annule'):
+                message = f"⏹️ Importation interrompue.\n\n"
+            else:
+                message = f"✅ Importation terminée !\n\n"
             message += f"📹 Vidéos importées : {nb_importees}\n"
             
+            if nb_inchangees or nb_mises_a_jour or nb_supprimees:
+                message += f"♻️  Inchangées : {nb_inchangees} — mises à jour : {nb_mises_a_jour} — retirées : {nb_supprimees}\n"
+            
             if nb_sans_meta > 0:
                 message += f"⚠️  Vidéos sans métadonnées : {nb_sans_meta}\n"
             
@@ -96,4 +163,4 @@ class ImportationKosmosController(QObject):
                 "Erreur d'importation",
                 f"Une erreur s'est produite lors de l'importation :\n\n{str(e)}"
             )
-            print(f"❌ Erreur : {e}")
\ No newline at end of file
+            print(f"❌ Erreur : {e}")
@@ -8,8 +8,9 @@ import csv
 import json
 import os
 import re  
+import threading
 from pathlib import Path
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
 from datetime import datetime
 
 
@@ -23,6 +24,73 @@ except ImportError:
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from kosmos_processing.export import ExportAnnule
+from kosmos_processing.storyboard import generate_storyboards, storyboard_existant
+
+
+class StoryboardJob(QThread):
+    """Génère en tâche de fond les storyboards d'une liste de vidéos."""
+
+    progression = pyqtSignal(int, int) # vidéos traitées, total
+    storyboard_pret = pyqtSignal(str, str) # chemin de la vidéo, chemin de la planche
+    termine = pyqtSignal(bool, str)
+
+    def __init__(self, video_paths, output_dir=None, parent=None):
+        super().__init__(parent)
+        self.video_paths = video_paths
+        self.output_dir = output_dir
+        self._cancel_event = threading.Event()
+
+    def annuler(self):
+        self._cancel_event.set()
+
+    def _on_result(self, video_path, paths):
+        if paths:
+            self.storyboard_pret.emit(video_path, str(paths['planche']))
+
+    def run(self):
+        try:
+            results = generate_storyboards(
+                self.video_paths,
+                self.output_dir,
+                progress_cb=self.progression.emit,
+                result_cb=self._on_result,
+                cancel_event=self._cancel_event
+            )
+            faits = sum(1 for paths in results.values() if paths)
+            self.termine.emit(True, f"{faits}/{len(results)} storyboard(s) prêts")
+        except ExportAnnule as e:
+            self.termine.emit(False, str(e))
+        except Exception as e:
+            print(f"❌ Génération des storyboards échouée : {e}")
+            self.termine.emit(False, str(e))
+
+
+class DureesJob(QThread):
+    """Lit en tâche de fond les durées manquantes des vidéos d'une campagne."""
+
+    duree_resolue = pyqtSignal(str, str) # chemin de la vidéo, durée 'HH:MM:SS'
+    termine = pyqtSignal(int) # nombre de durées lues
+
+    def __init__(self, model, chemins, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.chemins = chemins
+        self._cancel_event = threading.Event()
+
+    def annuler(self):
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            durees = self.model.resoudre_durees(
+                self.chemins, duree_cb=self.duree_resolue.emit, cancel_event=self._cancel_event
+            )
+            self.termine.emit(len(durees))
+        except Exception as e:
+            print(f"❌ Lecture des durées échouée : {e}")
+            self.termine.emit(0)
+
 
 class TriKosmosController(QObject):
     """Contrôleur pour la page de tri"""
@@ -31,10 +99,19 @@ class TriKosmosController(QObject):
     video_selectionnee = pyqtSignal(object)
     succes_operation = pyqtSignal(str) # Signal pour notifier le succès d'une opération
     erreur_operation = pyqtSignal(str) # Signal pour notifier une erreur
+    storyboard_pret = pyqtSignal(str, str) # chemin de la vidéo, chemin de la planche
+    duree_resolue = pyqtSignal(str, str) # chemin de la vidéo, durée (les noms peuvent se répéter)
     
     def __init__(self, model, parent=None):
         super().__init__(parent)
         self.model = model
+        self.storyboard_job = None
+        self._storyboards_campagne = False # Le job en cours couvre toute la campagne
+        # Job annulé qui finit sa vignette en cours (jamais attendu dans le thread GUI)
+        # et demande arrivée entre-temps, lancée dès qu'il se termine
+        self._storyboard_job_annule = None
+        self._storyboards_en_attente = None # (chemins, campagne)
+        self.durees_job = None
     
     
     def obtenir_videos(self):
@@ -64,6 +141,10 @@ class TriKosmosController(QObject):
         return self.model.supprimer_fichier_video(nom_video)
 
    
+    def charger_toutes_metadonnees_json(self, video) -> bool:
+        """Charge les métadonnées propres et communes en une seule lecture du JSON (en cache)."""
+        return video.charger_metadonnees_json()
+
     def charger_metadonnees_depuis_json(self, video) -> bool:
         """Charge les métadonnées propres (section 'video' uniquement) depuis le JSON."""
         return video.charger_metadonnees_propres_json()
@@ -107,8 +188,7 @@ class TriKosmosController(QObject):
                     return False, f"Erreur de type pour le champ '{key}' :\nLa valeur '{value}' n'est pas un nombre valide."
 
         # 2. Mise à jour (si tout est valide)
-        for key, value in metadonnees.items():
-            video.metadata_propres[key] = value
+        self.model.modifier_metadonnees_propres(nom_video, metadonnees)
         
         if self.sauvegarder_metadonnees_vers_json(video, nom_utilisateur):
             self.succes_operation.emit("Les métadonnées ont été modifiées avec succès !")
@@ -146,6 +226,9 @@ class TriKosmosController(QObject):
                 print(f"❌ Échec sauvegarde communes pour {video.nom}")
             else:
                 nb_videos_maj += 1
+
+        # Base SQLite : seuls les champs propagés sont réécrits, pas les lignes entières
+        self.model.campagne_courante.enregistrer_metadonnees_communes(metadonnees)
         
         if succes_global:
             self.succes_operation.emit(f"Sauvegarde réussie et propagée à {nb_videos_maj} vidéos.")
@@ -165,6 +248,109 @@ class TriKosmosController(QObject):
     def get_angle_seek_times(self, nom_video: str):
         return self.model.get_angle_event_times(nom_video)
 
+    def dossier_storyboards(self):
+        """Dossier des storyboards : workspace d'extraction de la campagne, sinon à côté des vidéos."""
+        campagne = self.model.campagne_courante
+        if campagne and campagne.workspace_extraction:
+            return Path(campagne.workspace_extraction) / "storyboards"
+        return None
+
+    def chemin_storyboard(self, video):
+        """Planche storyboard à jour de la vidéo (str) ou None, sans relire la vidéo."""
+        paths = storyboard_existant(video.chemin, self.dossier_storyboards())
+        return str(paths['planche']) if paths else None
+
+    def lancer_resolution_durees(self):
+        """Lit en arrière-plan les durées manquantes (campagne ouverte sans attendre ces lectures)."""
+        if not self.model.campagne_courante or (self.durees_job and self.durees_job.isRunning()):
+            return
+        chemins = [
+            v.chemin for v in self.model.campagne_courante.obtenir_videos_sans_duree()
+            if v.chemin and os.path.exists(v.chemin)
+        ]
+        if not chemins:
+            return
+        print(f"⏱️ Lecture de {len(chemins)} durée(s) manquante(s) en arrière-plan")
+        self.durees_job = DureesJob(self.model, chemins)
+        self.durees_job.duree_resolue.connect(self._on_duree_resolue)
+        self.durees_job.termine.connect(self._on_durees_terminees)
+        self.durees_job.start()
+
+    def _on_duree_resolue(self, chemin, duree):
+        video = self.model.appliquer_duree(chemin, duree)
+        if video:
+            self.duree_resolue.emit(str(video.chemin), duree)
+
+    def _on_durees_terminees(self, nb_durees):
+        """Les durées lues sont sauvegardées pour ne plus être relues à l'ouverture."""
+        self.durees_job = None
+        if nb_durees:
+            self.model.sauvegarder_campagne()
+            print(f"⏱️ {nb_durees} durée(s) lue(s) et sauvegardée(s)")
+
+    def lancer_storyboard(self, video):
+        """
+        Génère en arrière-plan le storyboard de la vidéo sélectionnée s'il manque.
+        Un job lancé pour toute la campagne n'est pas interrompu : il la couvre déjà.
+        """
+        job = self.storyboard_job
+        if job and job.isRunning() and (self._storyboards_campagne or video.chemin in job.video_paths):
+            return
+        attente = self._storyboards_en_attente
+        if attente and (attente[1] or video.chemin in attente[0]):
+            return
+        if video.chemin and os.path.exists(video.chemin):
+            self._lancer_job_storyboards([video.chemin], campagne=False)
+
+    def lancer_storyboards(self):
+        """Génère en arrière-plan les storyboards manquants ou périmés de toute la campagne (action explicite)."""
+        videos = [v.chemin for v in self.obtenir_videos() if v.chemin and os.path.exists(v.chemin)]
+        if not self._lancer_job_storyboards(videos, campagne=True):
+            self.succes_operation.emit("Tous les storyboards de la campagne sont à jour.")
+
+    def _lancer_job_storyboards(self, chemins, campagne):
+        """
+        Lance un StoryboardJob pour les chemins sans storyboard à jour ; False s'il n'y en
+        a aucun. Le job en cours est annulé sans être attendu : la vignette qu'il décode
+        peut prendre plusieurs secondes. Le nouveau job démarre quand il s'est arrêté.
+        """
+        manquants = [chemin for chemin in chemins if not storyboard_existant(chemin, self.dossier_storyboards())]
+        if not manquants:
+            return False
+        job = self.storyboard_job
+        if job is not None and job.isRunning():
+            job.annuler()
+            job.storyboard_pret.disconnect()
+            job.termine.disconnect()
+            self._storyboard_job_annule = job
+            self.storyboard_job = None
+        if self._storyboard_job_annule is not None:
+            self._storyboards_en_attente = (manquants, campagne)
+        else:
+            self._demarrer_job_storyboards(manquants, campagne)
+        return True
+
+    def _demarrer_job_storyboards(self, chemins, campagne):
+        self._storyboards_campagne = campagne
+        job = StoryboardJob(chemins, self.dossier_storyboards())
+        job.storyboard_pret.connect(self.storyboard_pret.emit)
+        job.termine.connect(lambda ok, message: print(f"🎞️ Storyboards : {message}"))
+        job.finished.connect(lambda job=job: self._on_storyboard_job_fini(job))
+        self.storyboard_job = job
+        job.start()
+
+    def _on_storyboard_job_fini(self, job):
+        """Fin d'un job (terminé ou annulé) : libéré, puis la demande en attente est lancée."""
+        if job is self.storyboard_job:
+            self.storyboard_job = None
+        if job is self._storyboard_job_annule:
+            self._storyboard_job_annule = None
+            if self._storyboards_en_attente is not None:
+                chemins, campagne = self._storyboards_en_attente
+                self._storyboards_en_attente = None
+                self._demarrer_job_storyboards(chemins, campagne)
+        job.deleteLater()
+
     def precalculer_metadonnees_externes(self, nom_video: str) -> bool:
         print(f"🔄 Lancement du pré-calcul pour {nom_video}...")
         if not self.model.campagne_courante: return False
@@ -200,8 +386,8 @@ class TriKosmosController(QObject):
             print(f"❌ Erreur extraction: {e}")
             return False
 
-        data_meteo_trouvee = False
-        data_astro_trouvee = False
+        # Champs trouvés, appliqués ensemble via le modèle (écrits dans la base SQLite)
+        externes = {}
 
         try:
             date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
@@ -220,23 +406,20 @@ class TriKosmosController(QObject):
             hourly_data = data_meteo.get('hourly', {})
 
             if is_future and 'temperature_2m' in hourly_data and hourly_data['temperature_2m'][heure_index] is not None:
-                video.metadata_propres['meteoAirDict_tempAir'] = str(hourly_data['temperature_2m'][heure_index])
-                video.metadata_propres['meteoAirDict_wind'] = str(round(hourly_data['windspeed_10m'][heure_index], 1))
-                data_meteo_trouvee = True
+                externes['meteoAirDict_tempAir'] = str(hourly_data['temperature_2m'][heure_index])
+                externes['meteoAirDict_wind'] = str(round(hourly_data['windspeed_10m'][heure_index], 1))
             elif not is_future:
                 API_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
                 params_archive = {"latitude": lat, "longitude": lon, "start_date": date_str, "end_date": date_str, "hourly": "temperature_2m,windspeed_10m", "timezone": "auto"}
                 resp_archive = requests.get(API_ARCHIVE_URL, params=params_archive, timeout=10)
                 d_arch = resp_archive.json()
                 if 'hourly' in d_arch and d_arch['hourly']['temperature_2m'][heure_index] is not None:
-                     video.metadata_propres['meteoAirDict_tempAir'] = str(d_arch['hourly']['temperature_2m'][heure_index])
-                     video.metadata_propres['meteoAirDict_wind'] = str(round(d_arch['hourly']['windspeed_10m'][heure_index], 1))
-                     data_meteo_trouvee = True
+                     externes['meteoAirDict_tempAir'] = str(d_arch['hourly']['temperature_2m'][heure_index])
+                     externes['meteoAirDict_wind'] = str(round(d_arch['hourly']['windspeed_10m'][heure_index], 1))
 
             if 'wave_height' in hourly_data and hourly_data['wave_height'][heure_index] is not None:
-                video.metadata_propres['meteoMerDict_seaState'] = str(round(hourly_data['wave_height'][heure_index], 1))
-                video.metadata_propres['meteoMerDict_swell'] = str(round(hourly_data['swell_wave_height'][heure_index], 1))
-                data_meteo_trouvee = True
+                externes['meteoMerDict_seaState'] = str(round(hourly_data['wave_height'][heure_index], 1))
+                externes['meteoMerDict_swell'] = str(round(hourly_data['swell_wave_height'][heure_index], 1))
 
         except Exception as e:
             print(f"❌ Erreur Météo: {e}")
@@ -247,12 +430,12 @@ class TriKosmosController(QObject):
             response_astro.raise_for_status()
             moon_phase = response_astro.json().get('weather', [{}])[0].get('astronomy', [{}])[0].get('moon_phase')
             if moon_phase:
-                video.metadata_propres['astroDict_moon'] = moon_phase
-                data_astro_trouvee = True
+                externes['astroDict_moon'] = moon_phase
         except Exception as e:
             print(f"❌ Erreur Astro: {e}")
 
-        if data_meteo_trouvee or data_astro_trouvee:
+        if externes:
+            self.model.modifier_metadonnees_propres(nom_video, externes)
             return self.sauvegarder_metadonnees_vers_json(video)
         return False
     
@@ -7,6 +7,7 @@ from .algos_correction import (
     BGR2Float,
     AnalyseHisto,
     PlotHistogram,
+    compute_histograms,
     process_image_HE,
     DarkChannel,
     DarkChannelWater,
@@ -25,12 +26,14 @@ from .algos_correction import (
     detect_moving_subjects,
     annotate_detections,
 )
+from .frame_cache import GopFrameCache
 
 __all__ = [
     "Float2BGR",
     "BGR2Float",
     "AnalyseHisto",
     "PlotHistogram",
+    "compute_histograms",
     "process_image_HE",
     "DarkChannel",
     "DarkChannelWater",
@@ -48,4 +51,5 @@ __all__ = [
     "init_motion_detector",
     "detect_moving_subjects",
     "annotate_detections",
+    "GopFrameCache",
 ]
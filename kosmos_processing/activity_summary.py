@@ -0,0 +1,249 @@
+"""
+Export condensé : ne garde que les passages où il se passe quelque chose.
+La vidéo est lue une seule fois ; chaque frame est réduite pour la détection de
+mouvement (detect_moving_subjects), et seules les frames actives, avec une marge
+avant et après chaque passage, sont filtrées et envoyées à ffmpeg. Aucun fichier
+intermédiaire de la durée de la source n'est écrit.
+Les passages gardés forment les chapitres du résumé : ils sont inscrits dans le MP4
+et dans un fichier <résumé>_chapitres.json avec leurs instants dans la vidéo d'origine.
+"""
+import json
+import os
+import subprocess
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2
+
+from .algos_correction import detect_moving_subjects, init_motion_detector
+from .decoders import open_decoder, scaled_size
+from .export import (
+    ExportAnnule, _PipeWriter, _ProgressReporter, _abort_encoder, _apply_filters, _creation_flags,
+    _encoder_cmd, _finish_encoder, _frame_range, _horodatage, _pipe_pix_fmt, _pipe_stats,
+    _start_encoder, _supprimer_fichier_partiel,
+)
+
+SUMMARY_PAD_BEFORE_S = 1.0
+SUMMARY_PAD_AFTER_S = 2.0
+SUMMARY_DETECT_SIDE = 320 # La détection travaille sur des frames réduites
+SUMMARY_MIN_AREA = 400 # Surface minimale d'un sujet, en pixels de la source
+
+# Mémoire maximale de la marge avant (frames pleine résolution gardées en attente)
+SUMMARY_BUFFER_BYTES = 512 * 1024 * 1024
+
+
+class ActivityDetector:
+    """
+    Détection de mouvement sur une copie réduite de chaque frame (plus grand côté
+    `detect_side`). min_area est exprimée en pixels de la source et ramenée à l'échelle.
+    """
+
+    def __init__(self, width, height, min_area=SUMMARY_MIN_AREA, detect_side=SUMMARY_DETECT_SIDE):
+        self.size = scaled_size(width, height, max_side=detect_side)
+        scale = (self.size[0] * self.size[1]) / float(max(1, width * height))
+        self.min_area = max(1.0, min_area * scale)
+        self.subtractor = init_motion_detector()
+
+    def __call__(self, frame):
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return bool(detect_moving_subjects(frame, self.subtractor, min_area=self.min_area))
+
+
+class ActivityCondenser:
+    """
+    Sélection en flux des frames à garder. Les `pad_before` dernières frames inactives
+    sont gardées en attente (marge avant) ; après une détection, les `pad_after` frames
+    suivantes sont gardées (marge après). Des passages qui se touchent sont fusionnés.
+    `segments` : [première, dernière] frame de chaque passage gardé (indices source).
+    """
+
+    def __init__(self, pad_before, pad_after):
+        self.pad_after = max(0, int(pad_after))
+        self._attente = deque(maxlen=max(0, int(pad_before)))
+        self._actif_jusqu_a = -1
+        self.segments = []
+
+    def push(self, index, frame, active):
+        """Retourne les frames [(index, frame)] à encoder maintenant, dans l'ordre."""
+        if active:
+            self._actif_jusqu_a = index + self.pad_after
+        if index > self._actif_jusqu_a:
+            if self._attente.maxlen:
+                self._attente.append((index, frame))
+            return []
+        sortie = list(self._attente)
+        self._attente.clear()
+        sortie.append((index, frame))
+        debut = sortie[0][0]
+        if self.segments and debut <= self.segments[-1][1] + 1:
+            self.segments[-1][1] = index
+        else:
+            self.segments.append([debut, index])
+        return sortie
+
+
+def summary_chapters(segments, fps):
+    """Chapitres du résumé : instants dans le résumé et dans la vidéo d'origine (ms)."""
+    chapitres = []
+    position = 0 # Frames du résumé avant le passage
+    for debut, fin in segments:
+        nb = fin - debut + 1
+        debut_ms = int(debut * 1000.0 / fps)
+        chapitres.append({
+            'titre': f"Activité {_horodatage(debut_ms)}",
+            'debut_resume_ms': int(position * 1000.0 / fps),
+            'fin_resume_ms': int((position + nb) * 1000.0 / fps),
+            'debut_ms': debut_ms,
+            'fin_ms': int((fin + 1) * 1000.0 / fps),
+        })
+        position += nb
+    return chapitres
+
+
+def chapters_path(output_path):
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}_chapitres.json")
+
+
+def _ffmetadata(chapitres):
+    lignes = [";FFMETADATA1"]
+    for chapitre in chapitres:
+        titre = chapitre['titre'].replace('\\', '\\\\').replace('=', '\\=').replace(';', '\\;').replace('#', '\\#')
+        lignes += [
+            "[CHAPTER]",
+            "TIMEBASE=1/1000",
+            f"START={chapitre['debut_resume_ms']}",
+            f"END={chapitre['fin_resume_ms']}",
+            f"title={titre}",
+        ]
+    return "\n".join(lignes) + "\n"
+
+
+def _inscrire_chapitres(output_path, chapitres):
+    """
+    Inscrit les chapitres dans le MP4 par un remux en copie de flux (le résumé est
+    court, aucun réencodage). En cas d'échec, le résumé est gardé sans chapitres.
+    """
+    output_path = Path(output_path)
+    meta_path = output_path.with_name(f"{output_path.stem}_chapitres.ffmeta")
+    tmp_path = output_path.with_name(f"{output_path.stem}_chapitres.tmp{output_path.suffix}")
+    meta_path.write_text(_ffmetadata(chapitres), encoding='utf-8')
+    cmd = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-i', str(output_path), '-i', str(meta_path),
+        '-map', '0', '-map_metadata', '1', '-map_chapters', '1',
+        '-c', 'copy', str(tmp_path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=300, creationflags=_creation_flags())
+        if result.returncode == 0:
+            os.replace(tmp_path, output_path)
+        else:
+            print(f"⚠️ Chapitres non inscrits dans {output_path.name}: "
+                  f"{result.stderr.decode('utf-8', errors='replace')[-200:]}")
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"⚠️ Chapitres non inscrits dans {output_path.name}: {e}")
+    finally:
+        _supprimer_fichier_partiel(tmp_path)
+        try:
+            meta_path.unlink()
+        except OSError:
+            pass
+
+
+def export_activity_summary(source_path, output_path, start_ms=0, end_ms=None, filters=None,
+                            pad_before_s=SUMMARY_PAD_BEFORE_S, pad_after_s=SUMMARY_PAD_AFTER_S,
+                            min_area=SUMMARY_MIN_AREA, detect_side=SUMMARY_DETECT_SIDE,
+                            progress_cb=None, cancel_event=None, pipe_pix_fmt='bgr24'):
+    """
+    Exporte un résumé de [start_ms, end_ms] (toute la vidéo par défaut) ne contenant
+    que les passages avec des sujets en mouvement, chacun élargi de pad_before_s /
+    pad_after_s secondes. Les filtres ne sont appliqués qu'aux frames gardées.
+    Le résumé n'a pas de piste audio (elle serait hachée aux raccords).
+    - progress_cb / cancel_event : comme export_video_with_filters (progression sur
+      les frames lues de la source).
+    Retourne les statistiques de l'export, avec 'chapitres' et 'frames_source'. Sans
+    aucune activité, aucun fichier n'est écrit et 'frames' vaut 0.
+    """
+    output_path = Path(output_path)
+    filters = dict(filters or {})
+    cap = open_decoder(source_path, backend='opencv')
+    if not cap.isOpened():
+        raise Exception("Impossible d'ouvrir la vidéo source")
+
+    fps = cap.fps or 25
+    if end_ms is None:
+        end_ms = cap.duration_ms
+    first_frame, frames_to_process = _frame_range(fps, start_ms, end_ms)
+    cap.seek_frame(first_frame)
+
+    # Marge avant bornée en mémoire : ce sont des frames pleine résolution
+    frame_bytes = max(1, cap.width * cap.height * 3)
+    pad_before = int(round(pad_before_s * fps))
+    if pad_before > SUMMARY_BUFFER_BYTES // frame_bytes:
+        pad_before = SUMMARY_BUFFER_BYTES // frame_bytes
+        print(f"⚠️ Marge avant réduite à {pad_before / fps:.1f} s (mémoire)")
+    detector = ActivityDetector(cap.width, cap.height, min_area, detect_side)
+    condenser = ActivityCondenser(pad_before, int(round(pad_after_s * fps)))
+
+    pix_fmt = _pipe_pix_fmt(cap.width, cap.height, pipe_pix_fmt)
+    try:
+        process = _start_encoder(_encoder_cmd(cap.width, cap.height, fps, output_path, pix_fmt=pix_fmt))
+    except OSError:
+        cap.release()
+        raise
+
+    print(f"🐟 Résumé d'activité de {Path(source_path).name} ({frames_to_process} frames)...")
+    reporter = _ProgressReporter(frames_to_process, progress_cb)
+    is_cancelled = cancel_event.is_set if cancel_event is not None else (lambda: False)
+    writer = _PipeWriter(process.stdin, pix_fmt)
+    lues = gardees = 0
+    succes = False
+    try:
+        while lues < frames_to_process:
+            if is_cancelled():
+                raise ExportAnnule("Export annulé")
+            if writer.error is not None:
+                break
+            ret, frame = cap.read()
+            if not ret:
+                break
+            for _, gardee in condenser.push(first_frame + lues, frame, detector(frame)):
+                writer.put(_apply_filters(gardee, filters))
+                gardees += 1
+            lues += 1
+            reporter.update(lues)
+        succes = True
+    finally:
+        cap.release()
+        writer.close(discard=not succes)
+        if not succes or writer.error is not None or gardees == 0:
+            _abort_encoder(process)
+            _supprimer_fichier_partiel(output_path)
+    if writer.error is not None:
+        raise Exception(f"Erreur d'écriture vers FFmpeg: {writer.error}")
+
+    reporter.update(lues, force=True)
+    stats = {
+        'pipe_octets': writer.bytes_written,
+        'pipe_ecriture_s': writer.write_s,
+        'frames_source': lues,
+        'chapitres': summary_chapters(condenser.segments, fps),
+    }
+    if gardees == 0:
+        print(f"ℹ️ Aucune activité détectée dans {Path(source_path).name} : pas de résumé")
+        return _pipe_stats(stats, 0, time.monotonic() - reporter.started, pix_fmt)
+
+    try:
+        _finish_encoder(process)
+    except Exception:
+        _supprimer_fichier_partiel(output_path)
+        raise
+    _inscrire_chapitres(output_path, stats['chapitres'])
+    with open(chapters_path(output_path), 'w', encoding='utf-8') as f:
+        json.dump({'source': str(source_path), 'fps': fps, 'chapitres': stats['chapitres']},
+                  f, indent=4, ensure_ascii=False)
+    print(f"✅ Résumé : {gardees}/{lues} frames gardées, {len(stats['chapitres'])} passage(s)")
+    return _pipe_stats(stats, gardees, time.monotonic() - reporter.started, pix_fmt)
@@ -59,6 +59,25 @@ def PlotHistogram(I):
     plt.title("Histogramme des canaux RGB")
 
 
+def compute_histograms(frame, max_side=320):
+    """
+    Histogrammes R, G, B et de luminance (256 classes, float32) d'une frame BGR.
+    La frame est sous-échantillonnée (un pixel sur `step`) pour que son plus grand
+    côté ne dépasse pas `max_side` : la forme de l'histogramme est conservée
+    pour un coût indépendant de la résolution source.
+    """
+    height, width = frame.shape[:2]
+    step = max(1, int(math.ceil(max(height, width) / float(max_side))))
+    small = np.ascontiguousarray(frame[::step, ::step])
+
+    b_hist = cv2.calcHist([small], [0], None, [256], [0, 256]).ravel()
+    g_hist = cv2.calcHist([small], [1], None, [256], [0, 256]).ravel()
+    r_hist = cv2.calcHist([small], [2], None, [256], [0, 256]).ravel()
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    density_hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    return r_hist, g_hist, b_hist, density_hist
+
+
 ##############################################
 ## Egalisation d'histogramme
 ##############################################
@@ -0,0 +1,102 @@
+"""
+Écriture des captures d'image hors du thread GUI.
+Les captures sont reçues sous forme de tableaux NumPy (BGR, 8 ou 16 bits) et encodées
+par OpenCV dans un thread de fond, avec une fiche de métadonnées JSON à côté de l'image
+(instant dans la vidéo, valeurs des capteurs...).
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Extension -> format : PNG (sans perte, 16 bits possibles), JPEG et WebP (qualité)
+CAPTURE_FORMATS = {
+    '.png': 'png',
+    '.jpg': 'jpeg',
+    '.jpeg': 'jpeg',
+    '.webp': 'webp',
+}
+
+DEFAULT_PNG_COMPRESSION = 3 # 0-9 : 3 est bien plus rapide que le niveau par défaut pour un gain de taille faible
+DEFAULT_QUALITY = 95 # JPEG / WebP, 0-100
+
+
+def encode_params(extension, png_compression=DEFAULT_PNG_COMPRESSION, quality=DEFAULT_QUALITY):
+    """Paramètres cv2.imencode / cv2.imwrite pour une extension donnée."""
+    fmt = CAPTURE_FORMATS.get(extension.lower())
+    if fmt == 'png':
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(png_compression)]
+    if fmt == 'jpeg':
+        return [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    if fmt == 'webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, max(1, int(quality))]
+    return []
+
+
+def save_image(path, image, params=None, png_compression=DEFAULT_PNG_COMPRESSION, quality=DEFAULT_QUALITY):
+    """
+    Enregistre une image BGR (uint8 ou uint16).
+    - Les images 16 bits sont conservées en PNG et réduites à 8 bits pour JPEG/WebP.
+    - Encodage en mémoire puis écriture par NumPy : cv2.imwrite ne gère pas les
+      chemins non ASCII sous Windows.
+    """
+    path = Path(path)
+    extension = path.suffix.lower() or '.png'
+    if image.dtype == np.uint16 and CAPTURE_FORMATS.get(extension) != 'png':
+        image = (image >> 8).astype(np.uint8)
+    if params is None:
+        params = encode_params(extension, png_compression, quality)
+    ok, data = cv2.imencode(extension, image, params)
+    if not ok:
+        raise ValueError(f"Encodage impossible : {path}")
+    data.tofile(str(path))
+    return path
+
+
+def write_sidecar(image_path, metadata):
+    """Écrit les métadonnées de la capture dans <image>.json (même nom, extension .json)."""
+    sidecar = Path(image_path).with_suffix('.json')
+    with open(sidecar, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=4, ensure_ascii=False)
+    return sidecar
+
+
+class CaptureWriter:
+    """
+    File d'écriture des captures dans un thread de fond.
+    submit() rend la main immédiatement ; le Future renvoyé donne le chemin de l'image
+    (ou l'exception) et peut recevoir un callback (appelé dans le thread d'écriture).
+    """
+
+    def __init__(self, png_compression=DEFAULT_PNG_COMPRESSION, quality=DEFAULT_QUALITY, workers=1):
+        self.png_compression = png_compression
+        self.quality = quality
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="capture")
+
+    def submit(self, image, path, metadata=None, on_done=None):
+        """
+        Planifie l'écriture de `image` (la capture ne doit plus être modifiée ensuite).
+        on_done(future) est appelé à la fin de l'écriture.
+        """
+        future = self._pool.submit(self._write, image, Path(path), metadata)
+        if on_done:
+            future.add_done_callback(on_done)
+        return future
+
+    def _write(self, image, path, metadata):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        save_image(path, image, png_compression=self.png_compression, quality=self.quality)
+        if metadata is not None:
+            metadata = dict(metadata)
+            metadata.setdefault('fichier', path.name)
+            metadata.setdefault('largeur', int(image.shape[1]))
+            metadata.setdefault('hauteur', int(image.shape[0]))
+            metadata.setdefault('profondeur_bits', 16 if image.dtype == np.uint16 else 8)
+            write_sidecar(path, metadata)
+        print(f"📸 Capture enregistrée sous : {path}")
+        return path
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,380 @@
+"""
+Décodeurs vidéo interchangeables.
+- OpenCVDecoder : cv2.VideoCapture (seek précis à la frame, utilisé par le lecteur).
+- FfmpegPipeDecoder : sous-processus ffmpeg qui décode en multi-thread et livre
+  directement des frames réduites (`-vf scale`), dans le format de pixel voulu et
+  avec un pas de frames (une frame sur N). Utile pour les miniatures, l'analyse et
+  les proxys qui n'ont pas besoin d'un décodage 4K BGR complet.
+
+Les deux exposent la même interface (read/grab/seek_frame/seek_ms/release et les
+propriétés fps, frame_count, width, height) : `open_decoder` choisit le backend.
+"""
+import functools
+import json
+import shutil
+import subprocess
+import sys
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Octets par pixel (ou fraction pour le YUV planaire) des formats supportés
+PIXEL_FORMATS = {
+    'bgr24': 3,
+    'rgb24': 3,
+    'gray': 1,
+    'yuv420p': 1.5,
+}
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which('ffmpeg') is not None
+
+
+@functools.lru_cache(maxsize=1)
+def passthrough_args() -> Tuple[str, ...]:
+    """
+    Options ffmpeg pour garder les frames telles quelles (ni doublon ni saut) :
+    -fps_mode depuis ffmpeg 5.1, -vsync (déprécié) sur les versions plus anciennes.
+    """
+    try:
+        aide = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-h', 'long'],
+            capture_output=True, text=True, errors='replace', timeout=10,
+            creationflags=_creation_flags()
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        aide = ''
+    if '-fps_mode' in aide:
+        return ('-fps_mode', 'passthrough')
+    return ('-vsync', 'passthrough')
+
+
+def scaled_size(width: int, height: int, size=None, max_side: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Taille de sortie (pairs, pour rester compatible yuv420p).
+    - size : (w, h), une des deux valeurs peut valoir -1 pour garder le ratio.
+    - max_side : réduit pour que le plus grand côté n'excède pas cette valeur.
+    """
+    out_w, out_h = width, height
+    if size:
+        w, h = size
+        if w > 0 and h > 0:
+            out_w, out_h = w, h
+        elif w > 0:
+            out_w, out_h = w, height * w / float(width)
+        elif h > 0:
+            out_w, out_h = width * h / float(height), h
+    if max_side and max(out_w, out_h) > max_side:
+        scale = max_side / float(max(out_w, out_h))
+        out_w, out_h = out_w * scale, out_h * scale
+    return max(2, int(out_w) // 2 * 2), max(2, int(out_h) // 2 * 2)
+
+
+class Decoder:
+    """Interface commune des décodeurs (frames renvoyées sous forme de tableaux NumPy)."""
+
+    def __init__(self, path, size=None, max_side=None, pix_fmt='bgr24', stride=1):
+        if pix_fmt not in PIXEL_FORMATS:
+            raise ValueError(f"Format de pixel non supporté : {pix_fmt}")
+        self.path = str(path)
+        self.size = size
+        self.max_side = max_side
+        self.pix_fmt = pix_fmt
+        self.stride = max(1, int(stride))
+        self.fps = 0.0
+        self.frame_count = 0
+        self.width = 0
+        self.height = 0
+        self.out_width = 0
+        self.out_height = 0
+
+    @property
+    def duration_ms(self) -> int:
+        if self.fps <= 0:
+            return 0
+        return int((self.frame_count / self.fps) * 1000)
+
+    def isOpened(self) -> bool:
+        raise NotImplementedError
+
+    def read(self):
+        """(ret, frame) comme cv2.VideoCapture.read, en tenant compte du pas."""
+        raise NotImplementedError
+
+    def grab(self) -> bool:
+        """Avance d'une frame de sortie sans la convertir."""
+        ret, _ = self.read()
+        return ret
+
+    def seek_frame(self, index: int):
+        raise NotImplementedError
+
+    def seek_ms(self, position_ms: float):
+        self.seek_frame(int(position_ms * (self.fps or 25) / 1000))
+
+    def release(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+    def _needs_scale(self) -> bool:
+        return (self.out_width, self.out_height) != (self.width, self.height)
+
+
+class OpenCVDecoder(Decoder):
+    """Décodage via cv2.VideoCapture ; réduction et conversion faites après coup."""
+
+    def __init__(self, path, **options):
+        super().__init__(path, **options)
+        self.cap = cv2.VideoCapture(self.path)
+        if self.cap.isOpened():
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+            self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if self.size or self.max_side:
+                self.out_width, self.out_height = scaled_size(self.width, self.height, self.size, self.max_side)
+            else:
+                self.out_width, self.out_height = self.width, self.height
+
+    def isOpened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def grab(self) -> bool:
+        for _ in range(self.stride):
+            if not self.cap.grab():
+                return False
+        return True
+
+    def read(self):
+        for _ in range(self.stride - 1):
+            if not self.cap.grab():
+                return False, None
+        ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        return True, self._convert(frame)
+
+    def seek_frame(self, index: int):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+
+    def seek_ms(self, position_ms: float):
+        self.cap.set(cv2.CAP_PROP_POS_MSEC, position_ms)
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+        self.cap = None
+
+    def _convert(self, frame):
+        if self._needs_scale():
+            frame = cv2.resize(frame, (self.out_width, self.out_height), interpolation=cv2.INTER_AREA)
+        if self.pix_fmt == 'rgb24':
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        elif self.pix_fmt == 'gray':
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        elif self.pix_fmt == 'yuv420p':
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+        return frame
+
+
+class FfmpegPipeDecoder(Decoder):
+    """
+    Décodage par un sous-processus ffmpeg qui écrit des frames brutes sur stdout.
+    La réduction, la conversion de format et le pas sont faits dans ffmpeg, seul
+    le résultat final traverse le pipe. Un seek relance le processus avec `-ss`.
+    """
+
+    def __init__(self, path, threads=0, **options):
+        super().__init__(path, **options)
+        self.threads = threads
+        self.process = None
+        self._pending_start = None # Index de départ du prochain processus (démarrage paresseux)
+        self._probe()
+        if self.width and self.height:
+            if self.size or self.max_side:
+                self.out_width, self.out_height = scaled_size(self.width, self.height, self.size, self.max_side)
+            else:
+                self.out_width, self.out_height = self.width, self.height
+            self._pending_start = 0
+
+    @property
+    def frame_bytes(self) -> int:
+        return int(self.out_width * self.out_height * PIXEL_FORMATS[self.pix_fmt])
+
+    def isOpened(self) -> bool:
+        return self.process is not None or self._pending_start is not None
+
+    def read(self):
+        if self.process is None and self._pending_start is not None:
+            self._start(self._pending_start)
+        if self.process is None:
+            return False, None
+        data = self.process.stdout.read(self.frame_bytes)
+        if len(data) < self.frame_bytes:
+            return False, None
+        return True, self._to_array(data)
+
+    def seek_frame(self, index: int):
+        # Le processus est relancé avec -ss à la prochaine lecture
+        self._stop()
+        self._pending_start = max(0, int(index))
+
+    def release(self):
+        self._stop()
+        self._pending_start = None
+
+    def _to_array(self, data):
+        frame = np.frombuffer(data, dtype=np.uint8)
+        if self.pix_fmt == 'gray':
+            return frame.reshape(self.out_height, self.out_width)
+        if self.pix_fmt == 'yuv420p':
+            return frame.reshape(self.out_height * 3 // 2, self.out_width)
+        return frame.reshape(self.out_height, self.out_width, 3)
+
+    def _probe(self):
+        """Dimensions, fps et nombre de frames via ffprobe."""
+        stream = probe_video_stream(self.path)
+        if not stream:
+            return
+        self.width = int(stream.get('width') or 0)
+        self.height = int(stream.get('height') or 0)
+        self.fps = parse_frame_rate(stream.get('avg_frame_rate')) or parse_frame_rate(stream.get('r_frame_rate'))
+        try:
+            self.frame_count = int(stream['nb_frames'])
+        except (KeyError, ValueError):
+            try:
+                self.frame_count = int(float(stream.get('duration', 0)) * self.fps)
+            except ValueError:
+                self.frame_count = 0
+
+    def _filters(self):
+        filters = []
+        if self.stride > 1:
+            filters.append(f"select='not(mod(n\\,{self.stride}))'")
+        if self._needs_scale():
+            filters.append(f"scale={self.out_width}:{self.out_height}:flags=area")
+        return filters
+
+    def _start(self, start_index):
+        self._stop()
+        cmd = ['ffmpeg', '-v', 'error', '-nostdin', '-threads', str(self.threads)]
+        if start_index and self.fps:
+            cmd += ['-ss', f"{start_index / self.fps:.6f}"]
+        cmd += ['-i', self.path, '-an', '-sn']
+        filters = self._filters()
+        if filters:
+            cmd += ['-vf', ','.join(filters), *passthrough_args()]
+        cmd += ['-f', 'rawvideo', '-pix_fmt', self.pix_fmt, '-']
+        try:
+            self.process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=self.frame_bytes * 2,
+                creationflags=_creation_flags()
+            )
+        except OSError as e:
+            print(f"❌ ffmpeg n'est pas trouvé ({e})")
+            self.process = None
+        self._pending_start = None
+
+    def _stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdout.close()
+        except OSError:
+            pass
+        self.process.kill()
+        self.process.wait()
+        self.process = None
+
+
+def probe_video_stream(path):
+    """Description ffprobe de la première piste vidéo (dict vide si indisponible)."""
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries',
+        'stream=codec_name,profile,pix_fmt,width,height,avg_frame_rate,r_frame_rate,nb_frames,duration',
+        '-of', 'json', str(path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30,
+                                creationflags=_creation_flags())
+        return json.loads(result.stdout or '{}').get('streams', [{}])[0]
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError) as e:
+        print(f"⚠️ ffprobe impossible sur {path}: {e}")
+        return {}
+
+
+def probe_keyframes(path, fps, start_ms=0, end_ms=None):
+    """
+    Index des keyframes de la piste vidéo entre start_ms et end_ms, lus dans les
+    paquets par ffprobe (sans décodage). Liste vide si ffprobe est indisponible.
+    """
+    if shutil.which('ffprobe') is None or not fps:
+        return []
+    interval = f"{start_ms / 1000.0:.3f}%" + (f"{end_ms / 1000.0:.3f}" if end_ms is not None else "")
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-read_intervals', interval,
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0', str(path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60,
+                                creationflags=_creation_flags())
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"⚠️ Lecture des keyframes impossible sur {path}: {e}")
+        return []
+    keyframes = set()
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' not in flags:
+            continue
+        try:
+            keyframes.add(int(round(float(pts_time) * fps)))
+        except ValueError:
+            continue
+    return sorted(keyframes)
+
+
+def parse_frame_rate(rate) -> float:
+    """'30000/1001' -> 29.97"""
+    try:
+        num, _, den = str(rate).partition('/')
+        value = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+    return value if value > 0 else 0.0
+
+
+def _creation_flags() -> int:
+    return subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+
+def open_decoder(path, backend='auto', **options) -> Decoder:
+    """
+    Ouvre un décodeur.
+    - backend : 'opencv', 'ffmpeg' ou 'auto' (ffmpeg si disponible et que la sortie est
+      réduite ou échantillonnée, sinon OpenCV).
+    - options : size, max_side, pix_fmt, stride (et threads pour ffmpeg).
+    """
+    if backend == 'auto':
+        wants_small = options.get('size') or options.get('max_side') or options.get('stride', 1) > 1
+        backend = 'ffmpeg' if wants_small and ffmpeg_available() else 'opencv'
+    if backend == 'ffmpeg' and ffmpeg_available():
+        decoder = FfmpegPipeDecoder(path, **options)
+        if decoder.isOpened():
+            return decoder
+        print(f"⚠️ Décodage ffmpeg indisponible pour {path}, repli sur OpenCV")
+    options.pop('threads', None)
+    return OpenCVDecoder(path, **options)
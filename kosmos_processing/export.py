@@ -0,0 +1,1083 @@
+"""
+Export de portions de vidéo avec les filtres du lecteur.
+Décodage OpenCV, filtres appliqués frame par frame, encodage par ffmpeg via un pipe.
+Aucune dépendance Qt : la progression et l'annulation passent par des callbacks,
+ce qui permet de faire tourner l'export dans un thread de travail.
+Pour les chaînes de filtres coûteuses, export_video_segments répartit la plage sur
+plusieurs processus.
+Plusieurs sorties (master, version web, planche contact...) peuvent être produites
+à partir d'une seule passe de décodage et de filtres avec export_multi.
+"""
+import datetime
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .algos_correction import UnderwaterFilters
+from .capture_writer import save_image
+from .decoders import parse_frame_rate, open_decoder, passthrough_args, probe_keyframes, probe_video_stream, scaled_size
+
+# Intervalle minimal entre deux notifications de progression (secondes)
+PROGRESS_INTERVAL_S = 0.25
+
+# Formats acceptés sur le pipe vers ffmpeg : yuv420p (12 bits/pixel) divise par deux
+# le débit du pipe par rapport à bgr24 (24 bits/pixel), au prix d'un cvtColor
+PIPE_PIX_FMTS = ('bgr24', 'yuv420p')
+
+# Frames filtrées en attente d'écriture : le décodage et les filtres avancent
+# pendant que ffmpeg consomme le pipe, avec une mémoire bornée
+PIPE_QUEUE_SIZE = 8
+# Attente maximale d'une place dans la file avant de revérifier que le consommateur vit
+SINK_PUT_TIMEOUT_S = 0.5
+
+# Préréglages d'export par lot : nom -> [(nom du filtre, méthode UnderwaterFilters, kwargs)]
+EXPORT_PRESETS = {
+    "Brut": [],
+    "Correction couleur": [
+        ('gamma', 'apply_gamma', {'gamma': 1.2}),
+        ('blue_correction', 'correct_blue_dominance', {'factor': 0.15}),
+        ('contrast', 'enhance_contrast', {'clip_limit': 1.5}),
+    ],
+    "Correction couleur + débruitage": [
+        ('gamma', 'apply_gamma', {'gamma': 1.2}),
+        ('blue_correction', 'correct_blue_dominance', {'factor': 0.15}),
+        ('contrast', 'enhance_contrast', {'clip_limit': 1.5}),
+        ('denoise', 'denoise', {'h': 10.0}),
+    ],
+}
+
+
+class ExportAnnule(Exception):
+    """Levée lorsque l'export est interrompu par l'utilisateur."""
+
+
+def filtres_vers_json(filters):
+    """
+    Sérialise une chaîne de filtres (dict nom -> (fonction, kwargs)) en liste JSON.
+    Seules les méthodes de UnderwaterFilters sont sérialisables.
+    """
+    data = []
+    for name, (filter_func, kwargs) in (filters or {}).items():
+        func_name = getattr(filter_func, '__name__', '')
+        if getattr(UnderwaterFilters, func_name, None) is None:
+            print(f"⚠️ Filtre non sérialisable ignoré : {name}")
+            continue
+        kwargs = {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in kwargs.items()}
+        data.append({'nom': name, 'fonction': func_name, 'kwargs': kwargs})
+    return data
+
+
+def filtres_depuis_json(data):
+    """Reconstruit la chaîne de filtres produite par filtres_vers_json."""
+    filters = {}
+    for item in data or []:
+        filter_func = getattr(UnderwaterFilters, item.get('fonction', ''), None)
+        if filter_func is None:
+            print(f"⚠️ Filtre inconnu ignoré : {item.get('fonction')}")
+            continue
+        filters[item.get('nom', item['fonction'])] = (filter_func, dict(item.get('kwargs', {})))
+    return filters
+
+
+def filtres_preset(preset):
+    """Chaîne de filtres d'un préréglage de EXPORT_PRESETS."""
+    return {
+        name: (getattr(UnderwaterFilters, func_name), dict(kwargs))
+        for name, func_name, kwargs in EXPORT_PRESETS[preset]
+    }
+
+
+def _creation_flags() -> int:
+    return subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+
+def _supprimer_fichier_partiel(path: Path):
+    try:
+        if path.exists():
+            path.unlink()
+            print(f"🧹 Fichier partiel supprimé : {path}")
+    except OSError as e:
+        print(f"⚠️ Impossible de supprimer {path}: {e}")
+
+
+def _pipe_pix_fmt(width, height, pix_fmt):
+    """Format effectivement envoyé : yuv420p impose des dimensions paires."""
+    if pix_fmt not in PIPE_PIX_FMTS:
+        raise ValueError(f"Format de pipe non supporté : {pix_fmt}")
+    if pix_fmt == 'yuv420p' and (width % 2 or height % 2):
+        print(f"⚠️ Dimensions impaires ({width}x{height}) : pipe en bgr24")
+        return 'bgr24'
+    return pix_fmt
+
+
+def _encoder_cmd(width, height, fps, output_path, audio_source=None, start_ms=0, duration_s=None,
+                 pix_fmt='bgr24', codec='libx264', crf=23, preset='medium'):
+    """
+    Commande ffmpeg qui encode des frames brutes (bgr24 ou yuv420p) lues sur stdin
+    (audio de la source en option). crf et preset ne s'appliquent qu'à x264/x265.
+    """
+    cmd = [
+        'ffmpeg', '-y',
+        '-loglevel', 'error', # Réduire la verbosité pour éviter le blocage du pipe stderr
+        '-f', 'rawvideo',
+        '-vcodec', 'rawvideo',
+        '-s', f'{width}x{height}',
+        '-pix_fmt', pix_fmt,
+        '-r', str(fps),
+        '-i', '-',
+    ]
+    if audio_source is not None:
+        cmd += [
+            '-ss', str(datetime.timedelta(milliseconds=start_ms)),
+            '-i', str(audio_source),
+            '-t', str(duration_s),
+            '-map', '0:v',
+            '-map', '1:a?', # Audio optionnel
+        ]
+    cmd += ['-c:v', codec]
+    if codec in ('libx264', 'libx265'):
+        cmd += ['-preset', str(preset), '-crf', str(crf)]
+    if audio_source is not None:
+        cmd += ['-c:a', 'aac', '-b:a', '128k']
+    else:
+        cmd += ['-an']
+    cmd.append(str(output_path))
+    return cmd
+
+
+def _start_encoder(cmd):
+    print(f"🚀 Commande FFmpeg: {' '.join(cmd)}")
+    return subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        creationflags=_creation_flags()
+    )
+
+
+def _finish_encoder(process):
+    """Ferme stdin (fin du flux), attend ffmpeg et lève une exception s'il a échoué."""
+    _, stderr_data = process.communicate()
+    if process.returncode != 0:
+        stderr_output = stderr_data.decode('utf-8', errors='replace') if stderr_data else "Erreur inconnue"
+        print(f"❌ Erreur FFmpeg (code {process.returncode}): {stderr_output}")
+        raise Exception(f"Erreur lors de l'encodage FFmpeg: {stderr_output[-200:]}")
+
+
+def _abort_encoder(process):
+    if process.poll() is None:
+        process.kill()
+    try:
+        process.stdin.close()
+    except (OSError, ValueError):
+        pass
+    process.wait()
+
+
+def _apply_filters(frame, filters):
+    for name, (filter_func, kwargs) in filters.items():
+        try:
+            frame = filter_func(frame, **kwargs)
+        except Exception as e:
+            print(f"⚠️ Erreur filtre {name}: {e}")
+    return frame
+
+
+class _FrameSink(threading.Thread):
+    """
+    Consommateur de frames dans un thread dédié, alimenté par une file bornée.
+    Les frames ne doivent plus être modifiées une fois confiées au consommateur.
+    Les sous-classes implémentent handle(index, frame).
+    """
+
+    def __init__(self, maxsize=PIPE_QUEUE_SIZE):
+        super().__init__(daemon=True)
+        self.queue = queue.Queue(maxsize=max(1, maxsize))
+        self.error = None
+        self._discard = False
+        self.start()
+
+    def put(self, frame, index=0):
+        """
+        Confie une frame au consommateur. Ne bloque jamais indéfiniment : si le thread
+        s'est arrêté, la frame est abandonnée et `error` est renseigné pour le producteur.
+        """
+        self._deposer((index, frame))
+
+    def _deposer(self, item):
+        while True:
+            if not self.is_alive():
+                if self.error is None:
+                    self.error = RuntimeError(f"{type(self).__name__} arrêté")
+                return
+            try:
+                self.queue.put(item, timeout=SINK_PUT_TIMEOUT_S)
+                return
+            except queue.Full:
+                continue
+
+    def close(self, discard=False):
+        """Vide la file (ou l'abandonne si discard) puis attend la fin du thread."""
+        self._discard = discard
+        self._deposer(None)
+        self.join()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            # Après une erreur ou une annulation, on continue de vider la file pour
+            # ne jamais bloquer le producteur sur une file pleine
+            if self.error is not None or self._discard:
+                continue
+            try:
+                self.handle(*item)
+            except Exception as e:
+                # Toute erreur (filtre, écriture, mémoire...) est gardée pour le producteur
+                print(f"❌ Erreur {type(self).__name__}: {type(e).__name__}: {e}")
+                self.error = e
+
+    def handle(self, index, frame):
+        raise NotImplementedError
+
+
+class _PipeWriter(_FrameSink):
+    """
+    Écrit les frames dans le stdin de ffmpeg. Les frames passent par un memoryview
+    (pas de copie tobytes). Réduction (size) et conversion yuv420p sont faites ici,
+    hors du thread qui décode et filtre.
+    """
+
+    def __init__(self, stream, pix_fmt='bgr24', size=None, maxsize=PIPE_QUEUE_SIZE):
+        self.stream = stream
+        self.pix_fmt = pix_fmt
+        self.size = size
+        self.bytes_written = 0
+        self.write_s = 0.0 # Temps passé bloqué dans write (ffmpeg ne consomme pas assez vite)
+        super().__init__(maxsize)
+
+    def handle(self, index, frame):
+        if self.size and (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if self.pix_fmt == 'yuv420p':
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+        data = memoryview(np.ascontiguousarray(frame)).cast('B')
+        started = time.monotonic()
+        self.stream.write(data)
+        self.write_s += time.monotonic() - started
+        self.bytes_written += data.nbytes
+
+
+def _encode_frames(decoder, process, frame_count, filters, is_cancelled, on_frame=None, frame_cb=None,
+                   pix_fmt='bgr24', stats=None):
+    """
+    Décode `frame_count` frames à partir de la position courante du décodeur, applique
+    les filtres et les confie au thread d'écriture du pipe de l'encodeur. Retourne le
+    nombre de frames envoyées.
+    frame_cb(frame) reçoit chaque frame filtrée (aperçu).
+    stats : dict complété avec le volume écrit dans le pipe et le temps d'écriture.
+    """
+    writer = _PipeWriter(process.stdin, pix_fmt)
+    count = 0
+    succes = False
+    try:
+        while count < frame_count:
+            if is_cancelled():
+                raise ExportAnnule("Export annulé")
+            if writer.error is not None:
+                break
+
+            ret, frame = decoder.read()
+            if not ret:
+                break
+
+            frame = _apply_filters(frame, filters)
+            writer.put(frame)
+
+            if frame_cb:
+                frame_cb(frame)
+            count += 1
+            if on_frame:
+                on_frame(count)
+        succes = True
+    finally:
+        writer.close(discard=not succes)
+    if stats is not None:
+        stats['pipe_octets'] = stats.get('pipe_octets', 0) + writer.bytes_written
+        stats['pipe_ecriture_s'] = stats.get('pipe_ecriture_s', 0.0) + writer.write_s
+    return count
+
+
+def _pipe_stats(stats, frames, elapsed_s, pix_fmt):
+    """Complète et affiche les statistiques du pipe (débit moyen sur toute la durée de l'export)."""
+    stats.update({
+        'frames': frames,
+        'duree_s': elapsed_s,
+        'pipe_pix_fmt': pix_fmt,
+        'pipe_mo_s': stats.get('pipe_octets', 0) / 1e6 / max(elapsed_s, 1e-6),
+    })
+    print(f"📊 Pipe ffmpeg ({pix_fmt}) : {stats.get('pipe_octets', 0) / 1e6:.1f} Mo en {elapsed_s:.1f} s "
+          f"({stats['pipe_mo_s']:.1f} Mo/s, {stats.get('pipe_ecriture_s', 0.0):.1f} s bloqué en écriture)")
+    return stats
+
+
+def _frame_range(fps, start_ms, end_ms):
+    """(première frame, nombre de frames) couvrant [start_ms, end_ms]."""
+    first_frame = int(round(start_ms * fps / 1000.0))
+    frame_count = int((end_ms - start_ms) / 1000.0 * fps)
+    return first_frame, max(0, frame_count)
+
+
+class _ProgressReporter:
+    """Calcule vitesse et temps restant, et limite la fréquence des notifications."""
+
+    def __init__(self, total, progress_cb):
+        self.total = total
+        self.progress_cb = progress_cb
+        self.started = time.monotonic()
+        self.last_report = 0.0
+
+    def update(self, done, force=False):
+        if not self.progress_cb:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_report < PROGRESS_INTERVAL_S:
+            return
+        self.last_report = now
+        rate = done / max(now - self.started, 1e-6)
+        eta = (self.total - done) / rate if rate > 0 else -1.0
+        self.progress_cb(done, self.total, rate, eta)
+
+
+def export_video_with_filters(source_path, output_path, start_ms, end_ms, filters=None,
+                              progress_cb=None, cancel_event=None, frame_cb=None, pipe_pix_fmt='bgr24'):
+    """
+    Exporte [start_ms, end_ms] de `source_path` vers `output_path` en appliquant `filters`
+    (dict nom -> (fonction, kwargs), comme VideoPlayer.active_filters).
+    - progress_cb(frames_faites, frames_totales, fps, eta_s) : appelé au plus toutes
+      les PROGRESS_INTERVAL_S secondes, puis une dernière fois à la fin.
+    - cancel_event : threading.Event ; s'il est levé, ffmpeg est tué, le fichier
+      partiel supprimé et ExportAnnule levée.
+    - frame_cb(frame) : reçoit chaque frame filtrée (BGR) dans le thread d'export, par
+      exemple pour construire un aperçu pendant l'encodage.
+    - pipe_pix_fmt : format des frames envoyées à ffmpeg ('bgr24' ou 'yuv420p').
+    Retourne les statistiques de l'export (frames, durée, débit du pipe).
+    En cas d'erreur, le fichier de sortie incomplet est également supprimé.
+    """
+    output_path = Path(output_path)
+    filters = dict(filters or {})
+
+    # Les filtres travaillent en pleine résolution BGR
+    cap = open_decoder(source_path, backend='opencv')
+    if not cap.isOpened():
+        raise Exception("Impossible d'ouvrir la vidéo source")
+
+    fps = cap.fps or 25
+    first_frame, frames_to_process = _frame_range(fps, start_ms, end_ms)
+    cap.seek_frame(first_frame)
+
+    pix_fmt = _pipe_pix_fmt(cap.width, cap.height, pipe_pix_fmt)
+    cmd = _encoder_cmd(
+        cap.width, cap.height, fps, output_path,
+        audio_source=source_path, start_ms=start_ms, duration_s=(end_ms - start_ms) / 1000.0,
+        pix_fmt=pix_fmt
+    )
+    try:
+        process = _start_encoder(cmd)
+    except OSError:
+        cap.release()
+        raise
+
+    print(f"🎬 Export avec filtres ({len(filters)} actifs)...")
+
+    reporter = _ProgressReporter(frames_to_process, progress_cb)
+    is_cancelled = cancel_event.is_set if cancel_event is not None else (lambda: False)
+    stats = {}
+    succes = False
+    try:
+        count = _encode_frames(cap, process, frames_to_process, filters, is_cancelled, reporter.update,
+                               frame_cb, pix_fmt, stats)
+        _finish_encoder(process)
+        reporter.update(count, force=True)
+        succes = True
+        print("✅ Export FFmpeg terminé avec succès.")
+        return _pipe_stats(stats, count, time.monotonic() - reporter.started, pix_fmt)
+    finally:
+        cap.release()
+        if not succes:
+            _abort_encoder(process)
+            _supprimer_fichier_partiel(output_path)
+
+
+# ═══════════════════════════════════════════════════════════════
+# EXPORT PARALLÈLE PAR SEGMENTS
+# ═══════════════════════════════════════════════════════════════
+
+# En dessous, le coût de démarrage d'un processus (import, ouverture, seek) domine
+SEGMENT_MIN_FRAMES = 150
+
+
+def default_segment_workers() -> int:
+    """
+    Processus de segments pour l'ensemble des exports : la moitié des cœurs (chaque
+    segment fait aussi tourner son encodeur ffmpeg).
+    """
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+class _SegmentBudget:
+    """
+    Processus de segments partagés par tous les exports du programme : la file en lance
+    plusieurs à la fois, et chacun ouvrant son propre pool dépasserait le nombre de cœurs.
+    Un export prend ce qui reste (au plus ce qu'il demande) et attend s'il ne reste rien.
+    """
+
+    def __init__(self, total):
+        self.total = max(1, int(total))
+        self._libres = self.total
+        self._condition = threading.Condition()
+
+    def reserver(self, souhaites, cancel_event=None) -> int:
+        """Réserve entre 1 et `souhaites` processus ; lève ExportAnnule si annulé pendant l'attente."""
+        with self._condition:
+            while self._libres == 0:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExportAnnule("Export annulé")
+                self._condition.wait(PROGRESS_INTERVAL_S)
+            pris = max(1, min(int(souhaites), self._libres))
+            self._libres -= pris
+            return pris
+
+    def rendre(self, nombre):
+        with self._condition:
+            self._libres = min(self.total, self._libres + nombre)
+            self._condition.notify_all()
+
+
+_segment_budget = _SegmentBudget(default_segment_workers())
+
+
+def plan_segments(first_frame, frame_count, parts, keyframes=None, min_frames=SEGMENT_MIN_FRAMES):
+    """
+    Découpe [first_frame, first_frame + frame_count) en au plus `parts` segments
+    d'au moins `min_frames` frames. Les frontières sont recalées sur la keyframe la
+    plus proche (si `keyframes` est fourni) pour que chaque processus démarre par un
+    seek exact et bon marché. Retourne une liste de (première frame, nombre de frames).
+    """
+    parts = max(1, min(int(parts), frame_count // max(1, min_frames)))
+    end = first_frame + frame_count
+    if parts < 2:
+        return [(first_frame, frame_count)]
+
+    bounds = [first_frame]
+    for i in range(1, parts):
+        target = first_frame + frame_count * i // parts
+        boundary = target
+        if keyframes:
+            candidates = [k for k in keyframes if bounds[-1] + min_frames <= k <= end - min_frames]
+            if candidates:
+                boundary = min(candidates, key=lambda k: abs(k - target))
+        if bounds[-1] + min_frames <= boundary <= end - min_frames:
+            bounds.append(boundary)
+    bounds.append(end)
+    return [(a, b - a) for a, b in zip(bounds, bounds[1:])]
+
+
+def _export_segment(source_path, part_path, first_frame, frame_count, filters_json, index, progress_queue, stop_event,
+                    pipe_pix_fmt='bgr24'):
+    """
+    Exécuté dans un processus de travail : décode, filtre et encode un segment (vidéo
+    seule) avec son propre décodeur et son propre ffmpeg.
+    Retourne le nombre de frames encodées.
+    """
+    filters = filtres_depuis_json(filters_json)
+    cap = open_decoder(source_path, backend='opencv')
+    if not cap.isOpened():
+        raise Exception(f"Impossible d'ouvrir la vidéo source (segment {index})")
+    cap.seek_frame(first_frame)
+    pix_fmt = _pipe_pix_fmt(cap.width, cap.height, pipe_pix_fmt)
+    process = _start_encoder(_encoder_cmd(cap.width, cap.height, cap.fps or 25, part_path, pix_fmt=pix_fmt))
+
+    # Les objets partagés passent par le Manager : on limite les allers-retours
+    def on_frame(count):
+        if count % 10 == 0:
+            progress_queue.put((index, count))
+
+    def is_cancelled():
+        return stop_event.is_set()
+
+    succes = False
+    try:
+        count = _encode_frames(cap, process, frame_count, filters, is_cancelled, on_frame, pix_fmt=pix_fmt)
+        _finish_encoder(process)
+        progress_queue.put((index, count))
+        succes = True
+        return count
+    finally:
+        cap.release()
+        if not succes:
+            _abort_encoder(process)
+
+
+def _write_concat_list(list_path, part_paths):
+    """Fichier d'entrée du concat demuxer (chemins absolus, apostrophes échappées)."""
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for part_path in part_paths:
+            escaped = str(Path(part_path).resolve()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def _concat_cmd(list_path, output_path, audio_source, start_ms, duration_s, copy_audio=False, video_tag=None):
+    """
+    Assemble les segments sans réencodage (concat demuxer) et ajoute l'audio de la source.
+    copy_audio : recopie la piste audio telle quelle (coupe au paquet près) au lieu de la
+    réencoder en AAC, ce qui représente l'essentiel du temps d'une coupe sans filtre.
+    video_tag : étiquette de la piste vidéo (avc3/hev1 si les paramètres sont dans le flux).
+    """
+    audio_codec = ['-c:a', 'copy'] if copy_audio else ['-c:a', 'aac', '-b:a', '128k']
+    tag = ['-tag:v', video_tag] if video_tag else []
+    return [
+        'ffmpeg', '-y',
+        '-loglevel', 'error',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', str(list_path),
+        '-ss', str(datetime.timedelta(milliseconds=start_ms)),
+        '-i', str(audio_source),
+        '-t', str(duration_s),
+        '-map', '0:v',
+        '-map', '1:a?',
+        '-c:v', 'copy',
+        *tag,
+        *audio_codec,
+        str(output_path)
+    ]
+
+
+def export_video_segments(source_path, output_path, start_ms, end_ms, filters=None, workers=None,
+                          progress_cb=None, cancel_event=None, pipe_pix_fmt='bgr24'):
+    """
+    Variante parallèle de export_video_with_filters pour les chaînes de filtres lourdes.
+    La plage est découpée en segments alignés sur les keyframes. Chaque segment est
+    traité dans un processus distinct (décodeur + filtres + encodeur), puis les parties
+    sont assemblées par le concat demuxer de ffmpeg, sans réencodage. Les frames
+    décodées et filtrées envoyées aux encodeurs sont les mêmes que pour l'export série ;
+    le flux encodé, lui, diffère aux raccords (chaque partie commence par une keyframe).
+    Les processus sont pris sur un budget commun aux exports en cours : un export lancé
+    pendant un autre n'obtient que les processus restants, ou attend qu'il s'en libère.
+    Retourne les statistiques de l'export (débit du pipe cumulé sur les processus).
+    """
+    workers = _segment_budget.reserver(workers or default_segment_workers(), cancel_event)
+    try:
+        return _export_video_segments(source_path, output_path, start_ms, end_ms, filters, workers,
+                                      progress_cb, cancel_event, pipe_pix_fmt)
+    finally:
+        _segment_budget.rendre(workers)
+
+
+def _export_video_segments(source_path, output_path, start_ms, end_ms, filters, workers,
+                           progress_cb, cancel_event, pipe_pix_fmt):
+    """Corps de export_video_segments, avec `workers` processus déjà réservés."""
+    output_path = Path(output_path)
+    filters = dict(filters or {})
+
+    cap = open_decoder(source_path, backend='opencv')
+    if not cap.isOpened():
+        raise Exception("Impossible d'ouvrir la vidéo source")
+    fps = cap.fps or 25
+    pix_fmt = _pipe_pix_fmt(cap.width, cap.height, pipe_pix_fmt)
+    # Volume d'une frame dans le pipe (les processus n'envoient que des frames brutes)
+    frame_bytes = cap.width * cap.height * 3 // (2 if pix_fmt == 'yuv420p' else 1)
+    cap.release()
+
+    first_frame, frames_to_process = _frame_range(fps, start_ms, end_ms)
+    keyframes = probe_keyframes(source_path, fps, start_ms, end_ms) if workers > 1 else []
+    segments = plan_segments(first_frame, frames_to_process, workers, keyframes)
+    if len(segments) < 2:
+        return export_video_with_filters(source_path, output_path, start_ms, end_ms, filters,
+                                         progress_cb, cancel_event, pipe_pix_fmt=pipe_pix_fmt)
+
+    print(f"🧩 Export parallèle : {len(segments)} segments sur {len(segments)} processus")
+    parts_dir = output_path.parent / f"~{output_path.stem}_segments"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    part_paths = [parts_dir / f"part_{i:03d}.mp4" for i in range(len(segments))]
+    filters_json = filtres_vers_json(filters)
+    reporter = _ProgressReporter(frames_to_process, progress_cb)
+    done_per_segment = [0] * len(segments)
+    succes = False
+
+    # 'spawn' : pas de fork d'un processus Qt multi-threadé
+    ctx = multiprocessing.get_context('spawn')
+    try:
+        with ctx.Manager() as manager:
+            progress_queue = manager.Queue()
+            stop_event = manager.Event()
+            with ProcessPoolExecutor(max_workers=len(segments), mp_context=ctx) as pool:
+                futures = [
+                    pool.submit(_export_segment, str(source_path), str(part_path), seg_first, seg_count,
+                                filters_json, index, progress_queue, stop_event, pipe_pix_fmt)
+                    for index, ((seg_first, seg_count), part_path) in enumerate(zip(segments, part_paths))
+                ]
+                pending = set(futures)
+                while pending:
+                    _, pending = wait(pending, timeout=PROGRESS_INTERVAL_S, return_when=FIRST_EXCEPTION)
+                    while not progress_queue.empty():
+                        index, count = progress_queue.get_nowait()
+                        done_per_segment[index] = count
+                    reporter.update(sum(done_per_segment))
+                    if cancel_event is not None and cancel_event.is_set():
+                        stop_event.set()
+                    if any(f.done() and f.exception() for f in futures):
+                        stop_event.set()
+                # Propage la première erreur (ou l'annulation) d'un segment
+                counts = [f.result() for f in futures]
+
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportAnnule("Export annulé")
+
+        list_path = parts_dir / "segments.txt"
+        _write_concat_list(list_path, part_paths)
+
+        process = subprocess.run(
+            _concat_cmd(list_path, output_path, source_path, start_ms, (end_ms - start_ms) / 1000.0),
+            capture_output=True,
+            creationflags=_creation_flags()
+        )
+        if process.returncode != 0:
+            stderr_output = process.stderr.decode('utf-8', errors='replace') or "Erreur inconnue"
+            raise Exception(f"Erreur lors de l'assemblage FFmpeg: {stderr_output[-200:]}")
+
+        count = sum(counts)
+        reporter.update(count, force=True)
+        succes = True
+        print("✅ Export parallèle terminé avec succès.")
+        stats = {'pipe_octets': count * frame_bytes}
+        return _pipe_stats(stats, count, time.monotonic() - reporter.started, pix_fmt)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        if not succes:
+            _supprimer_fichier_partiel(output_path)
+
+
+# ═══════════════════════════════════════════════════════════════
+# EXPORT SANS FILTRE : COPIE DE FLUX + RENDU INTELLIGENT DES BORDS
+# ═══════════════════════════════════════════════════════════════
+
+# Codec source -> encodeur utilisé pour réencoder les GOP partiels des bords
+SMART_CUT_ENCODERS = {
+    'h264': 'libx264',
+    'hevc': 'libx265',
+}
+
+# Les parties réencodées (x264/x265) et copiées (caméra) n'ont pas les mêmes SPS/PPS.
+# En MP4, ces paramètres sont hors bande (avcC/hvcC) et le concat n'en garde qu'un jeu,
+# celui de la première partie : le milieu copié serait décodé avec ceux de x264.
+# Chaque partie répète donc ses paramètres dans le flux, devant chaque keyframe, et la
+# sortie est étiquetée avc3/hev1 (paramètres dans les échantillons autorisés).
+# Codec -> (bitstream filters de la copie, paramètres de l'encodeur, étiquette de sortie)
+SMART_CUT_IN_BAND = {
+    'h264': (['-bsf:v', 'h264_mp4toannexb,dump_extra'], ['-x264-params', 'repeat-headers=1'], 'avc3'),
+    'hevc': (['-bsf:v', 'hevc_mp4toannexb,dump_extra'], ['-x265-params', 'repeat-headers=1'], 'hev1'),
+}
+
+
+def plan_smart_cut(first_frame, frame_count, keyframes):
+    """
+    Découpe une coupe sans filtre en parties ('encode' | 'copy', première frame, nombre).
+    Tout ce qui est entre la première et la dernière keyframe de l'extrait est copié tel
+    quel ; seuls les GOP partiels du début et de la fin sont réencodés.
+    """
+    end = first_frame + frame_count
+    k_in = next((k for k in keyframes if k >= first_frame), None)
+    k_out = next((k for k in reversed(keyframes) if k <= end), None)
+    if k_in is None or k_out is None or k_in >= k_out:
+        return [('encode', first_frame, frame_count)]
+
+    parts = []
+    if k_in > first_frame:
+        parts.append(('encode', first_frame, k_in - first_frame))
+    parts.append(('copy', k_in, k_out - k_in))
+    if end > k_out:
+        parts.append(('encode', k_out, end - k_out))
+    return parts
+
+
+def _smart_cut_part_cmd(source_path, part_path, mode, first_frame, frame_count, fps, stream):
+    """Commande d'une partie de coupe (MP4, paramètres de codec répétés dans le flux)."""
+    copy_bsf, encoder_params, _ = SMART_CUT_IN_BAND.get(stream.get('codec_name'), ([], [], None))
+    if mode == 'copy':
+        # Seek d'entrée juste après la keyframe : ffmpeg part de cette keyframe. Sans
+        # make_zero, la keyframe (antérieure au seek) serait masquée.
+        seek_s = (first_frame + 0.5) / fps
+        codec = ['-c:v', 'copy', *copy_bsf, '-avoid_negative_ts', 'make_zero']
+    else:
+        # Seek précis (décodage) : première frame gardée = first_frame
+        seek_s = max(0.0, (first_frame - 0.5) / fps)
+        codec = [
+            '-c:v', SMART_CUT_ENCODERS[stream.get('codec_name')],
+            '-preset', 'veryfast', '-crf', '16',
+            '-pix_fmt', stream.get('pix_fmt') or 'yuv420p',
+            *encoder_params,
+        ]
+    return [
+        'ffmpeg', '-y',
+        '-loglevel', 'error',
+        '-ss', f"{seek_s:.6f}",
+        '-i', str(source_path),
+        '-map', '0:v:0',
+        '-frames:v', str(frame_count),
+        *passthrough_args(), # Pas de frame dupliquée pour combler le demi-frame du seek
+        '-an',
+        *codec,
+        '-video_track_timescale', '90000',
+        str(part_path)
+    ]
+
+
+def export_stream_copy(source_path, output_path, start_ms, end_ms, progress_cb=None, cancel_event=None):
+    """
+    Export d'une coupe sans filtre : copie du flux vidéo, sans décodage Python ni
+    réencodage complet. Si les points de coupe ne tombent pas sur des keyframes, seuls
+    les GOP partiels des bords sont réencodés (rendu intelligent). Repli sur l'export
+    série si ffprobe ou le codec ne le permettent pas.
+    """
+    output_path = Path(output_path)
+    stream = probe_video_stream(source_path)
+    fps = parse_frame_rate(stream.get('avg_frame_rate')) or parse_frame_rate(stream.get('r_frame_rate'))
+    if not fps:
+        return export_video_with_filters(source_path, output_path, start_ms, end_ms, None,
+                                         progress_cb, cancel_event)
+
+    first_frame, frames_to_process = _frame_range(fps, start_ms, end_ms)
+    # Une frame de marge : une keyframe pile sur le point de sortie évite un réencodage
+    keyframes = probe_keyframes(source_path, fps, start_ms, end_ms + 1000.0 / fps)
+    parts = plan_smart_cut(first_frame, frames_to_process, keyframes)
+    needs_encode = any(mode == 'encode' for mode, _, _ in parts)
+    if not any(mode == 'copy' for mode, _, _ in parts) or (
+            needs_encode and stream.get('codec_name') not in SMART_CUT_ENCODERS):
+        return export_video_with_filters(source_path, output_path, start_ms, end_ms, None,
+                                         progress_cb, cancel_event)
+
+    # Copie seule : un seul jeu de paramètres, l'étiquette d'origine convient
+    video_tag = SMART_CUT_IN_BAND[stream.get('codec_name')][2] if needs_encode else None
+    print(f"✂️ Coupe sans réencodage : {' + '.join(f'{mode} {count}' for mode, _, count in parts)} frames")
+    parts_dir = output_path.parent / f"~{output_path.stem}_parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    part_paths = [parts_dir / f"part_{i:02d}.mp4" for i in range(len(parts))]
+    reporter = _ProgressReporter(frames_to_process, progress_cb)
+    succes = False
+    try:
+        done = 0
+        for (mode, part_first, part_count), part_path in zip(parts, part_paths):
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportAnnule("Export annulé")
+            result = subprocess.run(
+                _smart_cut_part_cmd(source_path, part_path, mode, part_first, part_count, fps, stream),
+                capture_output=True,
+                creationflags=_creation_flags()
+            )
+            if result.returncode != 0:
+                stderr_output = result.stderr.decode('utf-8', errors='replace') or "Erreur inconnue"
+                raise Exception(f"Erreur FFmpeg ({mode}): {stderr_output[-200:]}")
+            done += part_count
+            reporter.update(done, force=True)
+
+        list_path = parts_dir / "parts.txt"
+        _write_concat_list(list_path, part_paths)
+        duration_s = (end_ms - start_ms) / 1000.0
+        # Audio recopié ; réencodé seulement si le conteneur de sortie le refuse
+        for copy_audio in (True, False):
+            result = subprocess.run(
+                _concat_cmd(list_path, output_path, source_path, start_ms, duration_s, copy_audio,
+                            video_tag=video_tag),
+                capture_output=True,
+                creationflags=_creation_flags()
+            )
+            if result.returncode == 0:
+                break
+        if result.returncode != 0:
+            stderr_output = result.stderr.decode('utf-8', errors='replace') or "Erreur inconnue"
+            raise Exception(f"Erreur lors de l'assemblage FFmpeg: {stderr_output[-200:]}")
+        succes = True
+        print("✅ Coupe terminée.")
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        if not succes:
+            _supprimer_fichier_partiel(output_path)
+
+
+def export_video(source_path, output_path, start_ms, end_ms, filters=None, workers=None,
+                 progress_cb=None, cancel_event=None, frame_cb=None, pipe_pix_fmt='bgr24'):
+    """
+    Point d'entrée des exports :
+    - avec frame_cb (aperçu) : export série, seul chemin où les frames filtrées
+      repassent par ce processus ;
+    - sans filtre : copie de flux avec rendu intelligent des bords ;
+    - avec filtres : segments parallèles si l'extrait est assez long pour plusieurs
+      processus, export série sinon.
+    pipe_pix_fmt s'applique aux chemins qui encodent des frames brutes.
+    """
+    if frame_cb is not None:
+        return export_video_with_filters(source_path, output_path, start_ms, end_ms, filters,
+                                         progress_cb, cancel_event, frame_cb, pipe_pix_fmt)
+    if not filters:
+        return export_stream_copy(source_path, output_path, start_ms, end_ms, progress_cb, cancel_event)
+    workers = workers or default_segment_workers()
+    if workers > 1:
+        return export_video_segments(source_path, output_path, start_ms, end_ms, filters, workers,
+                                     progress_cb, cancel_event, pipe_pix_fmt)
+    return export_video_with_filters(source_path, output_path, start_ms, end_ms, filters,
+                                     progress_cb, cancel_event, pipe_pix_fmt=pipe_pix_fmt)
+
+
+# ═══════════════════════════════════════════════════════════════
+# EXPORT MULTI-SORTIES
+# ═══════════════════════════════════════════════════════════════
+
+OUTPUT_TYPES = ('video', 'images', 'planche')
+
+# Profils de sorties : une seule passe de décodage + filtres alimente toutes les sorties.
+# Clés : type, suffixe (ajouté au nom de base), hauteur/largeur, codec, crf, preset,
+# intervalle_s (échantillonnage des images), colonnes et largeur_vignette (planche).
+OUTPUT_PROFILES = {
+    "Vidéo seule": [
+        {'type': 'video'},
+    ],
+    "Master + web 720p + planche contact": [
+        {'type': 'video', 'crf': 18, 'preset': 'slow'},
+        {'type': 'video', 'suffixe': '_web720p', 'hauteur': 720, 'crf': 26, 'preset': 'fast'},
+        {'type': 'planche', 'suffixe': '_planche', 'intervalle_s': 10},
+    ],
+}
+
+
+def resoudre_sorties(specs, output_path):
+    """
+    Complète chaque spécification de sortie avec son chemin ('chemin'), dérivé de
+    output_path : <nom><suffixe>.mp4 pour une vidéo, .jpg pour une planche, dossier
+    <nom><suffixe> pour des images.
+    """
+    output_path = Path(output_path)
+    sorties = []
+    for spec in specs:
+        spec = dict(spec)
+        kind = spec.setdefault('type', 'video')
+        if kind not in OUTPUT_TYPES:
+            raise ValueError(f"Type de sortie inconnu : {kind}")
+        if not spec.get('chemin'):
+            nom = output_path.stem + spec.get('suffixe', '')
+            if kind == 'video':
+                chemin = output_path.with_name(nom + (output_path.suffix or '.mp4'))
+            elif kind == 'planche':
+                chemin = output_path.with_name(nom + spec.get('extension', '.jpg'))
+            else:
+                chemin = output_path.with_name(nom)
+            spec['chemin'] = str(chemin)
+        sorties.append(spec)
+    return sorties
+
+
+def sorties_profil(profil, output_path):
+    """Sorties d'un profil de OUTPUT_PROFILES, nommées à partir de output_path."""
+    return resoudre_sorties(OUTPUT_PROFILES[profil], output_path)
+
+
+def _taille_sortie(width, height, spec):
+    """Taille d'une sortie vidéo/image (jamais agrandie au-delà de la source)."""
+    largeur, hauteur = spec.get('largeur') or -1, spec.get('hauteur') or -1
+    if (largeur < 0 or largeur >= width) and (hauteur < 0 or hauteur >= height):
+        return width, height
+    return scaled_size(width, height, size=(largeur, hauteur))
+
+
+def _horodatage(ms):
+    secondes = int(ms // 1000)
+    return f"{secondes // 3600:02d}:{secondes // 60 % 60:02d}:{secondes % 60:02d}"
+
+
+def annotate_tile(vignette, ms):
+    """Inscrit l'horodatage (HH:MM:SS) en bas à gauche de la vignette (modifiée en place)."""
+    cv2.putText(vignette, _horodatage(ms), (6, vignette.shape[0] - 8),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+    return vignette
+
+
+def assemble_grid(vignettes, colonnes):
+    """Assemble des vignettes de même taille en une grille de `colonnes` colonnes (fond noir)."""
+    colonnes = max(1, min(int(colonnes), len(vignettes)))
+    h, w = vignettes[0].shape[:2]
+    lignes = -(-len(vignettes) // colonnes)
+    grille = np.zeros((lignes * h, colonnes * w) + vignettes[0].shape[2:], dtype=vignettes[0].dtype)
+    for i, vignette in enumerate(vignettes):
+        y, x = divmod(i, colonnes)
+        grille[y * h:(y + 1) * h, x * w:(x + 1) * w] = vignette
+    return grille
+
+
+class _ImageWriter(_FrameSink):
+    """Enregistre les frames échantillonnées dans un dossier (frame_<numéro>.<ext>)."""
+
+    def __init__(self, spec, width, height):
+        self.dossier = Path(spec['chemin'])
+        self.extension = spec.get('extension', '.jpg')
+        self.size = _taille_sortie(width, height, spec)
+        self.fichiers = []
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        super().__init__()
+
+    def handle(self, index, frame):
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        path = self.dossier / f"frame_{index:06d}{self.extension}"
+        save_image(path, frame)
+        self.fichiers.append(path)
+
+    def finish(self):
+        return [str(p) for p in self.fichiers]
+
+    def cleanup(self):
+        for path in self.fichiers:
+            _supprimer_fichier_partiel(path)
+
+
+class _ContactSheetWriter(_FrameSink):
+    """Assemble les frames échantillonnées en une planche contact horodatée."""
+
+    def __init__(self, spec, width, height, fps):
+        self.chemin = Path(spec['chemin'])
+        self.colonnes = max(1, int(spec.get('colonnes', 5)))
+        largeur = int(spec.get('largeur_vignette', 320))
+        self.size = scaled_size(width, height, size=(largeur, -1))
+        self.fps = fps
+        self.vignettes = []
+        super().__init__()
+
+    def handle(self, index, frame):
+        vignette = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        self.vignettes.append(annotate_tile(vignette, index * 1000.0 / self.fps))
+
+    def finish(self):
+        if not self.vignettes:
+            return []
+        save_image(self.chemin, assemble_grid(self.vignettes, self.colonnes))
+        return [str(self.chemin)]
+
+    def cleanup(self):
+        _supprimer_fichier_partiel(self.chemin)
+
+
+def export_multi(source_path, sorties, start_ms, end_ms, filters=None, progress_cb=None,
+                 cancel_event=None, pipe_pix_fmt='bgr24'):
+    """
+    Produit plusieurs sorties d'un même extrait en un seul décodage et une seule
+    application des filtres. Chaque frame filtrée est distribuée :
+    - aux encodeurs ffmpeg des sorties 'video' (un pipe et un thread d'écriture chacun,
+      la réduction à la taille de la sortie est faite dans ce thread) ;
+    - aux écrivains d'images des sorties 'images' et 'planche', qui ne reçoivent
+      qu'une frame toutes les `intervalle_s` secondes.
+    `sorties` : spécifications complétées par resoudre_sorties (clé 'chemin').
+    Progression et annulation comme export_video_with_filters ; en cas d'échec, toutes
+    les sorties partielles sont supprimées. Retourne les statistiques de l'export
+    (dont 'fichiers', la liste des fichiers produits).
+    """
+    filters = dict(filters or {})
+    cap = open_decoder(source_path, backend='opencv')
+    if not cap.isOpened():
+        raise Exception("Impossible d'ouvrir la vidéo source")
+
+    fps = cap.fps or 25
+    first_frame, frames_to_process = _frame_range(fps, start_ms, end_ms)
+    cap.seek_frame(first_frame)
+
+    encoders = [] # (process, writer, chemin)
+    samplers = [] # (writer, pas en frames)
+    succes = False
+    try:
+        for spec in sorties:
+            kind = spec.get('type', 'video')
+            if kind == 'video':
+                size = _taille_sortie(cap.width, cap.height, spec)
+                pix_fmt = _pipe_pix_fmt(size[0], size[1], pipe_pix_fmt)
+                process = _start_encoder(_encoder_cmd(
+                    size[0], size[1], fps, spec['chemin'],
+                    audio_source=source_path if spec.get('audio', True) else None,
+                    start_ms=start_ms, duration_s=(end_ms - start_ms) / 1000.0,
+                    pix_fmt=pix_fmt,
+                    codec=spec.get('codec', 'libx264'),
+                    crf=spec.get('crf', 23),
+                    preset=spec.get('preset', 'medium')
+                ))
+                encoders.append((process, _PipeWriter(process.stdin, pix_fmt, size), Path(spec['chemin'])))
+            else:
+                pas = max(1, int(round(float(spec.get('intervalle_s', 5)) * fps)))
+                if kind == 'planche':
+                    writer = _ContactSheetWriter(spec, cap.width, cap.height, fps)
+                else:
+                    writer = _ImageWriter(spec, cap.width, cap.height)
+                samplers.append((writer, pas))
+
+        print(f"🎬 Export multi-sorties : {len(encoders)} vidéo(s), {len(samplers)} sortie(s) image "
+              f"({len(filters)} filtres actifs)")
+        reporter = _ProgressReporter(frames_to_process, progress_cb)
+        count = 0
+        while count < frames_to_process:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportAnnule("Export annulé")
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if any(writer.error is not None for _, writer, _ in encoders):
+                break # Un encodeur a échoué : erreur levée à la fermeture
+            frame = _apply_filters(frame, filters)
+            index = first_frame + count
+            for _, writer, _ in encoders:
+                writer.put(frame, index)
+            for writer, pas in samplers:
+                if count % pas == 0:
+                    writer.put(frame, index)
+            count += 1
+            reporter.update(count)
+
+        fichiers = []
+        stats = {'pipe_octets': 0, 'pipe_ecriture_s': 0.0}
+        for process, writer, chemin in encoders:
+            writer.close()
+            if writer.error is not None:
+                raise Exception(f"Erreur écriture pipe ({chemin.name}): {writer.error}")
+            _finish_encoder(process)
+            stats['pipe_octets'] += writer.bytes_written
+            stats['pipe_ecriture_s'] += writer.write_s
+            fichiers.append(str(chemin))
+        for writer, _ in samplers:
+            writer.close()
+            if writer.error is not None:
+                raise writer.error
+            fichiers.extend(writer.finish())
+
+        reporter.update(count, force=True)
+        succes = True
+        print(f"✅ Export multi-sorties terminé : {len(fichiers)} fichier(s).")
+        stats['fichiers'] = fichiers
+        return _pipe_stats(stats, count, time.monotonic() - reporter.started, pipe_pix_fmt)
+    finally:
+        cap.release()
+        if not succes:
+            for process, writer, chemin in encoders:
+                writer.close(discard=True)
+                _abort_encoder(process)
+                _supprimer_fichier_partiel(chemin)
+            for writer, _ in samplers:
+                writer.close(discard=True)
+                writer.cleanup()
@@ -0,0 +1,120 @@
+"""
+Cache de frames décodées pour la navigation arrière (lecture inversée, pas à pas).
+Reculer d'une frame avec un décodeur impose un seek, donc un décodage depuis
+la keyframe précédente. Ici, on décode une fois un bloc entier de frames vers
+l'avant et on le garde dans un LRU borné en mémoire.
+"""
+from collections import OrderedDict
+
+import cv2
+
+
+class GopFrameCache:
+    """
+    LRU de frames indexées par numéro de frame, borné en octets.
+    - block_size : nombre de frames décodées d'un coup lors d'un défaut de cache
+      (OpenCV n'exposant pas les keyframes, on utilise des blocs de taille fixe,
+      de l'ordre d'un GOP). Le bloc est raccourci pour tenir deux fois dans
+      max_bytes : en 4K, 32 frames dépassent le budget et le bloc s'évincerait
+      lui-même avant d'avoir servi.
+    - max_side : si défini, les frames sont réduites (plus grand côté) avant stockage.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, block_size=32, max_side=None):
+        self.max_bytes = max_bytes
+        self.block_size = max(1, int(block_size))
+        self.max_side = max_side
+        self._frames = OrderedDict()
+        self._nbytes = 0
+        self.frame_nbytes = 0 # Taille d'une frame stockée (connue dès la première)
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, index):
+        return index in self._frames
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    @property
+    def effective_block_size(self):
+        """Taille de bloc utilisée : block_size, bornée par la moitié du budget."""
+        if not self.frame_nbytes:
+            return self.block_size
+        return max(1, min(self.block_size, self.max_bytes // self.frame_nbytes // 2))
+
+    def set_frame_size(self, width, height, channels=3):
+        """Annonce la taille des frames décodées (avant tout décodage), réduction comprise."""
+        if self.max_side and max(width, height) > self.max_side:
+            scale = self.max_side / float(max(width, height))
+            width, height = max(1, int(width * scale)), max(1, int(height * scale))
+        self.frame_nbytes = int(width) * int(height) * int(channels)
+
+    def clear(self):
+        self._frames.clear()
+        self._nbytes = 0
+        self.frame_nbytes = 0
+
+    def get(self, index):
+        """Frame en cache (marquée comme récemment utilisée) ou None."""
+        frame = self._frames.get(index)
+        if frame is not None:
+            self._frames.move_to_end(index)
+        return frame
+
+    def put(self, index, frame):
+        """Ajoute une frame et évince les plus anciennes au-delà de max_bytes."""
+        if frame is None:
+            return
+        frame = self._prepare(frame)
+        previous = self._frames.pop(index, None)
+        if previous is not None:
+            self._nbytes -= previous.nbytes
+        self._frames[index] = frame
+        self._nbytes += frame.nbytes
+        self.frame_nbytes = frame.nbytes
+        while self._nbytes > self.max_bytes and len(self._frames) > 1:
+            _, evicted = self._frames.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    def block_range(self, index, total_frames=None):
+        """Bornes [début, fin) du bloc contenant `index`."""
+        block_size = self.effective_block_size
+        start = index - index % block_size
+        stop = start + block_size
+        if total_frames:
+            stop = min(stop, total_frames)
+        return start, stop
+
+    def fill_block(self, cap, index, total_frames=None):
+        """
+        Décode vers l'avant tout le bloc contenant `index` (un seul seek) et le met en cache.
+        `cap` est un Decoder (kosmos_processing.decoders). Après l'appel, sa position
+        est indéterminée (fin du bloc).
+        Retourne la frame demandée ou None.
+        """
+        start, stop = self.block_range(index, total_frames)
+        cap.seek_frame(start)
+        wanted = None
+        for frame_index in range(start, stop):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            self.put(frame_index, frame)
+            if frame_index == index:
+                wanted = frame
+        # Relire depuis le cache : la frame peut avoir été réduite par _prepare
+        return self.get(index) if wanted is not None else None
+
+    def _prepare(self, frame):
+        if not self.max_side:
+            return frame
+        height, width = frame.shape[:2]
+        longest = max(height, width)
+        if longest <= self.max_side:
+            return frame
+        scale = self.max_side / float(longest)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
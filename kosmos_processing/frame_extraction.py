@@ -0,0 +1,169 @@
+"""
+Extraction d'images en masse pour les jeux de données d'annotation d'espèces.
+Chaque vidéo est décodée une seule fois : les instants demandés sont triés et atteints
+dans l'ordre de la timeline, par lecture vers l'avant lorsque la cible est proche et
+par seek sinon. Les images sont encodées et écrites en parallèle par un pool de threads
+(cv2.imencode relâche le GIL). Un manifeste CSV décrit chaque image : fichier, vidéo,
+instant et valeurs des capteurs à cet instant.
+"""
+import csv
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .capture_writer import encode_params, save_image
+from .decoders import open_decoder
+from .export import ExportAnnule, _ProgressReporter, _apply_filters, _horodatage
+from .probe import probe_media
+
+# En deçà de cet écart, lire vers l'avant coûte moins qu'un seek (qui redécode
+# depuis la keyframe précédente)
+SEEK_MIN_GAP_S = 2.0
+
+MANIFEST_NAME = "manifest.csv"
+MANIFEST_COLUMNS = ['fichier', 'video', 'timestamp_ms', 'horodatage', 'pression', 'temperature', 'lux']
+
+
+def plan_timestamps(duration_ms, every_s=None, timestamps_ms=None):
+    """
+    Instants (ms) à extraire d'une vidéo : toutes les `every_s` secondes et/ou la liste
+    `timestamps_ms`. Le résultat est trié, sans doublon et limité à la durée.
+    """
+    instants = set()
+    if every_s and every_s > 0:
+        step = int(round(every_s * 1000))
+        instants.update(range(0, max(0, int(duration_ms)), step))
+    for t in timestamps_ms or []:
+        if 0 <= t < duration_ms:
+            instants.add(int(t))
+    return sorted(instants)
+
+
+def parse_sampling_plan(text):
+    """
+    Plan saisi par l'utilisateur -> (every_s, timestamps_ms).
+    - une seule valeur en secondes ("5", "2,5") : une image toutes les N secondes ;
+    - une liste d'instants séparés par ';' ou des espaces ("0:30; 1:15; 90.5"),
+      en secondes, mm:ss ou hh:mm:ss.
+    Lève ValueError si le texte est illisible.
+    """
+    text = (text or '').strip()
+    if not text:
+        raise ValueError("Plan d'échantillonnage vide")
+    items = [item for item in text.replace(';', ' ').split() if item]
+    if len(items) == 1 and ':' not in items[0]:
+        every_s = float(items[0].replace(',', '.'))
+        if every_s <= 0:
+            raise ValueError("L'intervalle doit être positif")
+        return every_s, []
+
+    timestamps_ms = []
+    for item in items:
+        seconds = 0.0
+        for part in item.split(':'):
+            seconds = seconds * 60 + float(part.replace(',', '.'))
+        timestamps_ms.append(int(round(seconds * 1000)))
+    return None, timestamps_ms
+
+
+def read_frames_at(decoder, timestamps_ms, is_cancelled=None):
+    """
+    Générateur (instant, frame) dans l'ordre de la timeline, en un seul passage du
+    décodeur. Les instants doivent être triés (voir plan_timestamps).
+    """
+    fps = decoder.fps or 25
+    max_gap = int(SEEK_MIN_GAP_S * fps)
+    position = None # Prochaine frame que read() renverra
+    for t in timestamps_ms:
+        if is_cancelled and is_cancelled():
+            raise ExportAnnule("Extraction annulée")
+        target = int(round(t * fps / 1000.0))
+        gap = target - position if position is not None else -1
+        if 0 <= gap <= max_gap:
+            for _ in range(gap):
+                if not decoder.grab():
+                    return
+        else:
+            decoder.seek_frame(target)
+        ret, frame = decoder.read()
+        if not ret:
+            return
+        position = target + 1
+        yield t, frame
+
+
+def extract_dataset(sources, output_dir, every_s=None, timestamps_ms=None, filters=None,
+                    image_ext='.jpg', workers=None, progress_cb=None, cancel_event=None):
+    """
+    Extrait des images de plusieurs vidéos vers `output_dir` et écrit le manifeste CSV.
+    - sources : liste de dicts {'nom', 'chemin', 'capteurs'} où 'capteurs' est une
+      fonction optionnelle instant_ms -> {grandeur: valeur} (ex. TimeseriesData.sample_at).
+    - every_s / timestamps_ms : plan d'échantillonnage appliqué à chaque vidéo.
+    - filters : chaîne de filtres (dict nom -> (fonction, kwargs)) appliquée aux images.
+    - progress_cb(faites, total, images/s, eta_s) et cancel_event comme pour les exports.
+    Retourne le chemin du manifeste. En cas d'annulation (ExportAnnule), les images
+    déjà écrites restent décrites par le manifeste.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    filters = dict(filters or {})
+    params = encode_params(image_ext)
+    is_cancelled = cancel_event.is_set if cancel_event is not None else (lambda: False)
+
+    # Plans établis d'abord : le total permet une progression sur toute la campagne
+    plans = []
+    for source in sources:
+        duration_ms = int(probe_media(source['chemin'])['duree_s'] * 1000)
+        if duration_ms <= 0:
+            print(f"⚠️ Durée inconnue, vidéo ignorée : {source['nom']}")
+            continue
+        plans.append((source, plan_timestamps(duration_ms, every_s, timestamps_ms)))
+
+    total = sum(len(instants) for _, instants in plans)
+    reporter = _ProgressReporter(total, progress_cb)
+    manifest_path = output_dir / MANIFEST_NAME
+    done = 0
+    print(f"🖼️ Extraction de {total} image(s) sur {len(plans)} vidéo(s) vers {output_dir}")
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    with open(manifest_path, 'w', newline='', encoding='utf-8') as f, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(MANIFEST_COLUMNS)
+
+        def flush(pending, keep):
+            """Attend les écritures les plus anciennes et les inscrit au manifeste (ordre de la timeline)."""
+            nonlocal done
+            while len(pending) > keep:
+                t, path, future, source = pending.popleft()
+                future.result()
+                capteurs = source.get('capteurs')
+                sample = capteurs(t) if capteurs else {}
+                writer.writerow([
+                    path.name, source['nom'], t, _horodatage(t),
+                    *(sample.get(name, '') for name in MANIFEST_COLUMNS[4:])
+                ])
+                done += 1
+                reporter.update(done)
+
+        # Écritures en vol bornées : le décodage ne peut pas distancer le disque
+        pending = deque()
+        try:
+            for source, instants in plans:
+                stem = Path(source['nom']).stem
+                decoder = open_decoder(source['chemin'], backend='opencv')
+                try:
+                    for t, frame in read_frames_at(decoder, instants, is_cancelled):
+                        frame = _apply_filters(frame, filters)
+                        path = output_dir / f"{stem}_{t:09d}ms{image_ext}"
+                        pending.append((t, path, pool.submit(save_image, path, frame, params), source))
+                        flush(pending, 2 * workers)
+                finally:
+                    decoder.release()
+        finally:
+            # Y compris les images lancées avant une annulation
+            flush(pending, 0)
+    reporter.update(done, force=True)
+    print(f"✅ Extraction terminée : {done} image(s), manifeste {manifest_path}")
+    return manifest_path
@@ -0,0 +1,70 @@
+"""
+Tampon circulaire d'aperçu pour les shorts.
+L'export du short pousse ici les frames filtrées au fur et à mesure qu'il les encode :
+l'aperçu est visible dès les premières frames, sans second encodage ni fichier
+temporaire. Une frame sur `speed` est conservée, ce qui donne un aperçu accéléré
+lorsqu'il est relu à la cadence de la source.
+"""
+import threading
+from collections import deque
+
+import cv2
+
+from .decoders import scaled_size
+
+
+class PreviewBuffer:
+    """
+    Frames d'aperçu réduites (RGB, plus grand côté max_side), partagées entre le thread
+    d'export (push) et le GUI (get). Au-delà de max_bytes, les plus anciennes sont
+    évincées : l'aperçu boucle alors sur la fin du clip.
+    - fps : cadence de la source (l'aperçu est affiché à cette cadence).
+    - total_frames : frames attendues côté export, pour afficher l'avancement.
+    """
+
+    def __init__(self, fps=25.0, speed=2, max_side=360, max_bytes=128 * 1024 * 1024, total_frames=0):
+        self.fps = fps or 25.0
+        self.speed = max(1, int(speed))
+        self.max_side = max_side
+        self.max_bytes = max_bytes
+        self.total_frames = int(total_frames)
+        self.received = 0
+        self._frames = None # deque créée au premier push, bornée selon la taille des frames
+        self._lock = threading.Lock()
+        self._complete = threading.Event()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frames) if self._frames is not None else 0
+
+    @property
+    def complete(self):
+        return self._complete.is_set()
+
+    def push(self, frame):
+        """Reçoit une frame filtrée BGR (thread d'export) ; ne garde qu'une frame sur `speed`."""
+        index = self.received
+        self.received += 1
+        if frame is None or index % self.speed:
+            return
+        height, width = frame.shape[:2]
+        size = scaled_size(width, height, max_side=self.max_side)
+        if size != (width, height):
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        # cvtColor produit une nouvelle frame contiguë : le thread d'export peut réutiliser la sienne
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with self._lock:
+            if self._frames is None:
+                self._frames = deque(maxlen=max(1, self.max_bytes // max(1, rgb.nbytes)))
+            self._frames.append(rgb)
+
+    def get(self, position):
+        """Frame d'aperçu à la position donnée (0 = plus ancienne conservée) ou None."""
+        with self._lock:
+            if not self._frames or not 0 <= position < len(self._frames):
+                return None
+            return self._frames[position]
+
+    def finish(self):
+        """Signale la fin de l'export : l'aperçu peut boucler."""
+        self._complete.set()
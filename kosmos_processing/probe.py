@@ -0,0 +1,269 @@
+"""
+Lecture légère des métadonnées de conteneur (durée, cadence, résolution, codec...).
+Pour les MP4/MOV, l'atome `moov` est lu directement : seuls les en-têtes des boîtes
+sont parcourus, sans ouvrir de décodeur ni lire les données vidéo (important sur les
+disques réseau). Les autres formats passent par ffprobe, lancé en parallèle pour un
+lot de fichiers, puis par OpenCV en dernier recours.
+"""
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .decoders import open_decoder, parse_frame_rate
+
+MP4_EXTENSIONS = ('.mp4', '.mov', '.m4v', '.3gp')
+
+# Boîtes conteneurs parcourues pour atteindre la piste vidéo
+_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+# Codes d'échantillon -> noms de codec ffprobe
+_CODECS = {
+    b'avc1': 'h264', b'avc3': 'h264',
+    b'hvc1': 'hevc', b'hev1': 'hevc',
+    b'mp4v': 'mpeg4',
+    b'jpeg': 'mjpeg', b'mjpa': 'mjpeg',
+    b'av01': 'av1', b'vp09': 'vp9',
+}
+
+
+def _empty_info(source=None):
+    return {
+        'duree_s': 0.0,
+        'fps': 0.0,
+        'largeur': 0,
+        'hauteur': 0,
+        'codec': '',
+        'nb_frames': 0,
+        'nb_keyframes': None, # None : inconnu (ffprobe ne le donne pas sans lire les paquets)
+        'corrompu': False,
+        'source': source,
+    }
+
+
+def _iter_boxes(f, start, end):
+    """(type, début des données, fin de la boîte) des boîtes de [start, end) ; lève ValueError si tronqué."""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("En-tête de boîte tronqué")
+        size, kind = struct.unpack('>I4s', header)
+        data_start = position + 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                raise ValueError("En-tête de boîte tronqué")
+            size = struct.unpack('>Q', large)[0]
+            data_start += 8
+        elif size == 0:
+            size = end - position # Jusqu'à la fin du fichier
+        if size < data_start - position:
+            raise ValueError(f"Taille de boîte invalide ({kind!r})")
+        box_end = position + size
+        if box_end > end:
+            raise ValueError(f"Boîte {kind.decode('latin-1')} tronquée")
+        yield kind, data_start, box_end
+        position = box_end
+
+
+def _read_full_box(f, start, length):
+    """Données d'une FullBox : (version, contenu après version/flags)."""
+    f.seek(start)
+    data = f.read(length)
+    if len(data) < length or length < 4:
+        raise ValueError("Boîte tronquée")
+    return data[0], data[4:]
+
+
+def _parse_media_header(f, start, end):
+    """mdhd / mvhd : (timescale, durée en unités de timescale)."""
+    version, data = _read_full_box(f, start, end - start)
+    if version == 1:
+        timescale, duration = struct.unpack('>IQ', data[16:28])
+    else:
+        timescale, duration = struct.unpack('>II', data[8:16])
+    return timescale, duration
+
+
+def _parse_track(f, start, end, track):
+    """Remplit `track` (dict) avec ce qui concerne la piste, en descendant dans les conteneurs."""
+    for kind, data_start, box_end in _iter_boxes(f, start, end):
+        if kind in _CONTAINERS:
+            _parse_track(f, data_start, box_end, track)
+        elif kind == b'hdlr':
+            _, data = _read_full_box(f, data_start, min(box_end - data_start, 64))
+            track['handler'] = data[4:8]
+        elif kind == b'mdhd':
+            track['timescale'], track['duration'] = _parse_media_header(f, data_start, box_end)
+        elif kind == b'stsd':
+            _, data = _read_full_box(f, data_start, min(box_end - data_start, 64))
+            # entry_count (4), puis la première entrée : taille (4), code (4), 6 réservés,
+            # data_reference_index (2), 16 octets prédéfinis, largeur (2), hauteur (2)
+            if len(data) >= 40:
+                track['codec'] = data[8:12]
+                track['largeur'], track['hauteur'] = struct.unpack('>HH', data[36:40])
+        elif kind == b'stts':
+            _, data = _read_full_box(f, data_start, box_end - data_start)
+            count = struct.unpack('>I', data[:4])[0]
+            if len(data) < 4 + 8 * count:
+                raise ValueError("stts tronquée")
+            entries = struct.unpack(f'>{2 * count}I', data[4:4 + 8 * count])
+            track['nb_frames'] = sum(entries[0::2])
+        elif kind == b'stss':
+            _, data = _read_full_box(f, data_start, 8)
+            track['nb_keyframes'] = struct.unpack('>I', data[:4])[0]
+
+
+def probe_mp4(path):
+    """
+    Métadonnées d'un MP4/MOV lues dans l'atome `moov` (voir probe_media pour les clés).
+    'corrompu' est levé si une boîte dépasse la fin du fichier (enregistrement
+    interrompu) ou si `moov` est absent ; les valeurs lues avant l'erreur sont gardées.
+    """
+    info = _empty_info('mp4')
+    file_size = os.path.getsize(path)
+    movie = None
+    tracks = []
+    with open(path, 'rb') as f:
+        try:
+            for kind, data_start, box_end in _iter_boxes(f, 0, file_size):
+                if kind != b'moov':
+                    continue
+                for child, child_start, child_end in _iter_boxes(f, data_start, box_end):
+                    if child == b'mvhd':
+                        movie = _parse_media_header(f, child_start, child_end)
+                    elif child == b'trak':
+                        track = {}
+                        _parse_track(f, child_start, child_end, track)
+                        tracks.append(track)
+        except (ValueError, struct.error) as e:
+            print(f"⚠️ Conteneur incomplet ({os.path.basename(path)}) : {e}")
+            info['corrompu'] = True
+
+    video = next((t for t in tracks if t.get('handler') == b'vide'), None)
+    if video is None:
+        info['corrompu'] = True
+        if movie and movie[0]:
+            info['duree_s'] = movie[1] / float(movie[0])
+        return info
+
+    timescale = video.get('timescale') or 0
+    if timescale and video.get('duration'):
+        info['duree_s'] = video['duration'] / float(timescale)
+    elif movie and movie[0]:
+        info['duree_s'] = movie[1] / float(movie[0])
+    info['nb_frames'] = video.get('nb_frames', 0)
+    if info['duree_s'] > 0 and info['nb_frames']:
+        info['fps'] = round(info['nb_frames'] / info['duree_s'], 3)
+    info['largeur'] = video.get('largeur', 0)
+    info['hauteur'] = video.get('hauteur', 0)
+    code = video.get('codec', b'')
+    info['codec'] = _CODECS.get(code, code.decode('latin-1', errors='replace').strip())
+    # Sans stss, tous les échantillons sont des keyframes
+    info['nb_keyframes'] = video.get('nb_keyframes', info['nb_frames'])
+    return info
+
+
+def probe_ffprobe(path):
+    """Métadonnées via ffprobe (conteneurs autres que MP4/MOV). Dict vide si ffprobe est absent."""
+    if shutil.which('ffprobe') is None:
+        return {}
+    info = _empty_info('ffprobe')
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'stream=codec_name,width,height,avg_frame_rate,r_frame_rate,nb_frames,duration'
+                         ':format=duration',
+        '-of', 'json', str(path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, creationflags=_creation_flags())
+        data = json.loads(result.stdout or '{}')
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        print(f"⚠️ ffprobe impossible sur {path}: {e}")
+        return {}
+    streams = data.get('streams') or []
+    if result.returncode != 0 or not streams:
+        info['corrompu'] = True
+        return info
+    stream = streams[0]
+    info['codec'] = stream.get('codec_name', '')
+    info['largeur'] = int(stream.get('width') or 0)
+    info['hauteur'] = int(stream.get('height') or 0)
+    info['fps'] = parse_frame_rate(stream.get('avg_frame_rate')) or parse_frame_rate(stream.get('r_frame_rate'))
+    for source in (stream, data.get('format', {})):
+        try:
+            info['duree_s'] = float(source.get('duration'))
+            break
+        except (TypeError, ValueError):
+            continue
+    try:
+        info['nb_frames'] = int(stream['nb_frames'])
+    except (KeyError, ValueError):
+        info['nb_frames'] = int(info['duree_s'] * info['fps'])
+    # Erreurs de démultiplexage signalées sur stderr : fichier abîmé mais lisible
+    info['corrompu'] = bool(result.stderr.strip())
+    return info
+
+
+def probe_opencv(path):
+    """Dernier recours : ouvre un décodeur OpenCV (lent, mais toujours disponible)."""
+    info = _empty_info('opencv')
+    decoder = open_decoder(path, backend='opencv')
+    try:
+        if not decoder.isOpened():
+            info['corrompu'] = True
+            return info
+        info['fps'] = decoder.fps
+        info['nb_frames'] = decoder.frame_count
+        info['largeur'], info['hauteur'] = decoder.width, decoder.height
+        info['duree_s'] = decoder.duration_ms / 1000.0
+    finally:
+        decoder.release()
+    return info
+
+
+def probe_media(path):
+    """
+    Métadonnées de conteneur d'une vidéo, sans décodage :
+    {'duree_s', 'fps', 'largeur', 'hauteur', 'codec', 'nb_frames', 'nb_keyframes',
+     'corrompu', 'source'} où source vaut 'mp4', 'ffprobe' ou 'opencv'.
+    """
+    path = str(path)
+    if os.path.splitext(path)[1].lower() in MP4_EXTENSIONS:
+        try:
+            info = probe_mp4(path)
+            if info['duree_s'] > 0:
+                return info
+        except OSError as e:
+            print(f"⚠️ Lecture du conteneur impossible ({path}): {e}")
+    info = probe_ffprobe(path)
+    if info and info['duree_s'] > 0:
+        return info
+    return probe_opencv(path)
+
+
+def probe_many(paths, workers=None):
+    """
+    probe_media sur un lot de fichiers en parallèle (les appels ffprobe sont des
+    sous-processus, les lectures d'en-têtes des attentes disque). Retourne {chemin: info}.
+    """
+    paths = [str(p) for p in paths]
+    workers = workers or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="probe") as pool:
+        return dict(zip(paths, pool.map(probe_media, paths)))
+
+
+def format_duree(duree_s):
+    """Durée en secondes -> 'HH:MM:SS'."""
+    m, s = divmod(int(duree_s), 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+def _creation_flags() -> int:
+    return subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
@@ -0,0 +1,167 @@
+"""
+Planches contact et storyboards par vidéo.
+Chaque vidéo est décodée une seule fois, avec échantillonnage (pas) et réduction faits
+par le décodeur : seules les vignettes traversent le pipe. Trois fichiers sont produits,
+nommés d'après le nom complet de la vidéo (a.mp4 et a.avi ne se partagent pas de fichier) :
+- <vidéo.ext>_storyboard.jpg : grille horodatée, affichée par la page Tri ;
+- <vidéo.ext>_sprite.jpg : les mêmes vignettes sans annotation (sprite sheet) ;
+- <vidéo.ext>_sprite.json : index des vignettes (instant, position dans le sprite).
+Les fichiers sont réutilisés tant que la vidéo n'a pas été modifiée : la page Tri
+peut les afficher sans relire la vidéo.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from .capture_writer import save_image
+from .decoders import OpenCVDecoder, open_decoder
+from .export import ExportAnnule, annotate_tile, assemble_grid
+
+STORYBOARD_TILES = 30
+STORYBOARD_COLUMNS = 6
+STORYBOARD_TILE_WIDTH = 320
+
+# Dossier par défaut, à côté des vidéos (comme les miniatures .thumbnails)
+STORYBOARD_DIRNAME = ".storyboards"
+
+
+def storyboard_paths(video_path, output_dir=None):
+    """Chemins {'planche', 'sprite', 'index'} des fichiers de storyboard d'une vidéo."""
+    video_path = Path(video_path)
+    output_dir = Path(output_dir) if output_dir else video_path.parent / STORYBOARD_DIRNAME
+    nom = video_path.name
+    return {
+        'planche': output_dir / f"{nom}_storyboard.jpg",
+        'sprite': output_dir / f"{nom}_sprite.jpg",
+        'index': output_dir / f"{nom}_sprite.json",
+    }
+
+
+def storyboard_existant(video_path, output_dir=None):
+    """Chemins du storyboard s'il est complet et plus récent que la vidéo, sinon None."""
+    paths = storyboard_paths(video_path, output_dir)
+    try:
+        video_mtime = os.path.getmtime(video_path)
+        if all(os.path.getmtime(p) >= video_mtime for p in paths.values()):
+            return paths
+    except OSError:
+        pass
+    return None
+
+
+def load_storyboard_index(video_path, output_dir=None):
+    """Index JSON du storyboard (dict) ou None s'il n'existe pas ou est périmé."""
+    paths = storyboard_existant(video_path, output_dir)
+    if paths is None:
+        return None
+    try:
+        with open(paths['index'], encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def generate_storyboard(video_path, output_dir=None, tiles=STORYBOARD_TILES, columns=STORYBOARD_COLUMNS,
+                        tile_width=STORYBOARD_TILE_WIDTH, force=False, is_cancelled=None):
+    """
+    Produit le storyboard d'une vidéo en un seul décodage (`tiles` vignettes de
+    `tile_width` pixels de large, réparties uniformément sur la durée).
+    Les fichiers existants et à jour sont réutilisés, sauf si force=True.
+    Retourne les chemins {'planche', 'sprite', 'index'} ou None si la vidéo est illisible.
+    """
+    paths = storyboard_paths(video_path, output_dir)
+    if not force and storyboard_existant(video_path, output_dir):
+        return paths
+
+    probe = open_decoder(video_path, backend='opencv')
+    fps, frame_count = probe.fps or 25, probe.frame_count
+    probe.release()
+    if frame_count <= 0:
+        print(f"⚠️ Storyboard impossible (vidéo illisible) : {video_path}")
+        return None
+
+    tiles = max(1, min(int(tiles), frame_count))
+    stride = max(1, frame_count // tiles)
+    decoder = open_decoder(video_path, size=(tile_width, -1), stride=stride)
+    # Avec un pas, OpenCV renvoie la dernière frame de chaque pas, ffmpeg la première
+    offset = stride - 1 if isinstance(decoder, OpenCVDecoder) else 0
+    vignettes, instants = [], []
+    try:
+        while len(vignettes) < tiles:
+            if is_cancelled and is_cancelled():
+                raise ExportAnnule("Storyboard annulé")
+            ret, frame = decoder.read()
+            if not ret:
+                break
+            vignettes.append(frame)
+            instants.append(int((len(instants) * stride + offset) * 1000.0 / fps))
+    finally:
+        decoder.release()
+    if not vignettes:
+        print(f"⚠️ Aucune frame décodée pour le storyboard : {video_path}")
+        return None
+
+    paths['planche'].parent.mkdir(parents=True, exist_ok=True)
+    columns = max(1, min(int(columns), len(vignettes)))
+    save_image(paths['sprite'], assemble_grid(vignettes, columns))
+    annotees = [annotate_tile(vignette.copy(), ms) for vignette, ms in zip(vignettes, instants)]
+    save_image(paths['planche'], assemble_grid(annotees, columns))
+
+    h, w = vignettes[0].shape[:2]
+    index = {
+        'video': Path(video_path).name,
+        'fps': fps,
+        'duree_ms': int(frame_count * 1000.0 / fps),
+        'sprite': paths['sprite'].name,
+        'planche': paths['planche'].name,
+        'largeur': w,
+        'hauteur': h,
+        'colonnes': columns,
+        'vignettes': [
+            {'timestamp_ms': ms, 'x': (i % columns) * w, 'y': (i // columns) * h}
+            for i, ms in enumerate(instants)
+        ],
+    }
+    # Index écrit en dernier : sa présence signale un storyboard complet
+    with open(paths['index'], 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=4, ensure_ascii=False)
+    return paths
+
+
+def generate_storyboards(video_paths, output_dir=None, workers=None, progress_cb=None, result_cb=None,
+                         cancel_event=None, **options):
+    """
+    Storyboards de toute une campagne sur un pool de threads (le décodage se fait
+    dans ffmpeg ou OpenCV, hors GIL).
+    - progress_cb(faites, total) après chaque vidéo ;
+    - result_cb(chemin_video, chemins ou None) dès qu'un storyboard est prêt ;
+    - options : tiles, columns, tile_width, force (voir generate_storyboard).
+    Retourne {chemin_video: chemins ou None}.
+    """
+    video_paths = [str(p) for p in video_paths]
+    is_cancelled = cancel_event.is_set if cancel_event is not None else None
+    results = {}
+    workers = workers or min(4, os.cpu_count() or 1)
+    print(f"🎞️ Storyboards de {len(video_paths)} vidéo(s)")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="storyboard") as pool:
+        futures = {
+            pool.submit(generate_storyboard, path, output_dir, is_cancelled=is_cancelled, **options): path
+            for path in video_paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except ExportAnnule:
+                results[path] = None
+            except Exception as e:
+                print(f"❌ Storyboard en échec pour {path}: {e}")
+                results[path] = None
+            if result_cb:
+                result_cb(path, results[path])
+            if progress_cb:
+                progress_cb(len(results), len(video_paths))
+    if is_cancelled and is_cancelled():
+        raise ExportAnnule("Storyboards annulés")
+    return results
@@ -3,6 +3,7 @@ APPLICATION PRINCIPALE - KOSMOS
 Application complète avec navigation entre les pages
 Architecture MVC
 """
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -263,4 +264,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # Build PyInstaller : les processus 'spawn' de l'export parallèle ne doivent pas relancer l'application
+    multiprocessing.freeze_support()
     main()
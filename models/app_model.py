@@ -6,11 +6,27 @@ Architecture MVC - Couche Modèle
 import os
 import json
 import csv
-import cv2
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Optional
 from datetime import datetime
 
+from kosmos_processing.probe import format_duree, probe_media
+from models.campaign_store import CampagneSQLite, chemin_sqlite, est_fichier_sqlite, marquer_json_remplace
+from models.compact_metadata import SCHEMA_COMMUNES, SCHEMA_PROPRES, MetadonneesCompactes
+from models.json_cache import CACHE_JSON, lire_json
+from models.timeseries import TimeseriesData
+
+# Au-delà de ce nombre de vidéos, les campagnes JSON sont converties en SQLite à l'ouverture
+SQLITE_SEUIL_VIDEOS = 2000
+
+# Suffixe des dossiers de campagne stéréo (ex. 250821_Kstereo/0122/) : leurs stations
+# enregistrent plusieurs vidéos synchronisées, lues côte à côte
+MARQUEUR_STEREO = '_kstereo'
+
+# Extensions reconnues lors de l'importation (comparées en minuscules)
+EXTENSIONS_VIDEO = ('.mp4', '.avi', '.mov', '.mkv', '.h264', '.mpg', '.mpeg')
+
 # Constants for Metadata Labels
 METADATA_COMMUNES_LABELS = {
     'system_camera': 'Caméra',
@@ -67,12 +83,58 @@ METADATA_PROPRES_LABELS = {
 }
 
 
+# Valeurs de `Video.duree` tant que la durée n'a pas été lue
+DUREES_INCONNUES = ('', '--:--')
+
+
+def duree_video(chemin: str) -> Optional[str]:
+    """Durée 'HH:MM:SS' lue dans les métadonnées du conteneur (None si inconnue)."""
+    info = probe_media(chemin)
+    if info['corrompu']:
+        print(f"⚠️ Vidéo tronquée ou corrompue : {chemin}")
+    if info['duree_s'] <= 0:
+        return None
+    return format_duree(info['duree_s'])
+
+
+def empreinte_dossier(chemin_dossier: str, metadata: bool = True) -> Dict[str, List[int]]:
+    """
+    Empreinte d'un dossier de station : taille et date de modification (ns) de chaque
+    vidéo, et des JSON et CSV si `metadata`. Un simple stat par fichier, sans rien ouvrir.
+    """
+    extensions = EXTENSIONS_VIDEO + (('.json', '.csv') if metadata else ())
+    empreinte = {}
+    with os.scandir(chemin_dossier) as entrees:
+        for entree in entrees:
+            if entree.is_file() and os.path.splitext(entree.name)[1].lower() in extensions:
+                stat = entree.stat()
+                empreinte[entree.name] = [stat.st_size, stat.st_mtime_ns]
+    return empreinte
+
+
+# Série vide partagée par les vidéos dont le CSV n'est pas chargé
+_TIMESERIES_VIDE = TimeseriesData()
+
+
 class Video:
     """
-    Classe représentant une vidéo avec ses métadonnées
+    Classe représentant une vidéo avec ses métadonnées.
+    Représentation compacte pour les grosses campagnes : attributs en __slots__,
+    métadonnées stockées sur des schémas de clés partagés (voir compact_metadata),
+    données capteurs chargées à la demande et libérables.
     """
+    __slots__ = (
+        '_campagne', '_id_stockage', '_nom', '_est_conservee', 'chemin', 'dossier_numero',
+        'taille', 'duree', 'date', 'start_time_str', '_metadata_communes', '_metadata_propres',
+        '_timeseries', 'est_selectionnee',
+    )
+
     def __init__(self, nom: str, chemin: str, dossier_numero: str, taille: str = "", duree: str = "", date: str = ""):
-        self.nom = nom
+        # Campagne qui indexe la vidéo : prévenue des changements de nom et de tri
+        self._campagne: Optional['Campagne'] = None
+        self._id_stockage: Optional[int] = None  # Ligne de la base SQLite de la campagne
+        self._nom = nom
+        self._est_conservee = True
         self.chemin = chemin
         self.dossier_numero = dossier_numero  # Numéro du dossier (ex: "0113")
         self.taille = taille
@@ -81,20 +143,72 @@ class Video:
         
         self.start_time_str: str = "00:00:00" 
         
-        self.metadata_communes = {
+        self._metadata_communes = MetadonneesCompactes(SCHEMA_COMMUNES, {
             'system': '',
             'camera': '',
             'model': '',
             'version': ''
-        }
+        })
         
         # Métadonnées propres (campagne) - modifiables
-        self.metadata_propres = {
-            # Tous les champs (gpsDict_Latitude, etc.) sont ajoutés dynamiquement
-        }
+        # Tous les champs (gpsDict_Latitude, etc.) sont ajoutés dynamiquement
+        self._metadata_propres = MetadonneesCompactes(SCHEMA_PROPRES)
+        
+        # Données capteurs (CSV) chargées à la demande
+        self._timeseries: Optional[TimeseriesData] = None
         
         self.est_selectionnee = False
-        self.est_conservee = True
+
+    @property
+    def metadata_communes(self) -> MetadonneesCompactes:
+        return self._metadata_communes
+
+    @metadata_communes.setter
+    def metadata_communes(self, metadonnees: Dict):
+        self._metadata_communes = MetadonneesCompactes(SCHEMA_COMMUNES, metadonnees)
+
+    @property
+    def metadata_propres(self) -> MetadonneesCompactes:
+        return self._metadata_propres
+
+    @metadata_propres.setter
+    def metadata_propres(self, metadonnees: Dict):
+        self._metadata_propres = MetadonneesCompactes(SCHEMA_PROPRES, metadonnees)
+
+    @property
+    def timeseries_data(self) -> TimeseriesData:
+        """Données capteurs chargées (série vide tant que le CSV n'est pas lu)"""
+        return self._timeseries if self._timeseries is not None else _TIMESERIES_VIDE
+
+    @timeseries_data.setter
+    def timeseries_data(self, data: Optional[TimeseriesData]):
+        self._timeseries = data if data else None
+
+    def liberer_donnees_lourdes(self):
+        """Oublie les données capteurs chargées (relues par charger_donnees_timeseries_csv)"""
+        self._timeseries = None
+
+    @property
+    def nom(self) -> str:
+        return self._nom
+
+    @nom.setter
+    def nom(self, nouveau_nom: str):
+        ancien_nom, self._nom = self._nom, nouveau_nom
+        if self._campagne is not None and ancien_nom != nouveau_nom:
+            self._campagne._video_renommee(self, ancien_nom)
+
+    @property
+    def est_conservee(self) -> bool:
+        return self._est_conservee
+
+    @est_conservee.setter
+    def est_conservee(self, conservee: bool):
+        conservee = bool(conservee)
+        if conservee != self._est_conservee:
+            self._est_conservee = conservee
+            if self._campagne is not None:
+                self._campagne._tri_modifie(self)
         
     def get_formatted_metadata_communes(self) -> Dict[str, Dict[str, str]]:
         """Retourne les métadonnées communes organisées par section pour l'affichage."""
@@ -125,6 +239,19 @@ class Video:
                 sections['general'][full_key] = (full_key, value)
         return sections
 
+    def mettre_a_jour_import(self, autre: 'Video'):
+        """
+        Reprend les informations relues à l'import (fichier, durée, heure de début,
+        métadonnées communes du CSV) en gardant les modifications de l'utilisateur.
+        """
+        self.taille = autre.taille
+        self.duree = autre.duree
+        self.date = autre.date
+        self.start_time_str = autre.start_time_str
+        self.metadata_communes.update(autre.metadata_communes)
+        if self._campagne is not None:
+            self._campagne.marquer_modifiees([self])
+
     def to_dict(self) -> Dict:
         """Convertit la vidéo en dictionnaire pour sauvegarde"""
         return {
@@ -134,40 +261,24 @@ class Video:
             'taille': self.taille,
             'duree': self.duree,
             'date': self.date,
-            'metadata_communes': self.metadata_communes,
-            'metadata_propres': self.metadata_propres,
+            'metadata_communes': self.metadata_communes.copy(),
+            'metadata_propres': self.metadata_propres.copy(),
             'est_conservee': self.est_conservee,
             'start_time_str': self.start_time_str
         }
     
     @staticmethod
     def from_dict(data: Dict) -> 'Video':
-        """Crée une vidéo depuis un dictionnaire"""
-        duree = data.get('duree', '')
-        chemin = data.get('chemin', '')
-        
-        # Si la durée est manquante ou invalide, on tente de la recalculer
-        if (not duree or duree == "--:--") and chemin and os.path.exists(chemin):
-            try:
-                cap = cv2.VideoCapture(chemin)
-                if cap.isOpened():
-                    fps = cap.get(cv2.CAP_PROP_FPS)
-                    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                    if fps > 0:
-                        duration_sec = frame_count / fps
-                        m, s = divmod(duration_sec, 60)
-                        h, m = divmod(m, 60)
-                        duree = f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
-                cap.release()
-            except Exception:
-                pass
-
+        """
+        Crée une vidéo depuis un dictionnaire, sans ouvrir le fichier : une durée
+        manquante reste inconnue (voir ApplicationModel.resoudre_durees).
+        """
         video = Video(
             nom=data.get('nom', ''),
-            chemin=chemin,
+            chemin=data.get('chemin', ''),
             dossier_numero=data.get('dossier_numero', ''),
             taille=data.get('taille', ''),
-            duree=duree,
+            duree=data.get('duree', ''),
             date=data.get('date', '')
         )
         video.metadata_communes = data.get('metadata_communes', {})
@@ -177,28 +288,51 @@ class Video:
         
         return video
 
+    def chemin_json(self) -> Path:
+        """JSON de la station (<dossier>.json à côté de la vidéo)"""
+        return Path(self.chemin).parent / f"{self.dossier_numero}.json"
+
+    @staticmethod
+    def _aplatir(cible, section_data, prefix=''):
+        for key, value in section_data.items():
+            if isinstance(value, dict):
+                Video._aplatir(cible, value, prefix=f"{prefix}{key}_")
+            else:
+                cible[f"{prefix}{key}"] = str(value) if value is not None else ""
+
+    def _remplir_propres(self, data: Dict):
+        self.metadata_propres.clear()
+        if 'video' in data:
+            self._aplatir(self.metadata_propres, data['video'])
+
+    def _remplir_communes(self, data: Dict):
+        self.metadata_communes.clear()
+        if 'system' in data: self._aplatir(self.metadata_communes, data['system'], "system_")
+        if 'campaign' in data: self._aplatir(self.metadata_communes, data['campaign'], "campaign_")
+
+    def charger_metadonnees_json(self) -> bool:
+        """
+        Charge en une lecture les métadonnées propres et communes depuis le JSON.
+        Le fichier analysé est gardé en cache (json_cache) tant qu'il n'est pas modifié.
+        """
+        try:
+            data = lire_json(self.chemin_json())
+            if data is None:
+                return False
+            self._remplir_propres(data)
+            self._remplir_communes(data)
+            return True
+        except Exception as e:
+            print(f"❌ Erreur lecture JSON (model): {e}")
+            return False
+
     def charger_metadonnees_propres_json(self) -> bool:
         """Charge les métadonnées propres (section 'video') depuis le JSON."""
         try:
-            json_path = Path(self.chemin).parent / f"{self.dossier_numero}.json"
-            if not json_path.exists():
+            data = lire_json(self.chemin_json())
+            if data is None:
                 return False
-            
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self.metadata_propres.clear()
-            
-            def flatten_dict(section_data, prefix=''):
-                for key, value in section_data.items():
-                    if isinstance(value, dict):
-                        flatten_dict(value, prefix=f"{prefix}{key}_")
-                    else:
-                        full_key = f"{prefix}{key}"
-                        self.metadata_propres[full_key] = str(value) if value is not None else ""
-
-            if 'video' in data:
-                flatten_dict(data['video'])
+            self._remplir_propres(data)
             return True
         except Exception as e:
             print(f"❌ Erreur lecture JSON propres (model): {e}")
@@ -207,19 +341,10 @@ class Video:
     def charger_metadonnees_communes_json(self) -> bool:
         """Charge les métadonnées communes ('system', 'campaign') depuis le JSON."""
         try:
-            json_path = Path(self.chemin).parent / f"{self.dossier_numero}.json"
-            if not json_path.exists(): return False
-
-            with open(json_path, 'r', encoding='utf-8') as f: data = json.load(f)
-            self.metadata_communes.clear()
-
-            def flatten_dict(d, p=''):
-                for k, v in d.items():
-                    if isinstance(v, dict): flatten_dict(v, f"{p}{k}_")
-                    else: self.metadata_communes[f"{p}{k}"] = str(v) if v is not None else ""
-            
-            if 'system' in data: flatten_dict(data['system'], "system_")
-            if 'campaign' in data: flatten_dict(data['campaign'], "campaign_")
+            data = lire_json(self.chemin_json())
+            if data is None:
+                return False
+            self._remplir_communes(data)
             return True
         except Exception as e:
             print(f"❌ Erreur lecture JSON communes (model): {e}")
@@ -227,65 +352,17 @@ class Video:
 
     def charger_donnees_timeseries_csv(self) -> bool:
         """Charge les données temporelles (temp, pression...) depuis le CSV."""
-        self.timeseries_data = [] # Réinitialiser les données
+        self._timeseries = None # Réinitialiser les données
         try:
             csv_path = Path(self.chemin).parent / f"{self.dossier_numero}.csv"
             if not csv_path.exists():
                 print(f"⚠️ Fichier CSV non trouvé pour la vidéo: {csv_path}")
                 return False
 
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                # Détecter le délimiteur en lisant la première ligne
-                first_line = f.readline()
-                delimiter = ';' if ';' in first_line else ','
-                f.seek(0) # Revenir au début du fichier
-                reader = csv.DictReader(f, delimiter=delimiter)
-                
-                def hms_to_seconds(hms_str):
-                    """Convertit une chaîne 'HHhMMmSSs' en secondes totales."""
-                    try:
-                        parts = hms_str.lower().replace('s', '').split('h')
-                        h = int(parts[0])
-                        parts = parts[1].split('m')
-                        m = int(parts[0])
-                        s = int(parts[1])
-                        return h * 3600 + m * 60 + s
-                    except (ValueError, IndexError):
-                        return None
-
-                # Lire la première ligne de données pour obtenir l'heure de début
-                all_rows = list(reader)
-                if not all_rows:
-                    return False
-
-                start_hms_str = all_rows[0].get('HMS')
-                start_total_seconds = hms_to_seconds(start_hms_str)
-
-                if start_total_seconds is None:
-                    print("❌ Erreur: Impossible de lire l'heure de début (colonne HMS) dans le CSV.")
-                    return False
-
-                # Mapper les noms de colonnes possibles vers les noms standard
-                column_mapping = {
-                    'pression': 'Pression',
-                    'temperature': 'TempC',
-                    'lux': 'Lux'
-                }
-                
-                for row in all_rows:
-                    processed_row = {}
-                    current_hms_str = row.get('HMS')
-                    current_total_seconds = hms_to_seconds(current_hms_str)
-
-                    for standard_name, csv_name in column_mapping.items():
-                        if csv_name in row and row[csv_name] and row[csv_name].strip():
-                            value = row[csv_name].strip().replace(',', '.')
-                            processed_row[standard_name] = value
-                    
-                    if current_total_seconds is not None:
-                        delta_seconds = current_total_seconds - start_total_seconds
-                        processed_row['timestamp_ms'] = int(delta_seconds * 1000)
-                        self.timeseries_data.append(processed_row)
+            data = TimeseriesData.from_csv(csv_path)
+            if not data:
+                return False
+            self.timeseries_data = data
 
             print(f"✅ Données CSV chargées pour {self.nom}: {len(self.timeseries_data)} points.")
             return True
@@ -296,13 +373,12 @@ class Video:
     def sauvegarder_metadonnees_propres_json(self) -> bool:
         """Sauvegarde les métadonnées propres dans le fichier JSON."""
         try:
-            json_path = Path(self.chemin).parent / f"{self.dossier_numero}.json"
-            if not json_path.exists():
+            json_path = self.chemin_json()
+            # Copie : le contenu en cache ne doit pas changer avant l'écriture
+            data = lire_json(json_path, copie=True)
+            if data is None:
                 return False
             
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
             if 'video' not in data:
                 data['video'] = {}
             
@@ -339,6 +415,7 @@ class Video:
                 with tmp as tf:
                     json.dump(data, tf, indent=4, ensure_ascii=False)
                 Path(tmp.name).replace(json_path)
+                CACHE_JSON.oublier(json_path)
             finally:
                 try:
                     Path(tmp.name).unlink(missing_ok=True)
@@ -353,13 +430,12 @@ class Video:
     def sauvegarder_metadonnees_communes_json(self) -> bool:
         """Sauvegarde les métadonnées communes dans le fichier JSON."""
         try:
-            json_path = Path(self.chemin).parent / f"{self.dossier_numero}.json"
-            if not json_path.exists():
+            json_path = self.chemin_json()
+            # Copie : le contenu en cache ne doit pas changer avant l'écriture
+            data = lire_json(json_path, copie=True)
+            if data is None:
                 return False
             
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
             # 1. System
             if 'system' not in data: data['system'] = {}
             
@@ -397,6 +473,7 @@ class Video:
                 with tmp as tf:
                     json.dump(data, tf, indent=4, ensure_ascii=False)
                 Path(tmp.name).replace(json_path)
+                CACHE_JSON.oublier(json_path)
             finally:
                 try:
                     Path(tmp.name).unlink(missing_ok=True)
@@ -416,35 +493,226 @@ class Campagne:
     def __init__(self, nom: str, emplacement: str):
         self.nom = nom
         self.emplacement = emplacement
-        self.videos: List[Video] = []
+        # Index des vidéos : ordre d'import conservé par le dict (clé id(video)),
+        # accès par nom et par chemin en O(1), vidéos marquées tenues à part
+        self._videos: Dict[int, Video] = {}
+        # Nom -> vidéo, ou liste de vidéos pour les homonymes (rares)
+        self._par_nom: Dict[str, object] = {}
+        self._par_chemin: Dict[str, Video] = {}
+        self._a_supprimer: Dict[int, Video] = {}
+        self._rangs: Dict[int, int] = {}
+        self._prochain_rang = 0
+        self._liste: Optional[List[Video]] = None
+        # Base SQLite optionnelle (voir campaign_store) et modifications pas encore écrites
+        self.stockage: Optional[CampagneSQLite] = None
+        self._a_ecrire: Dict[int, Video] = {}
+        self._a_effacer: Dict[int, None] = {}
         self.workspace_extraction = ""  # Chemin vers le dossier extraction
+        # Empreintes des dossiers importés : dossier -> {fichier: [taille, mtime_ns]}
+        self.empreintes_dossiers: Dict[str, Dict[str, List[int]]] = {}
         self.date_creation = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.date_modification = self.date_creation
         
+    @property
+    def videos(self) -> List[Video]:
+        """Vidéos dans l'ordre d'import (liste recalculée seulement après une modification)"""
+        if self._liste is None:
+            self._liste = list(self._videos.values())
+        return self._liste
+
+    @videos.setter
+    def videos(self, videos: List[Video]):
+        for video in list(self._videos.values()):
+            self._desindexer(video)
+        self._prochain_rang = 0
+        for video in videos:
+            self._indexer(video)
+
+    @property
+    def nb_videos(self) -> int:
+        return len(self._videos)
+
+    @property
+    def nb_conservees(self) -> int:
+        return len(self._videos) - len(self._a_supprimer)
+
+    @property
+    def nb_a_supprimer(self) -> int:
+        return len(self._a_supprimer)
+
+    @staticmethod
+    def _cle_chemin(chemin: str) -> str:
+        cle = os.path.normcase(os.path.abspath(chemin))
+        return chemin if cle == chemin else cle # Partage la chaîne déjà absolue
+
+    def _homonymes(self, nom: str) -> List[Video]:
+        entree = self._par_nom.get(nom)
+        if entree is None:
+            return []
+        return entree if isinstance(entree, list) else [entree]
+
+    def _ajouter_nom(self, video: Video, nom: str):
+        entree = self._par_nom.get(nom)
+        if entree is None:
+            self._par_nom[nom] = video
+        elif isinstance(entree, list):
+            entree.append(video)
+        else:
+            self._par_nom[nom] = [entree, video]
+
+    def _retirer_nom(self, video: Video, nom: str):
+        entree = self._par_nom.get(nom)
+        if entree is video:
+            del self._par_nom[nom]
+        elif isinstance(entree, list) and video in entree:
+            entree.remove(video)
+            if len(entree) == 1:
+                self._par_nom[nom] = entree[0]
+
+    def _indexer(self, video: Video):
+        if video._campagne is not None and video._campagne is not self:
+            video._campagne._desindexer(video)
+        if id(video) in self._videos:
+            return
+        video._campagne = self
+        self._videos[id(video)] = video
+        self._rangs[id(video)] = self._prochain_rang
+        self._prochain_rang += 1
+        self._ajouter_nom(video, video.nom)
+        if video.chemin:
+            self._par_chemin.setdefault(self._cle_chemin(video.chemin), video)
+        if not video.est_conservee:
+            self._a_supprimer[id(video)] = video
+        self._a_ecrire[id(video)] = video
+        self._a_effacer.pop(video._id_stockage, None)
+        self._liste = None
+
+    def _desindexer(self, video: Video):
+        if self._videos.pop(id(video), None) is None:
+            return
+        self._retirer_nom(video, video.nom)
+        if video.chemin and self._par_chemin.get(self._cle_chemin(video.chemin)) is video:
+            del self._par_chemin[self._cle_chemin(video.chemin)]
+        self._a_supprimer.pop(id(video), None)
+        self._rangs.pop(id(video), None)
+        self._a_ecrire.pop(id(video), None)
+        if video._id_stockage is not None:
+            self._a_effacer[video._id_stockage] = None
+        video._campagne = None
+        self._liste = None
+
+    def _video_renommee(self, video: Video, ancien_nom: str):
+        """Appelé par Video.nom : déplace la vidéo dans l'index des noms"""
+        self._retirer_nom(video, ancien_nom)
+        self._ajouter_nom(video, video.nom)
+        self._a_ecrire[id(video)] = video
+
+    def _tri_modifie(self, video: Video):
+        """Appelé par Video.est_conservee : tient à jour les compteurs"""
+        if video.est_conservee:
+            self._a_supprimer.pop(id(video), None)
+        else:
+            self._a_supprimer[id(video)] = video
+        self._a_ecrire[id(video)] = video
+
+    def marquer_modifiees(self, videos: List[Video]):
+        """Signale des vidéos modifiées hors de la campagne (métadonnées) : elles seront réécrites"""
+        for video in videos:
+            if video._campagne is self:
+                self._a_ecrire[id(video)] = video
+
+    def _modifiee(self):
+        self.date_modification = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
     def ajouter_video(self, video: Video):
         """Ajoute une vidéo à la campagne"""
-        self.videos.append(video)
-        self.date_modification = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._indexer(video)
+        self._modifiee()
+
+    def ajouter_videos(self, videos: List[Video]):
+        """Ajoute plusieurs vidéos à la campagne"""
+        for video in videos:
+            self._indexer(video)
+        self._modifiee()
         
     def supprimer_video(self, nom_video: str):
-        """Supprime une vidéo de la campagne"""
-        self.videos = [v for v in self.videos if v.nom != nom_video]
-        self.date_modification = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        """Supprime une vidéo de la campagne (toutes celles qui portent ce nom)"""
+        self.supprimer_videos([nom_video])
+
+    def supprimer_videos(self, noms: List[str]) -> int:
+        """Supprime les vidéos portant ces noms ; retourne le nombre de vidéos retirées"""
+        a_retirer = [v for nom in set(noms) for v in self._homonymes(nom)]
+        self.retirer_videos(a_retirer)
+        return len(a_retirer)
         
     def obtenir_video(self, nom: str) -> Optional[Video]:
-        """Récupère une vidéo par son nom"""
-        for video in self.videos:
-            if video.nom == nom:
-                return video
-        return None
+        """Récupère une vidéo par son nom (la première importée en cas d'homonymes)"""
+        homonymes = self._par_nom.get(nom)
+        if not isinstance(homonymes, list):
+            return homonymes
+        # Après un renommage, l'ordre de la liste d'homonymes n'est plus celui d'import
+        return min(homonymes, key=lambda v: self._rangs[id(v)])
+
+    def obtenir_videos_par_noms(self, noms: List[str]) -> List[Video]:
+        """Vidéos portant ces noms (les noms inconnus sont ignorés)"""
+        return [v for nom in dict.fromkeys(noms) for v in self._homonymes(nom)]
     
+    def obtenir_video_par_chemin(self, chemin: str) -> Optional[Video]:
+        """Récupère une vidéo par son chemin (les noms peuvent se répéter d'un dossier à l'autre)"""
+        return self._par_chemin.get(self._cle_chemin(chemin))
+    
+    def retirer_videos(self, videos: List[Video]):
+        """Retire plusieurs vidéos de la campagne (les fichiers ne sont pas touchés)"""
+        for video in videos:
+            self._desindexer(video)
+        self._modifiee()
+
+    def marquer_videos(self, noms: List[str], conservee: bool) -> int:
+        """Marque des vidéos comme conservées ou à supprimer ; retourne le nombre de vidéos trouvées"""
+        videos = self.obtenir_videos_par_noms(noms)
+        for video in videos:
+            video.est_conservee = conservee
+        return len(videos)
+
+    def modifier_metadonnees_propres(self, noms: List[str], nouvelles_meta: Dict) -> int:
+        """Applique les mêmes métadonnées propres à plusieurs vidéos ; retourne le nombre modifié"""
+        videos = self.obtenir_videos_par_noms(noms)
+        for video in videos:
+            video.metadata_propres.update(nouvelles_meta)
+            self._a_ecrire[id(video)] = video
+        if videos:
+            self._modifiee()
+        return len(videos)
+
+    def supprimer_videos_marquees(self) -> List[Video]:
+        """Retire toutes les vidéos marquées pour suppression ; retourne les vidéos retirées"""
+        marquees = list(self._a_supprimer.values())
+        self.retirer_videos(marquees)
+        return marquees
+    
+    def liberer_donnees_lourdes(self, sauf: Optional[List[Video]] = None) -> int:
+        """Libère les données capteurs chargées, sauf pour les vidéos `sauf` ; retourne le nombre libéré"""
+        gardees = {id(v) for v in sauf or []}
+        liberees = 0
+        for video in self.videos:
+            if video._timeseries is not None and id(video) not in gardees:
+                video.liberer_donnees_lourdes()
+                liberees += 1
+        return liberees
+
+    def obtenir_videos_sans_duree(self) -> List[Video]:
+        """Vidéos dont la durée n'a pas encore été lue"""
+        return [v for v in self.videos if v.duree in DUREES_INCONNUES]
+
     def obtenir_videos_conservees(self) -> List[Video]:
         """Retourne uniquement les vidéos conservées"""
+        if not self._a_supprimer:
+            return list(self.videos)
         return [v for v in self.videos if v.est_conservee]
     
     def obtenir_videos_a_supprimer(self) -> List[Video]:
-        """Retourne les vidéos marquées pour suppression"""
-        return [v for v in self.videos if not v.est_conservee]
+        """Retourne les vidéos marquées pour suppression (dans l'ordre d'import)"""
+        return sorted(self._a_supprimer.values(), key=lambda v: self._rangs[id(v)])
     
     def to_dict(self) -> Dict:
         """Convertit la campagne en dictionnaire pour sauvegarde"""
@@ -454,6 +722,7 @@ class Campagne:
             'workspace_extraction': self.workspace_extraction,
             'date_creation': self.date_creation,
             'date_modification': self.date_modification,
+            'empreintes_dossiers': self.empreintes_dossiers,
             'videos': [v.to_dict() for v in self.videos]
         }
     
@@ -467,11 +736,14 @@ class Campagne:
         campagne.workspace_extraction = data.get('workspace_extraction', '')
         campagne.date_creation = data.get('date_creation', '')
         campagne.date_modification = data.get('date_modification', '')
+        campagne.empreintes_dossiers = data.get('empreintes_dossiers', {})
         campagne.videos = [Video.from_dict(v) for v in data.get('videos', [])]
         return campagne
     
     def sauvegarder(self) -> bool:
-        """Sauvegarde la campagne dans un fichier JSON"""
+        """Sauvegarde la campagne (base SQLite si elle en a une, sinon fichier JSON)"""
+        if self.stockage is not None:
+            return self.enregistrer_modifications()
         try:
             # Si emplacement est vide, utiliser le dossier d'import
             if not self.emplacement and hasattr(self, 'dossier_import'):
@@ -480,22 +752,100 @@ class Campagne:
             Path(self.emplacement).mkdir(parents=True, exist_ok=True)
             fichier_config = os.path.join(self.emplacement, f"{self.nom}_config.json")
             
-            with open(fichier_config, 'w', encoding='utf-8') as f:
+            # Écriture dans un fichier temporaire puis remplacement : une sauvegarde
+            # interrompue ne corrompt pas la configuration existante
+            fichier_tmp = fichier_config + ".tmp"
+            with open(fichier_tmp, 'w', encoding='utf-8') as f:
                 json.dump(self.to_dict(), f, indent=4, ensure_ascii=False)
+            os.replace(fichier_tmp, fichier_config)
+            self._a_ecrire.clear()
+            self._a_effacer.clear()
             
             print(f"💾 Configuration sauvegardée : {fichier_config}")
             return True
         except Exception as e:
             print(f"❌ Erreur lors de la sauvegarde : {e}")
             return False
+
+    def enregistrer_modifications(self) -> bool:
+        """
+        Écrit dans la base SQLite les vidéos modifiées depuis la dernière écriture
+        (une transaction). Sans base, rien n'est écrit : le JSON est réécrit par sauvegarder().
+        """
+        if self.stockage is None:
+            return True
+        try:
+            self.stockage.ecrire(self, list(self._a_ecrire.values()), list(self._a_effacer))
+            self._a_ecrire.clear()
+            self._a_effacer.clear()
+            return True
+        except Exception as e:
+            print(f"❌ Erreur d'écriture dans la base de la campagne : {e}")
+            return False
+
+    def enregistrer_metadonnees_communes(self, champs: Dict) -> bool:
+        """
+        Écrit dans la base les seuls champs communs donnés pour toutes les vidéos déjà
+        écrites (propagation), puis les autres modifications en attente.
+        """
+        if self.stockage is None:
+            return True
+        try:
+            self.stockage.ecrire_champs(self.videos, champs)
+        except Exception as e:
+            print(f"❌ Erreur d'écriture dans la base de la campagne : {e}")
+            return False
+        return self.enregistrer_modifications()
+
+    def migrer_vers_sqlite(self, chemin_base: Optional[str] = None) -> Optional[str]:
+        """
+        Passe la campagne au format SQLite : toutes les vidéos sont écrites en une
+        transaction dans <nom>_campagne.sqlite. Retourne le chemin de la base, ou None.
+        """
+        chemin_base = chemin_base or chemin_sqlite(self.emplacement, self.nom)
+        if os.path.exists(chemin_base):
+            print(f"❌ La base existe déjà : {chemin_base}")
+            return None
+        try:
+            self.stockage = CampagneSQLite(chemin_base)
+        except Exception as e:
+            print(f"❌ Création de la base impossible : {e}")
+            return None
+        for video in self.videos:
+            video._id_stockage = None
+            self._a_ecrire[id(video)] = video
+        self._a_effacer.clear()
+        if not self.enregistrer_modifications():
+            self.stockage.fermer()
+            self.stockage = None
+            os.remove(chemin_base)
+            return None
+        print(f"💾 Campagne convertie en SQLite : {chemin_base} ({self.nb_videos} vidéo(s))")
+        return chemin_base
+
+    def rechercher_videos(self, champ: str, valeur=None, communes: bool = False) -> List[Video]:
+        """Vidéos ayant ce champ de métadonnées (propres par défaut), avec cette valeur si donnée"""
+        if self.stockage is not None and not self._a_ecrire:
+            ids = set(self.stockage.rechercher(champ, valeur, 'communes' if communes else 'propres'))
+            return [v for v in self.videos if v._id_stockage in ids]
+        trouvees = []
+        for video in self.videos:
+            metadonnees = video.metadata_communes if communes else video.metadata_propres
+            if champ in metadonnees and (valeur is None or metadonnees[champ] == valeur):
+                trouvees.append(video)
+        return trouvees
         
     @staticmethod
     def charger(chemin_fichier: str) -> Optional['Campagne']:
-        """Charge une campagne depuis un fichier JSON"""
+        """Charge une campagne depuis un fichier JSON ou une base SQLite"""
         try:
+            if est_fichier_sqlite(chemin_fichier):
+                return CampagneSQLite(chemin_fichier).charger()
             with open(chemin_fichier, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            return Campagne.from_dict(data)
+            campagne = Campagne.from_dict(data)
+            campagne._a_ecrire.clear()
+            return campagne
         except Exception as e:
             print(f"❌ Erreur lors du chargement : {e}")
             return None
@@ -515,18 +865,45 @@ class ApplicationModel:
     # GESTION DES CAMPAGNES
     # ═══════════════════════════════════════════════════════════════
     
-    def creer_campagne(self, nom: str, emplacement: str) -> Campagne:
-        """Crée une nouvelle campagne"""
+    def creer_campagne(self, nom: str, emplacement: str, sqlite: bool = False) -> Campagne:
+        """Crée une nouvelle campagne (stockée dans une base SQLite si sqlite=True)"""
+        self._fermer_stockage()
         self.campagne_courante = Campagne(nom, emplacement)
+        if sqlite:
+            self.campagne_courante.stockage = CampagneSQLite(chemin_sqlite(emplacement, nom))
         return self.campagne_courante
     
     def ouvrir_campagne(self, chemin_fichier: str) -> bool:
-        """Ouvre une campagne existante"""
+        """Ouvre une campagne existante (fichier JSON ou base SQLite)"""
         campagne = Campagne.charger(chemin_fichier)
         if campagne:
+            self._fermer_stockage()
             self.campagne_courante = campagne
             return True
         return False
+
+    def convertir_campagne_sqlite(self, chemin_json: Optional[str] = None) -> Optional[str]:
+        """
+        Convertit la campagne courante au format SQLite ; retourne le chemin de la base.
+        Le JSON d'origine (`chemin_json`), s'il est donné, est ensuite marqué comme remplacé.
+        """
+        if not self.campagne_courante or self.campagne_courante.stockage is not None:
+            return None
+        chemin_base = self.campagne_courante.migrer_vers_sqlite()
+        if chemin_base and chemin_json:
+            marquer_json_remplace(chemin_json)
+        return chemin_base
+
+    def _enregistrer_modifications(self):
+        """Après une modification : écrit les vidéos touchées si la campagne est en SQLite"""
+        if self.campagne_courante:
+            self.campagne_courante.enregistrer_modifications()
+
+    def _fermer_stockage(self):
+        if self.campagne_courante and self.campagne_courante.stockage is not None:
+            self.campagne_courante.enregistrer_modifications()
+            self.campagne_courante.stockage.fermer()
+            self.campagne_courante.stockage = None
     
     def sauvegarder_campagne(self) -> bool:
         """Sauvegarde la campagne courante"""
@@ -536,6 +913,7 @@ class ApplicationModel:
     
     def fermer_campagne(self):
         """Ferme la campagne courante"""
+        self._fermer_stockage()
         self.campagne_courante = None
         self.video_selectionnee = None
         self.page_courante = "accueil"
@@ -558,6 +936,7 @@ class ApplicationModel:
                 print(f"🗑️ Fichier supprimé : {chemin_fichier}")
             
             self.campagne_courante.supprimer_video(nom_video)
+            self._enregistrer_modifications()
             
             if self.video_selectionnee and self.video_selectionnee.nom == nom_video:
                 self.video_selectionnee = None
@@ -571,25 +950,49 @@ class ApplicationModel:
     # IMPORTATION DES VIDÉOS - STRUCTURE KOSMOS
     # ═══════════════════════════════════════════════════════════════
     
-    def importer_videos_kosmos(self, dossier_principal: str) -> Dict:
+    def importer_videos_kosmos(self, dossier_principal: str, workers: Optional[int] = None,
+                               progress_cb=None, video_cb=None, cancel_event=None) -> Dict:
         """
-        Importe les vidéos depuis la structure KOSMOS
+        Importe les vidéos depuis la structure KOSMOS (un sous-dossier numéroté par station) :
+        analyse (analyser_import_kosmos) puis application à la campagne
+        (appliquer_import_kosmos), dans le thread appelant. Voir ces deux méthodes pour
+        les paramètres ; retourne les résultats de l'import.
         """
-        self.dossier_videos_import = dossier_principal
-    
-        # Mettre à jour l'emplacement de la campagne avec le dossier d'import
-        if self.campagne_courante:
-            self.campagne_courante.emplacement = dossier_principal
-            self.campagne_courante.dossier_import = dossier_principal
-        
-        resultats = {
-            'videos_importees': [],
-            'videos_sans_metadata': [],
-            'erreurs': []
+        analyse = self.analyser_import_kosmos(dossier_principal, workers, progress_cb, video_cb, cancel_event)
+        return self.appliquer_import_kosmos(analyse)
+
+    def analyser_import_kosmos(self, dossier_principal: str, workers: Optional[int] = None,
+                               progress_cb=None, video_cb=None, cancel_event=None) -> Dict:
+        """
+        Analyse un dossier d'import sans modifier la campagne : peut tourner dans un
+        thread de travail pendant que le thread GUI lit la campagne. Les dossiers sont
+        analysés en parallèle par un pool de threads (durée de la vidéo, JSON et CSV du
+        dossier) ; le résultat est appliqué par appliquer_import_kosmos, dans le thread
+        qui possède la campagne.
+        - progress_cb(dossiers_faits, dossiers_totaux) après chaque dossier ;
+        - video_cb(video, avec_metadata) dès qu'une vidéo est analysée ;
+        - cancel_event (threading.Event) : les dossiers non commencés sont abandonnés,
+          ceux déjà analysés seront importés et resultats['annule'] vaut True.
+        L'import est incrémental : un dossier dont l'empreinte (taille et date des
+        fichiers) n'a pas changé n'est pas relu.
+        """
+        analyse = {
+            'dossier': dossier_principal,
+            'dossiers': [],
+            'videos': [], # [(video, avec_metadata)] dans l'ordre des dossiers
+            'empreintes': {}, # Dossiers analysés en entier : sautés au prochain import
+            'resultats': {
+                'videos_importees': [],
+                'videos_sans_metadata': [],
+                'erreurs': [],
+                'videos_inchangees': [],
+                'videos_mises_a_jour': [],
+                'videos_supprimees': [],
+                'annule': False
+            }
         }
-        
-        extensions_video = ('.mp4', '.avi', '.mov', '.mkv', '.MP4', '.AVI', '.MOV', '.MKV', 
-                            '.h264', '.H264', '.mpg', '.MPG', '.mpeg', '.MPEG')
+        resultats = analyse['resultats']
+        is_cancelled = cancel_event.is_set if cancel_event is not None else (lambda: False)
         
         print(f"\n{'='*60}")
         print(f"📹 IMPORTATION KOSMOS")
@@ -600,113 +1003,120 @@ class ApplicationModel:
             tous_elements = os.listdir(dossier_principal)
             print(f"📂 {len(tous_elements)} éléments trouvés dans le dossier principal")
             
-            sous_dossiers = [d for d in tous_elements 
-                             if os.path.isdir(os.path.join(dossier_principal, d))]
-            
+            # Dossiers numérotés dans l'ordre des stations (0002 avant 0010)
+            sous_dossiers = sorted(
+                (d for d in tous_elements if os.path.isdir(os.path.join(dossier_principal, d))),
+                key=lambda d: (not d.isdigit(), int(d) if d.isdigit() else 0, d)
+            )
             print(f"📁 {len(sous_dossiers)} sous-dossiers identifiés")
             
-            for i, dossier in enumerate(sous_dossiers[:5]):
-                print(f"   {i+1}. {dossier}")
-            if len(sous_dossiers) > 5:
-                print(f"   ... et {len(sous_dossiers) - 5} autres")
-            
             if not sous_dossiers:
                 print(f"⚠️ Aucun sous-dossier trouvé, recherche des vidéos directement...")
-                videos_directes = [f for f in tous_elements 
-                                   if any(f.lower().endswith(ext.lower()) for ext in extensions_video)]
-                
-                if videos_directes:
-                    print(f"✅ {len(videos_directes)} vidéo(s) trouvée(s) directement dans le dossier")
-                    for nom_video in videos_directes:
-                        chemin_video = os.path.join(dossier_principal, nom_video)
-                        video = self._creer_video_depuis_fichier(chemin_video, "racine")
-                        
-                        if self.campagne_courante:
-                            self.campagne_courante.ajouter_video(video)
-                            resultats['videos_importees'].append(video.nom)
-                
-                    return resultats
+                # Vidéos à la racine : pas de JSON/CSV de station
+                taches = [(dossier_principal, "racine", False)]
+            else:
+                taches = [(os.path.join(dossier_principal, d), d, True) for d in sous_dossiers]
+            analyse['dossiers'] = [t[0] for t in taches]
+            
+            # Dossiers inchangés depuis le dernier import : ni sonde, ni JSON, ni CSV
+            campagne = self.campagne_courante
+            connues = dict(campagne.empreintes_dossiers) if campagne else {}
+            empreintes = {}
+            a_analyser = []
+            for chemin, nom, metadata in taches:
+                empreintes[chemin] = empreinte_dossier(chemin, metadata)
+                if self._dossier_inchange(chemin, empreintes[chemin], connues.get(chemin)):
+                    resultats['videos_inchangees'].extend(
+                        f for f in empreintes[chemin] if os.path.splitext(f)[1].lower() in EXTENSIONS_VIDEO
+                    )
                 else:
-                    print(f"❌ Aucune vidéo trouvée dans le dossier")
-                    return resultats
+                    a_analyser.append((chemin, nom, metadata))
+            if len(a_analyser) < len(taches):
+                print(f"♻️ {len(taches) - len(a_analyser)} dossier(s) inchangé(s), {len(a_analyser)} à analyser")
             
-            for nom_dossier in sous_dossiers:
-                chemin_dossier = os.path.join(dossier_principal, nom_dossier)
-                print(f"\n🔍 Analyse de : {nom_dossier}")
-                
-                try:
-                    fichiers = os.listdir(chemin_dossier)
-                    print(f"   📄 {len(fichiers)} fichier(s) trouvé(s)")
-                    
-                    for fichier in fichiers[:10]:
-                        ext = os.path.splitext(fichier)[1]
-                        print(f"       - {fichier} [{ext}]")
-                    if len(fichiers) > 10:
-                        print(f"       ... et {len(fichiers) - 10} autres fichiers")
-                    
-                    videos_trouvees = []
-                    for fichier in fichiers:
-                        ext = os.path.splitext(fichier)[1].lower()
-                        if any(ext == e.lower() for e in extensions_video):
-                            videos_trouvees.append(fichier)
-                    
-                    if not videos_trouvees:
-                        print(f"   ⚠️ Aucune vidéo avec extensions reconnues")
+            workers = workers or min(8, (os.cpu_count() or 1) * 2) # Surtout des attentes disque
+            analyses = {}
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as pool:
+                futures = {
+                    pool.submit(self._analyser_dossier_kosmos, chemin, nom, metadata, is_cancelled): i
+                    for i, (chemin, nom, metadata) in enumerate(a_analyser)
+                }
+                for future in as_completed(futures):
+                    if future.cancelled():
                         continue
-                    
-                    print(f"   ✅ {len(videos_trouvees)} vidéo(s) trouvée(s)")
-                    
-                    for nom_video in videos_trouvees:
-                        print(f"       📹 {nom_video}")
-                        chemin_video = os.path.join(chemin_dossier, nom_video)
-                        
-                        # Créer l'objet vidéo
-                        video = self._creer_video_depuis_fichier(chemin_video, nom_dossier)
-                        
-                        # --- BLOC LECTURE JSON ---
-                        json_path = Path(video.chemin).parent / f"{video.dossier_numero}.json"
-                        
-                        if json_path.exists():
-                            try:
-                                with open(json_path, 'r', encoding='utf-8') as f:
-                                    meta_json = json.load(f)
-                                    hmsos = meta_json.get('video', {}).get('hourDict', {}).get('HMSOS', None)
-                                    if hmsos:
-                                        video.start_time_str = hmsos
-                                        print(f"       ... Heure début JSON chargée : {hmsos}")
-                                    else:
-                                        print(f"       ... Clé 'HMSOS' non trouvée dans {json_path}")
-                            except Exception as e:
-                                print(f"       ... Erreur lecture JSON {json_path}: {e}")
-                        else:
-                             print(f"       ... Fichier JSON non trouvé : {json_path}")
-                        # --- FIN BLOC LECTURE JSON ---
-
-                        # Charger les métadonnées depuis le CSV du dossier
-                        chemin_csv = os.path.join(chemin_dossier, f"{nom_dossier}.csv")
-                        
-                        if os.path.exists(chemin_csv):
-                            print(f"       📊 CSV trouvé : {nom_dossier}.csv")
-                            if self._charger_metadata_kosmos_csv(video, chemin_csv):
-                                resultats['videos_importees'].append(video.nom)
-                            else:
-                                resultats['videos_sans_metadata'].append(video.nom)
-                        else:
-                            print(f"       ⚠️ Pas de CSV trouvé")
-                            resultats['videos_sans_metadata'].append(video.nom)
-                        
-                        if self.campagne_courante:
-                            self.campagne_courante.ajouter_video(video)
-                
-                except Exception as e:
-                    print(f"   ❌ Erreur dans {nom_dossier} : {e}")
-                    resultats['erreurs'].append(f"Erreur dans {nom_dossier}: {e}")
+                    i = futures[future]
+                    nom_dossier = a_analyser[i][1]
+                    try:
+                        analyses[i] = future.result()
+                        if not is_cancelled():
+                            analyse['empreintes'][a_analyser[i][0]] = empreintes[a_analyser[i][0]]
+                    except Exception as e:
+                        print(f"   ❌ Erreur dans {nom_dossier} : {e}")
+                        resultats['erreurs'].append(f"Erreur dans {nom_dossier}: {e}")
+                        analyses[i] = []
+                    if video_cb:
+                        for video, avec_metadata in analyses[i]:
+                            video_cb(video, avec_metadata)
+                    if progress_cb:
+                        progress_cb(len(analyses), len(a_analyser))
+                    if is_cancelled() and not resultats['annule']:
+                        resultats['annule'] = True
+                        print(f"⏹️ Importation annulée : {len(analyses)}/{len(a_analyser)} dossier(s) analysé(s)")
+                        for f in futures:
+                            f.cancel()
+            
+            analyse['videos'] = [item for i in sorted(analyses) for item in analyses[i]]
+                            
+        except Exception as e:
+            resultats['erreurs'].append(f"Erreur globale : {e}")
+            print(f"❌ Erreur globale : {e}")
+        
+        return analyse
+
+    def appliquer_import_kosmos(self, analyse: Dict) -> Dict:
+        """
+        Applique à la campagne courante le résultat d'analyser_import_kosmos (à appeler
+        dans le thread qui possède la campagne) : les vidéos déjà présentes sont mises à
+        jour sur place (même chemin), les nouvelles ajoutées, et celles dont le fichier a
+        disparu retirées. Retourne les résultats de l'import.
+        """
+        dossier_principal = analyse['dossier']
+        resultats = analyse['resultats']
+        self.dossier_videos_import = dossier_principal
+        campagne = self.campagne_courante
+    
+        # Mettre à jour l'emplacement de la campagne avec le dossier d'import
+        if campagne:
+            campagne.emplacement = dossier_principal
+            campagne.dossier_import = dossier_principal
+            campagne.empreintes_dossiers.update(analyse['empreintes'])
+        
+        try:
+            for video, avec_metadata in analyse['videos']:
+                if avec_metadata:
+                    resultats['videos_importees'].append(video.nom)
+                else:
+                    resultats['videos_sans_metadata'].append(video.nom)
+                if not campagne:
+                    continue
+                existante = campagne.obtenir_video_par_chemin(video.chemin)
+                if existante is None:
+                    campagne.ajouter_video(video)
+                else:
+                    existante.mettre_a_jour_import(video)
+                    resultats['videos_mises_a_jour'].append(video.nom)
+            
+            if campagne and analyse['dossiers']:
+                self._retirer_videos_disparues(dossier_principal, analyse['dossiers'], resultats)
             
             print(f"\n{'='*60}")
             print(f"📊 RÉSULTATS")
             print(f"{'='*60}")
             print(f"✅ Vidéos importées : {len(resultats['videos_importees'])}")
             print(f"⚠️   Sans métadonnées : {len(resultats['videos_sans_metadata'])}")
+            print(f"♻️ Inchangées : {len(resultats['videos_inchangees'])}, "
+                  f"mises à jour : {len(resultats['videos_mises_a_jour'])}, "
+                  f"retirées : {len(resultats['videos_supprimees'])}")
             print(f"❌ Erreurs : {len(resultats['erreurs'])}")
             print(f"{'='*60}\n")
                             
@@ -716,6 +1126,85 @@ class ApplicationModel:
         
         return resultats
     
+    def _dossier_inchange(self, chemin_dossier: str, empreinte: Dict, connue: Optional[Dict]) -> bool:
+        """Vrai si le dossier a la même empreinte qu'au dernier import et que ses vidéos sont toutes dans la campagne."""
+        if connue is None or connue != empreinte or not self.campagne_courante:
+            return False
+        return all(
+            self.campagne_courante.obtenir_video_par_chemin(os.path.join(chemin_dossier, f)) is not None
+            for f in empreinte if os.path.splitext(f)[1].lower() in EXTENSIONS_VIDEO
+        )
+    
+    def _retirer_videos_disparues(self, dossier_principal: str, dossiers: List[str], resultats: Dict):
+        """Retire de la campagne les vidéos du dossier importé dont le fichier n'existe plus."""
+        campagne = self.campagne_courante
+        racine = os.path.normcase(os.path.abspath(dossier_principal))
+        disparues = [
+            v for v in campagne.videos
+            if os.path.normcase(os.path.abspath(v.chemin)).startswith(racine + os.sep) and not os.path.exists(v.chemin)
+        ]
+        if disparues:
+            campagne.retirer_videos(disparues)
+            resultats['videos_supprimees'].extend(v.nom for v in disparues)
+        # Empreintes des dossiers qui n'existent plus
+        for chemin in [c for c in campagne.empreintes_dossiers if c not in dossiers and not os.path.isdir(c)]:
+            del campagne.empreintes_dossiers[chemin]
+    
+    def _analyser_dossier_kosmos(self, chemin_dossier: str, nom_dossier: str, lire_metadata: bool = True,
+                                 is_cancelled=None) -> List:
+        """
+        Analyse un dossier de station : crée les vidéos et lit leurs métadonnées (heure de
+        début du JSON, données communes du CSV). Ne modifie pas la campagne, ce qui permet
+        de l'appeler depuis un thread du pool d'importation.
+        Retourne [(video, avec_metadata)].
+        """
+        fichiers = os.listdir(chemin_dossier)
+        videos_trouvees = [f for f in fichiers if os.path.splitext(f)[1].lower() in EXTENSIONS_VIDEO]
+        if not videos_trouvees:
+            print(f"   ⚠️ {nom_dossier} : aucune vidéo avec extensions reconnues ({len(fichiers)} fichier(s))")
+            return []
+        print(f"🔍 {nom_dossier} : {len(videos_trouvees)} vidéo(s)")
+        
+        chemin_csv = os.path.join(chemin_dossier, f"{nom_dossier}.csv")
+        analyses = []
+        for nom_video in videos_trouvees:
+            if is_cancelled and is_cancelled():
+                break
+            chemin_video = os.path.join(chemin_dossier, nom_video)
+            
+            # Créer l'objet vidéo
+            video = self._creer_video_depuis_fichier(chemin_video, nom_dossier)
+            if not lire_metadata:
+                # Vidéos à la racine : comptées comme importées, sans JSON ni CSV
+                analyses.append((video, True))
+                continue
+            
+            # --- BLOC LECTURE JSON ---
+            json_path = Path(video.chemin).parent / f"{video.dossier_numero}.json"
+            
+            if json_path.exists():
+                try:
+                    # Lecture mise en cache : la page Tri la réutilise à la sélection
+                    meta_json = lire_json(json_path)
+                    hmsos = meta_json.get('video', {}).get('hourDict', {}).get('HMSOS', None)
+                    if hmsos:
+                        video.start_time_str = hmsos
+                    else:
+                        print(f"       ... Clé 'HMSOS' non trouvée dans {json_path}")
+                except Exception as e:
+                    print(f"       ... Erreur lecture JSON {json_path}: {e}")
+            else:
+                 print(f"       ... Fichier JSON non trouvé : {json_path}")
+            # --- FIN BLOC LECTURE JSON ---
+
+            # Charger les métadonnées depuis le CSV du dossier
+            if os.path.exists(chemin_csv):
+                analyses.append((video, self._charger_metadata_kosmos_csv(video, chemin_csv)))
+            else:
+                print(f"       ⚠️ {nom_video} : pas de CSV trouvé")
+                analyses.append((video, False))
+        return analyses
+    
     def _creer_video_depuis_fichier(self, chemin: str, dossier_numero: str) -> Video:
         """Crée un objet Video à partir d'un fichier"""
         nom = os.path.basename(chemin)
@@ -725,19 +1214,10 @@ class ApplicationModel:
             os.path.getmtime(chemin)
         ).strftime("%d/%m/%Y")
         
-        # Calcul de la durée via OpenCV
+        # Durée lue dans le conteneur (sans ouvrir de décodeur)
         duree = "--:--"
         try:
-            cap = cv2.VideoCapture(chemin)
-            if cap.isOpened():
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                if fps > 0:
-                    duration_sec = frame_count / fps
-                    m, s = divmod(duration_sec, 60)
-                    h, m = divmod(m, 60)
-                    duree = f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
-            cap.release()
+            duree = duree_video(chemin) or duree
         except Exception as e:
             print(f"⚠️ Impossible de calculer la durée pour {nom}: {e}")
 
@@ -837,6 +1317,7 @@ class ApplicationModel:
         video = self.campagne_courante.obtenir_video(ancien_nom)
         if video:
             video.nom = nouveau_nom
+            self._enregistrer_modifications()
             return True
         return False
     
@@ -848,6 +1329,7 @@ class ApplicationModel:
         video = self.campagne_courante.obtenir_video(nom_video)
         if video:
             video.est_conservee = False
+            self._enregistrer_modifications()
             return True
         return False
     
@@ -859,6 +1341,7 @@ class ApplicationModel:
         video = self.campagne_courante.obtenir_video(nom_video)
         if video:
             video.est_conservee = True
+            self._enregistrer_modifications()
             return True
         return False
     
@@ -867,29 +1350,92 @@ class ApplicationModel:
         if not self.campagne_courante:
             return 0
         
-        videos_a_supprimer = self.campagne_courante.obtenir_videos_a_supprimer()
-        count = len(videos_a_supprimer)
-        
-        for video in videos_a_supprimer:
-            self.campagne_courante.supprimer_video(video.nom)
+        count = len(self.campagne_courante.supprimer_videos_marquees())
+        self._enregistrer_modifications()
         
         if self.video_selectionnee and not self.video_selectionnee.est_conservee:
             self.video_selectionnee = None
         
         return count
+
+    def marquer_videos_pour_suppression(self, noms_videos: List[str]) -> int:
+        """Marque plusieurs vidéos pour suppression ; retourne le nombre de vidéos marquées"""
+        if not self.campagne_courante:
+            return 0
+        count = self.campagne_courante.marquer_videos(noms_videos, conservee=False)
+        self._enregistrer_modifications()
+        return count
+
+    def conserver_videos(self, noms_videos: List[str]) -> int:
+        """Marque plusieurs vidéos comme conservées ; retourne le nombre de vidéos concernées"""
+        if not self.campagne_courante:
+            return 0
+        count = self.campagne_courante.marquer_videos(noms_videos, conservee=True)
+        self._enregistrer_modifications()
+        return count
     
     def modifier_metadonnees_propres(self, nom_video: str, nouvelles_meta: Dict) -> bool:
         """Modifie les métadonnées propres d'une vidéo"""
         if not self.campagne_courante:
             return False
         
-        video = self.campagne_courante.obtenir_video(nom_video)
-        if video:
-            for key, value in nouvelles_meta.items():
-                video.metadata_propres[key] = value
-            return True
-        return False
+        return self.modifier_metadonnees_propres_videos([nom_video], nouvelles_meta) > 0
+
+    def modifier_metadonnees_propres_videos(self, noms_videos: List[str], nouvelles_meta: Dict) -> int:
+        """Applique les mêmes métadonnées propres à plusieurs vidéos ; retourne le nombre modifié"""
+        if not self.campagne_courante:
+            return 0
+        count = self.campagne_courante.modifier_metadonnees_propres(noms_videos, nouvelles_meta)
+        self._enregistrer_modifications()
+        return count
     
+    # ═══════════════════════════════════════════════════════════════
+    # DURÉES MANQUANTES
+    # ═══════════════════════════════════════════════════════════════
+
+    def resoudre_durees(self, chemins: List[str], workers: Optional[int] = None,
+                        duree_cb=None, cancel_event=None) -> Dict[str, str]:
+        """
+        Lit la durée de plusieurs vidéos sur un pool de threads (lecture des en-têtes
+        du conteneur, voir duree_video). Ne modifie pas la campagne : les durées sont
+        appliquées par appliquer_duree, dans le thread qui possède la campagne.
+        - duree_cb(chemin, duree) dès qu'une durée est lue ;
+        - cancel_event (threading.Event) : les vidéos pas encore lues sont abandonnées.
+        Retourne {chemin: 'HH:MM:SS'} pour les durées lues.
+        """
+        durees = {}
+        workers = workers or min(8, (os.cpu_count() or 1) * 2)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="duree") as pool:
+            futures = {pool.submit(duree_video, chemin): chemin for chemin in chemins}
+            for future in as_completed(futures):
+                if cancel_event is not None and cancel_event.is_set():
+                    for autre in futures:
+                        autre.cancel()
+                    continue
+                if future.cancelled():
+                    continue
+                chemin = futures[future]
+                try:
+                    duree = future.result()
+                except Exception as e:
+                    print(f"⚠️ Durée illisible ({chemin}): {e}")
+                    continue
+                if duree:
+                    durees[chemin] = duree
+                    if duree_cb:
+                        duree_cb(chemin, duree)
+        return durees
+
+    def appliquer_duree(self, chemin: str, duree: str) -> Optional[Video]:
+        """Inscrit une durée lue en tâche de fond ; elle sera écrite à la prochaine sauvegarde"""
+        if not self.campagne_courante:
+            return None
+        video = self.campagne_courante.obtenir_video_par_chemin(chemin)
+        if video:
+            video.duree = duree
+            self.campagne_courante.marquer_modifiees([video])
+        return video
+
     # ═══════════════════════════════════════════════════════════════
     # STATISTIQUES
     # ═══════════════════════════════════════════════════════════════
@@ -905,9 +1451,9 @@ class ApplicationModel:
             }
         
         return {
-            'total': len(self.campagne_courante.videos),
-            'conservees': len(self.campagne_courante.obtenir_videos_conservees()),
-            'a_supprimer': len(self.campagne_courante.obtenir_videos_a_supprimer()),
+            'total': self.campagne_courante.nb_videos,
+            'conservees': self.campagne_courante.nb_conservees,
+            'a_supprimer': self.campagne_courante.nb_a_supprimer,
             'selectionnee': self.video_selectionnee.nom if self.video_selectionnee else None
         }
     
@@ -917,6 +1463,52 @@ class ApplicationModel:
             return self.campagne_courante.videos
         return []
 
+    def obtenir_videos_station(self, nom_video: str) -> List[Video]:
+        """
+        Retourne les vidéos enregistrées par la même station que `nom_video`
+        (même dossier numéroté), triées par nom. Une station stéréo en a deux.
+        """
+        if not self.campagne_courante:
+            return []
+
+        video = self.campagne_courante.obtenir_video(nom_video)
+        if not video:
+            return []
+
+        dossier = Path(video.chemin).parent
+        station = [
+            v for v in self.campagne_courante.videos
+            if v.dossier_numero == video.dossier_numero and Path(v.chemin).parent == dossier
+        ]
+        return sorted(station, key=lambda v: v.nom)
+
+    @staticmethod
+    def est_station_stereo(video: Video) -> bool:
+        """Vrai si la vidéo est rangée sous un dossier marqué stéréo (*_Kstereo)."""
+        return any(dossier.lower().endswith(MARQUEUR_STEREO) for dossier in Path(video.chemin).parent.parts)
+
+    def obtenir_flux_stereo(self, nom_video: str) -> List[Video]:
+        """
+        Vidéos à lire ensemble pour `nom_video` : toute sa station si elle est
+        marquée stéréo et en compte plusieurs, sinon une liste vide (lecture simple).
+        """
+        station = self.obtenir_videos_station(nom_video)
+        if len(station) < 2 or not self.est_station_stereo(station[0]):
+            return []
+        return station
+
+    def decalages_flux(self, videos: List[Video]) -> List[int]:
+        """
+        Décalage (ms) de chaque flux par rapport au premier, d'après les heures de
+        début (start_time_str) : un flux démarré 2 s après la référence a -2000 ms,
+        sa frame t - 2 s est affichée en face de la frame t de la référence.
+        Heure inconnue : flux supposé aligné (0).
+        """
+        debuts = [self._parse_time_to_ms(v.start_time_str) for v in videos]
+        if not debuts or debuts[0] is None:
+            return [0] * len(videos)
+        return [debuts[0] - debut if debut is not None else 0 for debut in debuts]
+
     # --- MÉTHODES POUR LES MINIATURES D'ANGLE ---
 
     def _parse_time_to_seconds(self, time_str: str) -> int:
@@ -949,6 +1541,22 @@ class ApplicationModel:
             return 0
 
 
+    @staticmethod
+    def _parse_time_to_ms(time_str: str) -> Optional[int]:
+        """Convertit "HH:MM:SS[.fff]" ou "HHhMMmSS[.fff]s" en millisecondes (None si illisible)."""
+        if not time_str:
+            return None
+        try:
+            texte = time_str.strip()
+            if ':' in texte:
+                h, m, s = texte.split(':')
+            else:
+                h, reste = texte.split('h')
+                m, s = reste.rstrip('s').split('m')
+            return round((int(h) * 3600 + int(m) * 60 + float(s)) * 1000)
+        except ValueError:
+            return None
+
     def get_angle_event_times(self, nom_video: str) -> list[tuple[str, int]]:
         """
         Calcule les temps de "seek" et les DURÉES pour les 6 
@@ -0,0 +1,252 @@
+"""
+MODEL - Stockage SQLite d'une campagne
+Alternative au fichier <campagne>_config.json pour les grosses campagnes : chaque
+vidéo est une ligne de la table `videos` et ses métadonnées des lignes
+(champ, valeur) de la table `metadonnees`, interrogeables par champ. Seules les
+vidéos modifiées sont réécrites, dans une transaction : une sauvegarde
+interrompue laisse la base dans son état précédent.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+SQLITE_SUFFIXE = "_campagne.sqlite"
+SQLITE_EXTENSIONS = ('.sqlite', '.db')
+# Ajouté au nom du JSON d'une campagne convertie : il n'est plus ouvert ni réécrit
+JSON_REMPLACE_SUFFIXE = ".migre"
+
+COMMUNES = 'communes'
+PROPRES = 'propres'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campagne (
+    cle TEXT PRIMARY KEY,
+    valeur TEXT
+);
+CREATE TABLE IF NOT EXISTS empreintes (
+    dossier TEXT PRIMARY KEY,
+    empreinte TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nom TEXT NOT NULL,
+    chemin TEXT NOT NULL,
+    dossier_numero TEXT,
+    taille TEXT,
+    duree TEXT,
+    date TEXT,
+    start_time_str TEXT,
+    est_conservee INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_videos_nom ON videos(nom);
+CREATE TABLE IF NOT EXISTS metadonnees (
+    video_id INTEGER NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    champ TEXT NOT NULL,
+    valeur,
+    PRIMARY KEY (video_id, type, champ)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_metadonnees_champ ON metadonnees(type, champ, valeur);
+"""
+
+# Champs de la campagne enregistrés dans la table clé/valeur
+_CHAMPS_CAMPAGNE = ('nom', 'emplacement', 'workspace_extraction', 'date_creation', 'date_modification')
+
+
+def est_fichier_sqlite(chemin: str) -> bool:
+    return os.path.splitext(str(chemin))[1].lower() in SQLITE_EXTENSIONS
+
+
+def chemin_sqlite(emplacement: str, nom: str) -> str:
+    return os.path.join(emplacement, f"{nom}{SQLITE_SUFFIXE}")
+
+
+def _valeur_sql(valeur):
+    """Les valeurs simples sont stockées telles quelles, les autres en texte JSON."""
+    if valeur is None or isinstance(valeur, (str, int, float)):
+        return valeur
+    return json.dumps(valeur, ensure_ascii=False)
+
+
+class CampagneSQLite:
+    """
+    Base SQLite d'une campagne. Les vidéos sont rattachées à leur ligne par
+    Video._id_stockage (None tant que la vidéo n'a jamais été écrite).
+    """
+
+    def __init__(self, chemin: str):
+        self.chemin = str(chemin)
+        os.makedirs(os.path.dirname(os.path.abspath(self.chemin)), exist_ok=True)
+        # Les imports tournent dans un QThread : la connexion est partagée sous verrou
+        self.connexion = sqlite3.connect(self.chemin, check_same_thread=False)
+        self._verrou = threading.Lock()
+        self._empreintes_ecrites: Dict[str, str] = {}
+        with self._verrou, self.connexion:
+            self.connexion.execute("PRAGMA journal_mode=WAL")
+            self.connexion.execute("PRAGMA foreign_keys=ON")
+            self.connexion.executescript(_SCHEMA)
+
+    def fermer(self):
+        with self._verrou:
+            self.connexion.close()
+
+    # --- Lecture ---
+
+    def charger(self):
+        """Reconstruit la campagne (import local : models.app_model importe ce module)."""
+        from models.app_model import Campagne, Video
+
+        with self._verrou:
+            champs = dict(self.connexion.execute("SELECT cle, valeur FROM campagne"))
+            empreintes = self.connexion.execute("SELECT dossier, empreinte FROM empreintes").fetchall()
+            lignes = self.connexion.execute(
+                "SELECT id, nom, chemin, dossier_numero, taille, duree, date, start_time_str, est_conservee "
+                "FROM videos ORDER BY id"
+            ).fetchall()
+            metadonnees = self.connexion.execute(
+                "SELECT video_id, type, champ, valeur FROM metadonnees"
+            ).fetchall()
+
+        campagne = Campagne(nom=champs.get('nom', ''), emplacement=champs.get('emplacement', ''))
+        campagne.workspace_extraction = champs.get('workspace_extraction', '')
+        campagne.date_creation = champs.get('date_creation', '')
+        self._empreintes_ecrites = dict(empreintes)
+        campagne.empreintes_dossiers = {dossier: json.loads(texte) for dossier, texte in empreintes}
+
+        videos = {}
+        for id_video, nom, chemin, dossier, taille, duree, date, debut, conservee in lignes:
+            video = Video(nom, chemin, dossier or '', taille or '', duree or '', date or '')
+            video.start_time_str = debut or "00:00:00"
+            video.est_conservee = bool(conservee)
+            video._id_stockage = id_video
+            videos[id_video] = video
+        for id_video, type_meta, champ, valeur in metadonnees:
+            video = videos.get(id_video)
+            if video is not None:
+                cible = video.metadata_communes if type_meta == COMMUNES else video.metadata_propres
+                cible[champ] = valeur
+
+        campagne.videos = list(videos.values())
+        campagne.date_modification = champs.get('date_modification', '')
+        campagne.stockage = self
+        campagne._a_ecrire.clear()
+        campagne._a_effacer.clear()
+        return campagne
+
+    def rechercher(self, champ: str, valeur=None, type_meta: str = PROPRES) -> List[int]:
+        """Identifiants des vidéos ayant ce champ de métadonnées (et cette valeur si donnée)."""
+        requete = "SELECT video_id FROM metadonnees WHERE type = ? AND champ = ?"
+        parametres = [type_meta, champ]
+        if valeur is not None:
+            requete += " AND valeur = ?"
+            parametres.append(_valeur_sql(valeur))
+        with self._verrou:
+            return [ligne[0] for ligne in self.connexion.execute(requete, parametres)]
+
+    # --- Écriture ---
+
+    def ecrire(self, campagne, videos: Iterable, ids_effaces: Iterable[int] = ()):
+        """
+        Écrit en une transaction les champs de la campagne, les empreintes modifiées,
+        les vidéos données (insérées ou mises à jour) et efface les lignes retirées.
+        Les identifiants des nouvelles lignes ne sont donnés aux vidéos qu'une fois la
+        transaction validée : après un rollback, elles restent à insérer.
+        """
+        videos = list(videos)
+        with self._verrou:
+            with self.connexion:
+                curseur = self.connexion.cursor()
+                curseur.executemany(
+                    "INSERT OR REPLACE INTO campagne (cle, valeur) VALUES (?, ?)",
+                    [(champ, getattr(campagne, champ)) for champ in _CHAMPS_CAMPAGNE]
+                )
+                empreintes = self._ecrire_empreintes(curseur, campagne.empreintes_dossiers)
+                curseur.executemany("DELETE FROM videos WHERE id = ?", [(i,) for i in ids_effaces])
+                nouveaux_ids = [(video, self._ecrire_video(curseur, video)) for video in videos]
+            self._empreintes_ecrites = empreintes
+            for video, id_video in nouveaux_ids:
+                video._id_stockage = id_video
+
+    def ecrire_champs(self, videos: Iterable, champs: Dict, type_meta: str = COMMUNES):
+        """
+        Écrit seulement les champs de métadonnées donnés pour des vidéos déjà en base
+        (propagation des métadonnées communes), sans réécrire le reste de leurs lignes.
+        """
+        valeurs = [(champ, _valeur_sql(valeur)) for champ, valeur in champs.items()]
+        with self._verrou, self.connexion:
+            self.connexion.executemany(
+                "INSERT OR REPLACE INTO metadonnees (video_id, type, champ, valeur) VALUES (?, ?, ?, ?)",
+                [(video._id_stockage, type_meta, champ, valeur)
+                 for video in videos if video._id_stockage is not None for champ, valeur in valeurs]
+            )
+
+    def _ecrire_empreintes(self, curseur, empreintes: Dict) -> Dict[str, str]:
+        """Écrit les empreintes modifiées ; retourne l'état écrit, à retenir après validation."""
+        textes = {dossier: json.dumps(empreinte, sort_keys=True) for dossier, empreinte in empreintes.items()}
+        curseur.executemany(
+            "INSERT OR REPLACE INTO empreintes (dossier, empreinte) VALUES (?, ?)",
+            [(d, t) for d, t in textes.items() if self._empreintes_ecrites.get(d) != t]
+        )
+        curseur.executemany(
+            "DELETE FROM empreintes WHERE dossier = ?",
+            [(d,) for d in self._empreintes_ecrites if d not in textes]
+        )
+        return textes
+
+    @staticmethod
+    def _ecrire_video(curseur, video) -> int:
+        """Insère ou met à jour la ligne de la vidéo ; retourne son identifiant."""
+        colonnes = (video.nom, video.chemin, video.dossier_numero, video.taille, video.duree,
+                    video.date, video.start_time_str, int(video.est_conservee))
+        if video._id_stockage is None:
+            curseur.execute(
+                "INSERT INTO videos (nom, chemin, dossier_numero, taille, duree, date, start_time_str, est_conservee) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", colonnes
+            )
+            id_video = curseur.lastrowid
+        else:
+            id_video = video._id_stockage
+            curseur.execute(
+                "UPDATE videos SET nom = ?, chemin = ?, dossier_numero = ?, taille = ?, duree = ?, date = ?, "
+                "start_time_str = ?, est_conservee = ? WHERE id = ?", colonnes + (id_video,)
+            )
+            curseur.execute("DELETE FROM metadonnees WHERE video_id = ?", (id_video,))
+        curseur.executemany(
+            "INSERT INTO metadonnees (video_id, type, champ, valeur) VALUES (?, ?, ?, ?)",
+            [(id_video, COMMUNES, champ, _valeur_sql(valeur)) for champ, valeur in video.metadata_communes.items()]
+            + [(id_video, PROPRES, champ, _valeur_sql(valeur)) for champ, valeur in video.metadata_propres.items()]
+        )
+        return id_video
+
+
+def marquer_json_remplace(chemin_json: str) -> Optional[str]:
+    """
+    Renomme le JSON d'une campagne convertie en <nom>_config.json.migre : il reste
+    lisible comme copie de l'ancien format mais n'est plus pris pour la campagne.
+    Retourne le nouveau chemin, ou None si le renommage échoue.
+    """
+    chemin_remplace = chemin_json + JSON_REMPLACE_SUFFIXE
+    try:
+        os.replace(chemin_json, chemin_remplace)
+    except OSError as e:
+        print(f"⚠️ Impossible de marquer {chemin_json} comme remplacé : {e}")
+        return None
+    return chemin_remplace
+
+
+def migrer_campagne_json(chemin_json: str, chemin_base: Optional[str] = None) -> Optional[str]:
+    """
+    Convertit une campagne <nom>_config.json en base SQLite (une seule transaction),
+    puis marque le JSON comme remplacé. Retourne le chemin de la base, ou None en cas d'échec.
+    """
+    from models.app_model import Campagne
+
+    campagne = Campagne.charger(chemin_json)
+    if campagne is None:
+        return None
+    chemin_base = campagne.migrer_vers_sqlite(chemin_base)
+    if chemin_base:
+        marquer_json_remplace(chemin_json)
+    return chemin_base
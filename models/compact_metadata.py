@@ -0,0 +1,129 @@
+"""
+MODEL - Métadonnées compactes des vidéos
+Les clés aplaties des JSON KOSMOS (gpsDict_latitude, hourDict_HMSOS...) sont les
+mêmes pour toutes les vidéos d'une campagne : elles sont enregistrées une seule fois
+dans un schéma partagé, et chaque vidéo ne garde qu'une liste de valeurs indexée
+par le schéma. MetadonneesCompactes s'utilise comme un dict.
+"""
+import sys
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, List
+
+# Les valeurs courtes (vides, 'None', noms de caméra, zones...) se répètent d'une
+# vidéo à l'autre : elles sont internées
+_LONGUEUR_MAX_INTERNEE = 64
+
+
+class _Absent:
+    """Marque une clé du schéma sans valeur pour cette vidéo."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<absent>'
+
+
+_ABSENT = _Absent()
+
+
+class SchemaCles:
+    """Liste de clés partagée, qui ne fait que grandir (position d'une clé = son indice)."""
+
+    __slots__ = ('cles', 'index', '_verrou')
+
+    def __init__(self):
+        self.cles: List[str] = []
+        self.index: Dict[str, int] = {}
+        # Les imports remplissent les métadonnées depuis un pool de threads
+        self._verrou = threading.Lock()
+
+    def indice(self, cle: str) -> int:
+        """Indice de la clé, ajoutée au schéma si elle est nouvelle."""
+        i = self.index.get(cle)
+        if i is None:
+            with self._verrou:
+                i = self.index.get(cle)
+                if i is None:
+                    i = len(self.cles)
+                    self.cles.append(sys.intern(cle))
+                    self.index[self.cles[i]] = i
+        return i
+
+
+# Schémas communs à toutes les vidéos chargées
+SCHEMA_COMMUNES = SchemaCles()
+SCHEMA_PROPRES = SchemaCles()
+
+
+def _interner(valeur):
+    if isinstance(valeur, str) and len(valeur) <= _LONGUEUR_MAX_INTERNEE:
+        return sys.intern(valeur)
+    return valeur
+
+
+class MetadonneesCompactes(MutableMapping):
+    """
+    Dict de métadonnées d'une vidéo stocké comme une liste de valeurs alignée sur un
+    SchemaCles partagé. L'itération suit l'ordre du schéma (ordre de première
+    apparition des clés dans la campagne).
+    """
+
+    __slots__ = ('_schema', '_valeurs', '_nb')
+
+    def __init__(self, schema: SchemaCles, donnees=None):
+        self._schema = schema
+        self._valeurs: list = []
+        self._nb = 0
+        if donnees:
+            self.update(donnees)
+
+    def __getitem__(self, cle):
+        i = self._schema.index.get(cle)
+        if i is None or i >= len(self._valeurs) or self._valeurs[i] is _ABSENT:
+            raise KeyError(cle)
+        return self._valeurs[i]
+
+    def __setitem__(self, cle, valeur):
+        i = self._schema.indice(cle)
+        valeurs = self._valeurs
+        if i >= len(valeurs):
+            valeurs.extend([_ABSENT] * (i + 1 - len(valeurs)))
+        if valeurs[i] is _ABSENT:
+            self._nb += 1
+        valeurs[i] = _interner(valeur)
+
+    def __delitem__(self, cle):
+        i = self._schema.index.get(cle)
+        if i is None or i >= len(self._valeurs) or self._valeurs[i] is _ABSENT:
+            raise KeyError(cle)
+        self._valeurs[i] = _ABSENT
+        self._nb -= 1
+        while self._valeurs and self._valeurs[-1] is _ABSENT:
+            self._valeurs.pop()
+
+    def __iter__(self):
+        cles = self._schema.cles
+        for i, valeur in enumerate(self._valeurs):
+            if valeur is not _ABSENT:
+                yield cles[i]
+
+    def __len__(self):
+        return self._nb
+
+    def __contains__(self, cle):
+        i = self._schema.index.get(cle)
+        return i is not None and i < len(self._valeurs) and self._valeurs[i] is not _ABSENT
+
+    def items(self):
+        cles = self._schema.cles
+        return [(cles[i], valeur) for i, valeur in enumerate(self._valeurs) if valeur is not _ABSENT]
+
+    def clear(self):
+        self._valeurs = []
+        self._nb = 0
+
+    def copy(self) -> dict:
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
@@ -0,0 +1,197 @@
+"""
+MODEL - File d'attente des exports de la page Extraction
+Les tâches en attente sont sauvegardées dans le workspace d'extraction de la campagne
+pour survivre à un redémarrage de l'application.
+"""
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+EN_ATTENTE = 'en_attente'
+EN_COURS = 'en_cours'
+TERMINE = 'termine'
+ERREUR = 'erreur'
+ANNULE = 'annule'
+
+
+class ExportTache:
+    """Un clip à exporter, avec un instantané sérialisé de la chaîne de filtres."""
+
+    def __init__(self, source: str, destination: str, start_ms: int, end_ms: int,
+                 filtres: Optional[List[Dict]] = None, type_export: str = 'recording',
+                 persistante: bool = True, sorties: Optional[List[Dict]] = None,
+                 resume: Optional[Dict] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.source = str(source)
+        self.destination = str(destination)
+        self.start_ms = int(start_ms)
+        self.end_ms = int(end_ms)
+        self.filtres = filtres or []
+        self.type_export = type_export
+        # Sorties multiples (export_multi) : liste de spécifications avec leur chemin
+        self.sorties = sorties or []
+        # Résumé d'activité (export_activity_summary) : ses paramètres, None pour un export complet
+        self.resume = resume
+        # Les tâches interactives (aperçu de short) ne sont pas reprises au redémarrage
+        self.persistante = persistante
+        self.statut = EN_ATTENTE
+        self.message = ""
+        self.date_creation = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @property
+    def nom(self) -> str:
+        return Path(self.destination).name
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'source': self.source,
+            'destination': self.destination,
+            'start_ms': self.start_ms,
+            'end_ms': self.end_ms,
+            'filtres': self.filtres,
+            'type_export': self.type_export,
+            'sorties': self.sorties,
+            'resume': self.resume,
+            'statut': self.statut,
+            'message': self.message,
+            'date_creation': self.date_creation
+        }
+
+    @staticmethod
+    def from_dict(data: Dict) -> 'ExportTache':
+        tache = ExportTache(
+            data.get('source', ''),
+            data.get('destination', ''),
+            data.get('start_ms', 0),
+            data.get('end_ms', 0),
+            data.get('filtres', []),
+            data.get('type_export', 'recording'),
+            sorties=data.get('sorties', []),
+            resume=data.get('resume')
+        )
+        tache.id = data.get('id', tache.id)
+        tache.statut = data.get('statut', EN_ATTENTE)
+        tache.message = data.get('message', '')
+        tache.date_creation = data.get('date_creation', tache.date_creation)
+        return tache
+
+
+class ExportQueue:
+    """
+    File d'exports d'une campagne.
+    - max_concurrent : nombre d'exports lancés simultanément.
+    - Seules les tâches persistantes non terminées sont sauvegardées.
+    """
+
+    FICHIER = "export_queue.json"
+
+    def __init__(self, dossier: Optional[str] = None, max_concurrent: int = 2):
+        self.dossier = dossier
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.taches: List[ExportTache] = []
+
+    @property
+    def chemin_fichier(self) -> Optional[str]:
+        if not self.dossier:
+            return None
+        return os.path.join(self.dossier, self.FICHIER)
+
+    # ───────────────────────────────────────────────────────────────
+    # Gestion des tâches
+    # ───────────────────────────────────────────────────────────────
+
+    def ajouter(self, tache: ExportTache) -> ExportTache:
+        self.taches.append(tache)
+        self.sauvegarder()
+        return tache
+
+    def obtenir(self, tache_id: str) -> Optional[ExportTache]:
+        for tache in self.taches:
+            if tache.id == tache_id:
+                return tache
+        return None
+
+    def en_attente(self) -> List[ExportTache]:
+        return [t for t in self.taches if t.statut == EN_ATTENTE]
+
+    def en_cours(self) -> List[ExportTache]:
+        return [t for t in self.taches if t.statut == EN_COURS]
+
+    def prochaines(self) -> List[ExportTache]:
+        """Tâches à démarrer maintenant pour respecter max_concurrent."""
+        places = self.max_concurrent - len(self.en_cours())
+        return self.en_attente()[:max(0, places)]
+
+    def marquer(self, tache_id: str, statut: str, message: str = ""):
+        tache = self.obtenir(tache_id)
+        if tache is None:
+            return
+        tache.statut = statut
+        tache.message = message
+        self.sauvegarder()
+
+    def annuler_en_attente(self) -> int:
+        """Annule toutes les tâches pas encore démarrées. Retourne leur nombre."""
+        taches = self.en_attente()
+        for tache in taches:
+            tache.statut = ANNULE
+        self.sauvegarder()
+        return len(taches)
+
+    def purger(self):
+        """Retire de la file les tâches terminées, en erreur ou annulées."""
+        self.taches = [t for t in self.taches if t.statut in (EN_ATTENTE, EN_COURS)]
+
+    # ───────────────────────────────────────────────────────────────
+    # Persistance
+    # ───────────────────────────────────────────────────────────────
+
+    def sauvegarder(self) -> bool:
+        """Écrit les tâches persistantes en attente ou en cours dans le workspace."""
+        chemin = self.chemin_fichier
+        if not chemin:
+            return False
+        data = {
+            'max_concurrent': self.max_concurrent,
+            'taches': [
+                t.to_dict() for t in self.taches
+                if t.persistante and t.statut in (EN_ATTENTE, EN_COURS)
+            ]
+        }
+        try:
+            Path(self.dossier).mkdir(parents=True, exist_ok=True)
+            with open(chemin, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            return True
+        except OSError as e:
+            print(f"❌ Erreur sauvegarde de la file d'export : {e}")
+            return False
+
+    @staticmethod
+    def charger(dossier: str) -> 'ExportQueue':
+        """
+        Charge la file d'un workspace. Les tâches interrompues (en cours lors de la
+        fermeture) repassent en attente ; leur fichier partiel sera réécrit.
+        """
+        queue = ExportQueue(dossier)
+        chemin = queue.chemin_fichier
+        if not chemin or not os.path.exists(chemin):
+            return queue
+        try:
+            with open(chemin, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ File d'export illisible ({chemin}): {e}")
+            return queue
+
+        queue.max_concurrent = max(1, int(data.get('max_concurrent', queue.max_concurrent)))
+        for item in data.get('taches', []):
+            tache = ExportTache.from_dict(item)
+            if tache.statut == EN_COURS:
+                tache.statut = EN_ATTENTE
+            queue.taches.append(tache)
+        return queue
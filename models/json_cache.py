@@ -0,0 +1,73 @@
+"""
+MODEL - Cache des JSON de station (<dossier>.json)
+Le même fichier est lu à l'import (heure de début), puis à chaque sélection d'une
+vidéo (métadonnées propres et communes). Le cache garde le contenu analysé, associé
+à la date de modification et à la taille du fichier : un simple stat suffit pour
+savoir s'il faut relire. Partagé par tout le processus (imports en pool compris).
+"""
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Nombre de fichiers gardés (quelques Ko chacun) ; les moins récemment lus sortent
+CACHE_JSON_TAILLE = 512
+
+
+class CacheJSON:
+    """Contenu analysé des fichiers JSON, invalidé par (mtime_ns, taille)."""
+
+    def __init__(self, taille_max: int = CACHE_JSON_TAILLE):
+        self.taille_max = taille_max
+        self._entrees: OrderedDict = OrderedDict()
+        self._verrou = threading.Lock()
+        self.lectures = 0 # Analyses effectives (hors cache), pour le diagnostic
+
+    def lire(self, chemin, copie: bool = False):
+        """
+        Contenu du JSON, ou None si le fichier n'existe pas. Lève ValueError si le
+        JSON est invalide. Le résultat est partagé : demander copie=True pour le modifier.
+        """
+        chemin = os.path.abspath(str(chemin))
+        try:
+            stat = os.stat(chemin)
+        except OSError:
+            self.oublier(chemin)
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._verrou:
+            entree = self._entrees.get(chemin)
+            if entree is not None and entree[0] == signature:
+                self._entrees.move_to_end(chemin)
+                data = entree[1]
+            else:
+                data = None
+        if data is None:
+            with open(chemin, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._verrou:
+                self.lectures += 1
+                self._entrees[chemin] = (signature, data)
+                self._entrees.move_to_end(chemin)
+                while len(self._entrees) > self.taille_max:
+                    self._entrees.popitem(last=False)
+        return copy.deepcopy(data) if copie else data
+
+    def oublier(self, chemin):
+        """Retire un fichier du cache (après l'avoir réécrit)."""
+        with self._verrou:
+            self._entrees.pop(os.path.abspath(str(chemin)), None)
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+
+CACHE_JSON = CacheJSON()
+
+
+def lire_json(chemin, copie: bool = False) -> Optional[dict]:
+    """Lecture d'un JSON de station via le cache du processus (voir CacheJSON.lire)."""
+    return CACHE_JSON.lire(chemin, copie=copie)
@@ -0,0 +1,171 @@
+"""
+MODEL - Séries temporelles des capteurs KOSMOS (pression, température, lux)
+Stockage en colonnes NumPy avec recherche dichotomique par position vidéo.
+"""
+import csv
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def _hms_to_seconds(hms_str: Optional[str]) -> Optional[int]:
+    """Convertit une chaîne 'HHhMMmSSs' en secondes totales."""
+    try:
+        parts = hms_str.lower().replace('s', '').split('h')
+        h = int(parts[0])
+        parts = parts[1].split('m')
+        m = int(parts[0])
+        s = int(parts[1])
+        return h * 3600 + m * 60 + s
+    except (AttributeError, ValueError, IndexError):
+        return None
+
+
+class TimeseriesData:
+    """
+    Série temporelle en colonnes : un tableau `time_ms` trié et un tableau float64
+    par grandeur. Les valeurs absentes du CSV sont stockées en NaN.
+    La recherche d'un point coûte O(log n) quel que soit le sens du déplacement.
+    """
+
+    # Nom standard -> nom de colonne dans le CSV KOSMOS
+    COLUMNS = {
+        'pression': 'Pression',
+        'temperature': 'TempC',
+        'lux': 'Lux',
+    }
+
+    def __init__(self, time_ms=None, columns: Optional[Dict[str, Iterable[float]]] = None):
+        self.time_ms = np.asarray(time_ms if time_ms is not None else [], dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {}
+        for name in self.COLUMNS:
+            values = (columns or {}).get(name)
+            if values is None:
+                values = np.full(self.time_ms.shape, np.nan)
+            self.columns[name] = np.asarray(values, dtype=np.float64)
+
+        # Garantir l'ordre chronologique exigé par searchsorted
+        if self.time_ms.size > 1 and np.any(np.diff(self.time_ms) < 0):
+            order = np.argsort(self.time_ms, kind='stable')
+            self.time_ms = self.time_ms[order]
+            self.columns = {name: values[order] for name, values in self.columns.items()}
+
+    def __len__(self) -> int:
+        return int(self.time_ms.size)
+
+    def __bool__(self) -> bool:
+        return self.time_ms.size > 0
+
+    @property
+    def pression(self) -> np.ndarray:
+        return self.columns['pression']
+
+    @property
+    def temperature(self) -> np.ndarray:
+        return self.columns['temperature']
+
+    @property
+    def lux(self) -> np.ndarray:
+        return self.columns['lux']
+
+    # ───────────────────────────────────────────────────────────────
+    # Construction
+    # ───────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_csv(cls, csv_path) -> Optional['TimeseriesData']:
+        """
+        Lit le CSV KOSMOS d'une station. Les temps sont relatifs à la première ligne
+        (colonne HMS). Retourne None si l'heure de début est illisible ou le CSV vide.
+        """
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            # Détecter le délimiteur en lisant la première ligne
+            first_line = f.readline()
+            delimiter = ';' if ';' in first_line else ','
+            f.seek(0)
+            reader = csv.DictReader(f, delimiter=delimiter)
+
+            times: List[int] = []
+            values: Dict[str, List[float]] = {name: [] for name in cls.COLUMNS}
+            start_total_seconds = None
+
+            for row in reader:
+                current_total_seconds = _hms_to_seconds(row.get('HMS'))
+                if start_total_seconds is None:
+                    if current_total_seconds is None:
+                        print("❌ Erreur: Impossible de lire l'heure de début (colonne HMS) dans le CSV.")
+                        return None
+                    start_total_seconds = current_total_seconds
+                if current_total_seconds is None:
+                    continue
+
+                times.append((current_total_seconds - start_total_seconds) * 1000)
+                for standard_name, csv_name in cls.COLUMNS.items():
+                    raw = row.get(csv_name)
+                    try:
+                        values[standard_name].append(float(raw.strip().replace(',', '.')))
+                    except (AttributeError, ValueError):
+                        values[standard_name].append(np.nan)
+
+        if start_total_seconds is None:
+            return None
+        return cls(times, values)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'TimeseriesData':
+        """Construit la série depuis l'ancien format (liste de dicts avec 'timestamp_ms')."""
+        records = [r for r in records if 'timestamp_ms' in r]
+        values = {}
+        for name in cls.COLUMNS:
+            column = []
+            for record in records:
+                try:
+                    column.append(float(str(record[name]).replace(',', '.')))
+                except (KeyError, ValueError):
+                    column.append(np.nan)
+            values[name] = column
+        return cls([r['timestamp_ms'] for r in records], values)
+
+    def to_records(self) -> List[Dict]:
+        """Export au format liste de dicts (valeurs absentes omises)."""
+        records = []
+        for i, t in enumerate(self.time_ms.tolist()):
+            record = {'timestamp_ms': t}
+            for name, values in self.columns.items():
+                if not np.isnan(values[i]):
+                    record[name] = float(values[i])
+            records.append(record)
+        return records
+
+    # ───────────────────────────────────────────────────────────────
+    # Recherche
+    # ───────────────────────────────────────────────────────────────
+
+    def index_at(self, position_ms: float) -> int:
+        """Index du dernier point dont le temps est <= position_ms (0 avant le début, -1 si vide)."""
+        if not self.time_ms.size:
+            return -1
+        idx = int(np.searchsorted(self.time_ms, position_ms, side='right')) - 1
+        return max(0, idx)
+
+    def value_at(self, name: str, position_ms: float, interpolate: bool = False) -> float:
+        """Valeur d'une grandeur à une position (NaN si inconnue)."""
+        values = self.columns[name]
+        if not self.time_ms.size:
+            return float('nan')
+        if interpolate:
+            valid = ~np.isnan(values)
+            if not valid.any():
+                return float('nan')
+            return float(np.interp(position_ms, self.time_ms[valid], values[valid]))
+        return float(values[self.index_at(position_ms)])
+
+    def sample_at(self, position_ms: float, interpolate: bool = False) -> Dict[str, float]:
+        """Toutes les grandeurs connues à une position donnée."""
+        sample = {}
+        for name in self.COLUMNS:
+            value = self.value_at(name, position_ms, interpolate)
+            if not np.isnan(value):
+                sample[name] = value
+        return sample
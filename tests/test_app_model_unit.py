@@ -1,7 +1,8 @@
 import csv
 from pathlib import Path
 
-from models.app_model import ApplicationModel, Video
+from models.app_model import ApplicationModel, Campagne, Video
+from models.export_queue import EN_ATTENTE, EN_COURS, TERMINE, ExportQueue, ExportTache
 
 
 def _hms(seconds: int) -> str:
@@ -100,3 +101,182 @@ def test_selectionner_video_updates_selection_flags(tmp_path: Path):
     assert video_a.est_selectionnee is False
     assert video_b.est_selectionnee is True
     assert model.video_selectionnee is video_b
+
+
+def test_charger_donnees_timeseries_csv_builds_columnar_store(tmp_path: Path):
+    dossier = tmp_path / "0001"
+    dossier.mkdir()
+    (dossier / "0001.csv").write_text(
+        "HMS;Pression;TempC;Lux\n"
+        "10h00m00s;1,5;14.0;100\n"
+        "10h00m02s;1,7;;120\n"
+        "10h00m04s;1,9;15.0;140\n",
+        encoding="utf-8",
+    )
+    video = Video("0001.mp4", str(dossier / "0001.mp4"), "0001")
+
+    assert video.charger_donnees_timeseries_csv() is True
+    data = video.timeseries_data
+    assert len(data) == 3
+    assert data.time_ms.tolist() == [0, 2000, 4000]
+    assert data.pression.tolist() == [1.5, 1.7, 1.9]
+
+    # Recherche indépendante du sens de déplacement
+    assert data.sample_at(4500) == {"pression": 1.9, "temperature": 15.0, "lux": 140.0}
+    assert data.sample_at(2100) == {"pression": 1.7, "lux": 120.0}
+    assert data.sample_at(-500)["lux"] == 100.0
+    assert data.value_at("temperature", 2000, interpolate=True) == 14.5
+    assert data.value_at("lux", 1000, interpolate=True) == 110.0
+
+
+def test_obtenir_videos_station_groups_videos_of_same_folder(tmp_path: Path):
+    model = ApplicationModel()
+    campagne = model.creer_campagne("Stereo", str(tmp_path))
+
+    gauche = Video("0122_R.mp4", str(tmp_path / "0122" / "0122_R.mp4"), "0122")
+    droite = Video("0122_L.mp4", str(tmp_path / "0122" / "0122_L.mp4"), "0122")
+    autre = Video("0123.mp4", str(tmp_path / "0123" / "0123.mp4"), "0123")
+    for video in (gauche, droite, autre):
+        campagne.ajouter_video(video)
+
+    assert model.obtenir_videos_station("0122_R.mp4") == [droite, gauche]
+    assert model.obtenir_videos_station("0123.mp4") == [autre]
+    assert model.obtenir_videos_station("absente.mp4") == []
+
+
+def test_obtenir_flux_stereo_requires_kstereo_marker_and_derives_offsets(tmp_path: Path):
+    model = ApplicationModel()
+    campagne = model.creer_campagne("Stereo", str(tmp_path))
+    stereo = tmp_path / "250821_Kstereo" / "0122"
+    mono = tmp_path / "250822_K" / "0007"
+    gauche = Video("0122_L.mp4", str(stereo / "0122_L.mp4"), "0122")
+    droite = Video("0122_R.mp4", str(stereo / "0122_R.mp4"), "0122")
+    gauche.start_time_str, droite.start_time_str = "10:00:00", "10:00:01.5"
+    brute = Video("0007.mp4", str(mono / "0007.mp4"), "0007")
+    rushes = Video("0007_bis.mp4", str(mono / "0007_bis.mp4"), "0007")
+    for video in (gauche, droite, brute, rushes):
+        campagne.ajouter_video(video)
+
+    # Plusieurs vidéos dans une station non marquée : lecture simple
+    assert model.obtenir_flux_stereo("0007.mp4") == []
+    station = model.obtenir_flux_stereo("0122_R.mp4")
+    assert station == [gauche, droite]
+    assert model.decalages_flux(station) == [0, -1500]
+
+    droite.start_time_str = "inconnue"
+    assert model.decalages_flux(station) == [0, 0]
+
+
+def test_campagne_index_follows_renames_and_bulk_operations(tmp_path: Path):
+    model = ApplicationModel()
+    campagne = model.creer_campagne("Tri", str(tmp_path))
+    videos = [Video(f"{i:04d}.mp4", str(tmp_path / f"{i:04d}" / f"{i:04d}.mp4"), f"{i:04d}") for i in range(6)]
+    campagne.ajouter_videos(videos)
+
+    assert model.renommer_video("0002.mp4", "raie.mp4")
+    assert campagne.obtenir_video("0002.mp4") is None
+    assert campagne.obtenir_video("raie.mp4") is videos[2]
+    assert campagne.obtenir_video_par_chemin(videos[2].chemin) is videos[2]
+
+    assert model.marquer_videos_pour_suppression(["0001.mp4", "raie.mp4", "0004.mp4", "absente.mp4"]) == 3
+    assert model.conserver_videos(["0004.mp4"]) == 1
+    assert model.obtenir_statistiques()["a_supprimer"] == 2
+    assert campagne.obtenir_videos_a_supprimer() == [videos[1], videos[2]]
+    assert model.modifier_metadonnees_propres_videos(["0000.mp4", "0003.mp4"], {"zone": "Nord"}) == 2
+    assert videos[3].metadata_propres == {"zone": "Nord"}
+
+    assert model.supprimer_videos_marquees() == 2
+    assert [v.nom for v in campagne.videos] == ["0000.mp4", "0003.mp4", "0004.mp4", "0005.mp4"]
+    assert model.obtenir_statistiques()["total"] == 4 and campagne.nb_conservees == 4
+    assert campagne.obtenir_video("raie.mp4") is None
+
+    # Rechargement : l'index est reconstruit, le tri conservé
+    videos[5].est_conservee = False
+    reprise = Campagne.from_dict(campagne.to_dict())
+    assert reprise.nb_a_supprimer == 1 and reprise.obtenir_video("0005.mp4").est_conservee is False
+
+
+def test_video_metadata_share_key_schema_and_keep_dict_api(tmp_path: Path):
+    videos = [Video(f"{i:04d}.mp4", str(tmp_path / f"{i:04d}.mp4"), f"{i:04d}") for i in range(2)]
+    for i, video in enumerate(videos):
+        video.metadata_propres.update({"gpsDict_latitude": f"-21.{i}", "hourDict_HMSOS": "10h00m00s"})
+    videos[1].metadata_propres["stationDict_profondeur"] = "12"
+
+    assert not hasattr(videos[0], "__dict__")
+    assert videos[0].metadata_propres == {"gpsDict_latitude": "-21.0", "hourDict_HMSOS": "10h00m00s"}
+    assert "stationDict_profondeur" not in videos[0].metadata_propres
+    assert videos[0].metadata_propres.get("stationDict_profondeur", "N/A") == "N/A"
+    # Clés et valeurs répétées stockées une seule fois
+    cle_0 = next(iter(videos[0].metadata_propres))
+    assert cle_0 is next(iter(videos[1].metadata_propres))
+    assert videos[0].metadata_propres["hourDict_HMSOS"] is videos[1].metadata_propres["hourDict_HMSOS"]
+
+    del videos[1].metadata_propres["stationDict_profondeur"]
+    videos[1].metadata_propres = {"analyseDict_espece": "Mérou"}
+    assert dict(videos[1].metadata_propres) == {"analyseDict_espece": "Mérou"}
+    assert Video.from_dict(videos[0].to_dict()).metadata_propres == videos[0].metadata_propres
+
+    # Données capteurs : série vide tant que le CSV n'est pas chargé, libérable ensuite
+    (tmp_path / "0000.csv").write_text("HMS,Pression\n10h00m00s,1.5\n10h00m02s,1.7\n", encoding="utf-8")
+    assert not videos[0].timeseries_data
+    assert videos[0].charger_donnees_timeseries_csv() and len(videos[0].timeseries_data) == 2
+    campagne = Campagne("Memoire", str(tmp_path))
+    campagne.ajouter_videos(videos)
+    assert campagne.liberer_donnees_lourdes(sauf=[videos[1]]) == 1
+    assert not videos[0].timeseries_data
+
+
+def test_station_json_is_parsed_once_for_both_metadata_sets(tmp_path: Path):
+    import json
+    import os
+
+    from models.json_cache import CACHE_JSON
+
+    json_path = tmp_path / "0001.json"
+    json_path.write_text(json.dumps({
+        "system": {"camera": "GoPro"},
+        "campaign": {"zoneDict": {"zone": "Lagon"}},
+        "video": {"gpsDict": {"latitude": -21.1}, "hourDict": {"HMSOS": "10:00:00"}},
+    }), encoding="utf-8")
+    video = Video("0001.mp4", str(tmp_path / "0001.mp4"), "0001")
+
+    avant = CACHE_JSON.lectures
+    for _ in range(3):
+        assert video.charger_metadonnees_json()
+    assert video.charger_metadonnees_propres_json() and video.charger_metadonnees_communes_json()
+    assert CACHE_JSON.lectures == avant + 1
+    assert video.metadata_propres["gpsDict_latitude"] == "-21.1"
+    assert video.metadata_communes == {"system_camera": "GoPro", "campaign_zoneDict_zone": "Lagon"}
+
+    # Une modification du fichier (ou une sauvegarde) invalide l'entrée
+    video.metadata_propres["gpsDict_latitude"] = "-21.5"
+    assert video.sauvegarder_metadonnees_propres_json()
+    assert video.charger_metadonnees_json() and video.metadata_propres["gpsDict_latitude"] == "-21.5"
+    json_path.write_text(json.dumps({"video": {"gpsDict": {"latitude": -22.0}}}), encoding="utf-8")
+    os.utime(json_path, ns=(1, 1))
+    assert video.charger_metadonnees_json() and video.metadata_propres["gpsDict_latitude"] == "-22.0"
+    assert CACHE_JSON.lectures == avant + 3
+
+
+def test_export_queue_limits_concurrency_and_survives_restart(tmp_path: Path):
+    queue = ExportQueue(str(tmp_path), max_concurrent=2)
+    filtres = [{"nom": "gamma", "fonction": "apply_gamma", "kwargs": {"gamma": 1.2}}]
+    taches = [
+        queue.ajouter(ExportTache("src.mp4", tmp_path / f"clip{i}.mp4", 0, 1000 * (i + 1), filtres))
+        for i in range(3)
+    ]
+    queue.ajouter(ExportTache("src.mp4", tmp_path / "short.mp4", 0, 500, persistante=False))
+
+    assert queue.prochaines() == taches[:2]
+    for tache in queue.prochaines():
+        queue.marquer(tache.id, EN_COURS)
+    assert queue.prochaines() == []
+    queue.marquer(taches[0].id, TERMINE)
+    assert queue.prochaines() == [taches[2]]
+
+    # Redémarrage : la tâche interrompue repart en attente, la terminée et le short sont oubliés
+    reprise = ExportQueue.charger(str(tmp_path))
+    assert reprise.max_concurrent == 2
+    assert [t.id for t in reprise.taches] == [taches[1].id, taches[2].id]
+    assert all(t.statut == EN_ATTENTE for t in reprise.taches)
+    assert reprise.taches[1].end_ms == 3000 and reprise.taches[1].filtres == filtres
@@ -2,7 +2,10 @@ import csv
 import json
 from pathlib import Path
 
-from models.app_model import ApplicationModel
+import cv2
+import numpy as np
+
+from models.app_model import ApplicationModel, Video
 
 
 def _time_str(seconds: int) -> str:
@@ -58,3 +61,279 @@ def test_importer_and_seek_times_pipeline(tmp_path: Path):
     expected_events = [37, 40, 43, 46, 49, 52]  # 10e START MOTEUR et les 5 suivants
     expected = [(_time_str(event + 5 - 10), 30) for event in expected_events]
     assert seek_times == expected
+
+
+def test_import_analyses_folders_in_parallel_and_streams_results(tmp_path: Path):
+    import threading
+
+    for numero in ["0010", "0002", "0001"]:
+        dossier = tmp_path / numero
+        dossier.mkdir()
+        (dossier / f"{numero}.mp4").write_bytes(b"\x00\x00")
+        if numero != "0002":
+            (dossier / f"{numero}.csv").write_text("system;camera\nKOSMOS;CAM\n", encoding="utf-8")
+
+    model = ApplicationModel()
+    model.creer_campagne("Test", str(tmp_path))
+    recues, progression = [], []
+    resultats = model.importer_videos_kosmos(
+        str(tmp_path), workers=3,
+        progress_cb=lambda done, total: progression.append((done, total)),
+        video_cb=lambda video, avec_metadata: recues.append((video.nom, avec_metadata)),
+    )
+
+    assert sorted(recues) == [("0001.mp4", True), ("0002.mp4", False), ("0010.mp4", True)]
+    assert progression[-1] == (3, 3)
+    # Campagne dans l'ordre des stations, quel que soit l'ordre d'arrivée
+    assert [v.nom for v in model.campagne_courante.videos] == ["0001.mp4", "0002.mp4", "0010.mp4"]
+    assert resultats["videos_importees"] == ["0001.mp4", "0010.mp4"]
+    assert resultats["videos_sans_metadata"] == ["0002.mp4"] and not resultats["annule"]
+
+    # Annulation : rien n'est commencé, la campagne n'est pas modifiée
+    annulation = threading.Event()
+    annulation.set()
+    autre = ApplicationModel()
+    autre.creer_campagne("Test", str(tmp_path))
+    resultats = autre.importer_videos_kosmos(str(tmp_path), workers=1, cancel_event=annulation)
+    assert resultats["annule"] and autre.campagne_courante.videos == []
+
+
+def test_import_analysis_leaves_campaign_untouched_until_applied(tmp_path: Path):
+    for numero in ["0001", "0002"]:
+        dossier = tmp_path / numero
+        dossier.mkdir()
+        (dossier / f"{numero}.mp4").write_bytes(b"\x00\x00")
+
+    model = ApplicationModel()
+    campagne = model.creer_campagne("Test", str(tmp_path / "ailleurs"))
+    analyse = model.analyser_import_kosmos(str(tmp_path), workers=2)
+
+    # Thread de travail : ni vidéos, ni empreintes, ni emplacement modifiés
+    assert [v.nom for v, _ in analyse["videos"]] == ["0001.mp4", "0002.mp4"]
+    assert campagne.videos == [] and campagne.empreintes_dossiers == {}
+    assert campagne.emplacement == str(tmp_path / "ailleurs")
+
+    resultats = model.appliquer_import_kosmos(analyse)
+    assert [v.nom for v in campagne.videos] == ["0001.mp4", "0002.mp4"]
+    assert campagne.obtenir_video_par_chemin(str(tmp_path / "0002" / "0002.mp4")) is not None
+    assert set(campagne.empreintes_dossiers) == {str(tmp_path / "0001"), str(tmp_path / "0002")}
+    assert campagne.emplacement == str(tmp_path)
+    assert resultats["videos_sans_metadata"] == ["0001.mp4", "0002.mp4"]
+
+
+def test_reimport_skips_unchanged_folders_and_updates_in_place(tmp_path: Path, monkeypatch):
+    import os
+
+    for numero in ["0001", "0002"]:
+        dossier = tmp_path / numero
+        dossier.mkdir()
+        (dossier / f"{numero}.mp4").write_bytes(b"\x00\x00")
+        (dossier / f"{numero}.csv").write_text("system;camera\nKOSMOS;CAM\n", encoding="utf-8")
+
+    model = ApplicationModel()
+    model.creer_campagne("Test", str(tmp_path))
+    model.importer_videos_kosmos(str(tmp_path))
+    video = model.campagne_courante.obtenir_video("0001.mp4")
+    video.metadata_propres["site"] = "Récif"  # modification utilisateur, à conserver
+
+    # Nouveau téléchargement : une station modifiée, une ajoutée, une supprimée
+    (tmp_path / "0001" / "0001.csv").write_text("system;camera\nKOSMOS-2;CAM\n", encoding="utf-8")
+    os.utime(tmp_path / "0001" / "0001.csv", ns=(1, 10 ** 18))
+    (tmp_path / "0002" / "0002.mp4").unlink()
+    (tmp_path / "0003").mkdir()
+    (tmp_path / "0003" / "0003.mp4").write_bytes(b"\x00\x00")
+    analyses = []
+    original = model._analyser_dossier_kosmos
+    monkeypatch.setattr(model, "_analyser_dossier_kosmos",
+                        lambda chemin, nom, *args: analyses.append(nom) or original(chemin, nom, *args))
+
+    resultats = model.importer_videos_kosmos(str(tmp_path))
+
+    assert sorted(analyses) == ["0001", "0002", "0003"]
+    assert resultats["videos_mises_a_jour"] == ["0001.mp4"]
+    assert resultats["videos_supprimees"] == ["0002.mp4"]
+    assert [v.nom for v in model.campagne_courante.videos] == ["0001.mp4", "0003.mp4"]
+    assert model.campagne_courante.obtenir_video("0001.mp4") is video
+    assert video.metadata_communes["system"] == "KOSMOS-2" and video.metadata_propres["site"] == "Récif"
+
+    # Rien n'a changé : aucun dossier relu, aucun doublon
+    analyses.clear()
+    resultats = model.importer_videos_kosmos(str(tmp_path))
+    assert analyses == [] and sorted(resultats["videos_inchangees"]) == ["0001.mp4", "0003.mp4"]
+    assert len(model.campagne_courante.videos) == 2
+
+
+def test_campagne_json_migrates_to_sqlite_and_writes_incrementally(tmp_path: Path):
+    import sqlite3
+
+    from models.campaign_store import migrer_campagne_json
+
+    model = ApplicationModel()
+    campagne = model.creer_campagne("Lagon", str(tmp_path))
+    for i in range(5):
+        video = Video(f"{i:04d}.mp4", str(tmp_path / f"{i:04d}" / f"{i:04d}.mp4"), f"{i:04d}", duree="00:01:00")
+        video.metadata_communes["system"] = "KOSMOS"
+        video.metadata_propres["zone"] = "Nord" if i % 2 else "Sud"
+        campagne.ajouter_video(video)
+    campagne.empreintes_dossiers[str(tmp_path / "0000")] = {"0000.mp4": [10, 20]}
+    assert campagne.sauvegarder()
+
+    base = migrer_campagne_json(str(tmp_path / "Lagon_config.json"))
+    assert base == str(tmp_path / "Lagon_campagne.sqlite")
+    # Le JSON est gardé mais marqué comme remplacé : l'ouverture ne le retrouve plus
+    assert not (tmp_path / "Lagon_config.json").exists()
+    assert (tmp_path / "Lagon_config.json.migre").exists()
+    assert model.ouvrir_campagne(base)
+    ouverte = model.campagne_courante
+    assert [v.nom for v in ouverte.videos] == [f"{i:04d}.mp4" for i in range(5)]
+    assert ouverte.obtenir_video("0003.mp4").metadata_communes["system"] == "KOSMOS"
+    assert ouverte.empreintes_dossiers == campagne.empreintes_dossiers
+    assert [v.nom for v in ouverte.rechercher_videos("zone", "Nord")] == ["0001.mp4", "0003.mp4"]
+
+    # Chaque modification est écrite aussitôt, sans sauvegarde explicite
+    assert model.renommer_video("0001.mp4", "raie.mp4")
+    assert model.modifier_metadonnees_propres("0002.mp4", {"zone": "Est"})
+    assert model.marquer_video_pour_suppression("0004.mp4")
+    assert model.supprimer_videos_marquees() == 1
+    lecteur = sqlite3.connect(base)
+    assert [n for (n,) in lecteur.execute("SELECT nom FROM videos ORDER BY id")] == \
+        ["0000.mp4", "raie.mp4", "0002.mp4", "0003.mp4"]
+    assert lecteur.execute(
+        "SELECT valeur FROM metadonnees m JOIN videos v ON v.id = m.video_id "
+        "WHERE v.nom = '0002.mp4' AND m.champ = 'zone'"
+    ).fetchone() == ("Est",)
+    lecteur.close()
+    model.fermer_campagne()
+
+    assert model.ouvrir_campagne(base)
+    reprise = model.campagne_courante
+    assert [v.nom for v in reprise.videos] == ["0000.mp4", "raie.mp4", "0002.mp4", "0003.mp4"]
+    assert reprise.obtenir_video("0002.mp4").metadata_propres == {"zone": "Est"}
+    assert [v.nom for v in reprise.rechercher_videos("zone", "Nord")] == ["raie.mp4", "0003.mp4"]
+    model.fermer_campagne()
+
+
+def test_sqlite_rollback_leaves_new_videos_unsaved_and_common_fields_write_alone(tmp_path: Path):
+    import sqlite3
+
+    model = ApplicationModel()
+    campagne = model.creer_campagne("Recif", str(tmp_path))
+    for i in range(3):
+        video = Video(f"{i:04d}.mp4", str(tmp_path / f"{i:04d}.mp4"), f"{i:04d}")
+        video.metadata_propres["zone"] = "Sud"
+        campagne.ajouter_video(video)
+    assert campagne.migrer_vers_sqlite()
+
+    # Une valeur non sérialisable fait échouer la transaction après les INSERT
+    nouvelle = Video("0003.mp4", str(tmp_path / "0003.mp4"), "0003")
+    autre = Video("0004.mp4", str(tmp_path / "0004.mp4"), "0004")
+    autre.metadata_propres["zone"] = object()
+    campagne.ajouter_video(nouvelle)
+    campagne.ajouter_video(autre)
+    assert not campagne.enregistrer_modifications()
+    assert nouvelle._id_stockage is None and autre._id_stockage is None
+
+    autre.metadata_propres["zone"] = "Nord"
+    assert campagne.enregistrer_modifications()
+    assert nouvelle._id_stockage is not None
+
+    # Propagation : seuls les champs communs donnés sont écrits
+    lecteur = sqlite3.connect(campagne.stockage.chemin)
+    lecteur.execute("UPDATE metadonnees SET valeur = 'Ouest' WHERE champ = 'zone'")
+    lecteur.commit()
+    for video in campagne.videos:
+        video.metadata_communes["system"] = "KOSMOS"
+    assert campagne.enregistrer_metadonnees_communes({"system": "KOSMOS"})
+    assert lecteur.execute("SELECT COUNT(*) FROM metadonnees WHERE champ = 'system'").fetchone() == (5,)
+    assert {v for (v,) in lecteur.execute("SELECT valeur FROM metadonnees WHERE champ = 'zone'")} == {"Ouest"}
+    lecteur.close()
+    campagne.stockage.fermer()
+
+
+def test_open_campaign_defers_missing_durations_and_saves_them(tmp_path: Path, monkeypatch):
+    import cv2
+    import numpy as np
+
+    import models.app_model as app_model
+
+    chemins = []
+    for i in range(3):
+        chemin = tmp_path / f"{i:04d}" / f"{i:04d}.mp4"
+        chemin.parent.mkdir()
+        writer = cv2.VideoWriter(str(chemin), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+        for _ in range(20 + 10 * i):
+            writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+        writer.release()
+        chemins.append(str(chemin))
+
+    model = ApplicationModel()
+    campagne = model.creer_campagne("Durees", str(tmp_path))
+    for i, chemin in enumerate(chemins):
+        campagne.ajouter_video(Video(Path(chemin).name, chemin, f"{i:04d}", duree="--:--" if i else ""))
+    campagne.ajouter_video(Video("connue.mp4", str(tmp_path / "connue.mp4"), "0009", duree="00:10:00"))
+    campagne.sauvegarder()
+
+    # L'ouverture ne lit aucune vidéo
+    lectures = []
+    monkeypatch.setattr(app_model, "probe_media", lambda chemin: lectures.append(chemin) or {})
+    assert model.ouvrir_campagne(str(tmp_path / "Durees_config.json"))
+    assert lectures == []
+    monkeypatch.undo()
+
+    manquantes = [v.chemin for v in model.campagne_courante.obtenir_videos_sans_duree()]
+    assert manquantes == chemins
+    recues = []
+    durees = model.resoudre_durees(manquantes, workers=2, duree_cb=lambda c, d: recues.append(c))
+    assert sorted(recues) == chemins
+    assert durees == {chemins[0]: "00:00:02", chemins[1]: "00:00:03", chemins[2]: "00:00:04"}
+    for chemin, duree in durees.items():
+        model.appliquer_duree(chemin, duree)
+    model.sauvegarder_campagne()
+
+    assert model.ouvrir_campagne(str(tmp_path / "Durees_config.json"))
+    assert model.campagne_courante.obtenir_videos_sans_duree() == []
+    assert model.campagne_courante.obtenir_video("0001.mp4").duree == "00:00:03"
+
+
+def _write_numbered_video(path: Path, frames: int):
+    """Vidéo MJPG à 10 fps dont la frame i a la valeur i * 10."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+
+
+def test_stereo_streams_are_paired_by_start_time_offset(tmp_path: Path):
+    from components.lecteur import _StreamDecoder
+
+    station = tmp_path / "250821_Kstereo" / "0122"
+    _write_numbered_video(station / "0122_L.mp4", 20)
+    _write_numbered_video(station / "0122_R.mp4", 20)
+    (station / "0122.json").write_text(json.dumps({"video": {"hourDict": {"HMSOS": "10:00:00"}}}), encoding="utf-8")
+
+    model = ApplicationModel()
+    model.creer_campagne("Stereo", str(tmp_path))
+    model.importer_videos_kosmos(str(tmp_path / "250821_Kstereo"))
+    flux = model.obtenir_flux_stereo("0122_L.mp4")
+    assert [v.nom for v in flux] == ["0122_L.mp4", "0122_R.mp4"]
+    # La caméra droite a démarré 1 s après la gauche
+    flux[1].start_time_str = "10:00:01"
+    decalages = model.decalages_flux(flux)
+    assert decalages == [0, -1000]
+
+    decodeurs = [_StreamDecoder(v.chemin, d) for v, d in zip(flux, decalages)]
+    try:
+        assert all(d.open() for d in decodeurs)
+        position_ms = 1500  # frame 15 de la référence
+        valeurs = [float(d.seek(position_ms + d.offset_ms).mean()) for d in decodeurs]
+        assert abs(valeurs[0] - 150) < 3
+        assert abs(valeurs[1] - 50) < 3
+        # Avant le démarrage de la droite, seule la référence a une image
+        assert decodeurs[1].advance_to(500 + decodeurs[1].offset_ms) is None
+        valeurs = [float(d.advance_to(1800 + d.offset_ms).mean()) for d in decodeurs]
+        assert abs(valeurs[0] - 180) < 3
+        assert abs(valeurs[1] - 80) < 3
+    finally:
+        for d in decodeurs:
+            d.release()
@@ -1,7 +1,24 @@
+import json
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
 import numpy as np
 import cv2
+import pytest
 
+from kosmos_processing import activity_summary
 from kosmos_processing import algos_correction as ac
+from kosmos_processing import export as export_module
+from kosmos_processing.decoders import OpenCVDecoder, open_decoder, scaled_size
+from kosmos_processing.capture_writer import CaptureWriter
+from kosmos_processing.frame_cache import GopFrameCache
+from kosmos_processing import frame_extraction
+from kosmos_processing.preview_buffer import PreviewBuffer
+from kosmos_processing import probe
+from kosmos_processing import storyboard
 
 
 def test_dehaze_and_denoise_pipeline_runs_end_to_end():
@@ -69,3 +86,605 @@ def test_motion_detection_pipeline_detects_moving_object():
     for detection in detections:
         x, y, w, h = detection["bbox"]
         assert w > 0 and h > 0
+
+
+def test_compute_histograms_subsamples_large_frames():
+    frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+    frame[:, :, 2] = 200  # rouge uniforme
+    frame[:, :, 0] = 10   # bleu uniforme
+
+    r_hist, g_hist, b_hist, density_hist = ac.compute_histograms(frame, max_side=320)
+
+    for hist in (r_hist, g_hist, b_hist, density_hist):
+        assert isinstance(hist, np.ndarray)
+        assert hist.shape == (256,)
+        assert hist.dtype == np.float32
+    # 3840 / 320 => un pixel sur 12 dans chaque direction
+    assert r_hist.sum() == (2160 // 12) * (3840 // 12)
+    assert r_hist[200] == r_hist.sum()
+    assert b_hist[10] == b_hist.sum()
+    assert g_hist[0] == g_hist.sum()
+
+
+class _FakeCapture:
+    """Décodeur factice : frame n remplie avec la valeur n, compte les seeks."""
+
+    def __init__(self, total_frames, shape=(40, 60, 3)):
+        self.total_frames = total_frames
+        self.shape = shape
+        self.position = 0
+        self.seeks = 0
+
+    def seek_frame(self, index):
+        self.position = int(index)
+        self.seeks += 1
+
+    def read(self):
+        if self.position >= self.total_frames:
+            return False, None
+        frame = np.full(self.shape, self.position, dtype=np.uint8)
+        self.position += 1
+        return True, frame
+
+
+def test_gop_frame_cache_serves_backward_steps_from_one_decode():
+    cap = _FakeCapture(total_frames=100)
+    cache = GopFrameCache(block_size=16)
+
+    frame = cache.fill_block(cap, 45, total_frames=100)
+    assert frame[0, 0, 0] == 45
+    assert cap.seeks == 1
+
+    # Reculer dans le bloc [32, 48) ne demande plus aucun décodage
+    for index in range(44, 31, -1):
+        assert cache.get(index)[0, 0, 0] == index
+    assert cap.seeks == 1
+    assert cache.get(31) is None
+
+
+def test_gop_frame_cache_is_bounded_and_downscales():
+    frame_bytes = 40 * 60 * 3
+    cache = GopFrameCache(max_bytes=frame_bytes * 20, block_size=8)
+    cap = _FakeCapture(total_frames=100)
+    cache.fill_block(cap, 3)
+    cache.fill_block(cap, 10)
+    cache.fill_block(cap, 20)
+
+    assert len(cache) == 20
+    assert cache.nbytes <= frame_bytes * 20
+    assert 0 not in cache and 23 in cache  # LRU : les plus anciennes sont évincées
+
+    small = GopFrameCache(block_size=4, max_side=30)
+    assert small.fill_block(_FakeCapture(total_frames=4), 2).shape == (20, 30, 3)
+
+
+def test_gop_frame_cache_shrinks_blocks_of_large_frames_to_fit_the_budget():
+    # Budget de 5 frames "4K" réduites : un bloc de 32 s'évincerait lui-même
+    shape = (216, 384, 3)
+    frame_bytes = shape[0] * shape[1] * shape[2]
+    cache = GopFrameCache(max_bytes=frame_bytes * 5, block_size=32)
+    cache.set_frame_size(shape[1], shape[0])
+    assert cache.effective_block_size == 2
+
+    cap = _FakeCapture(total_frames=100, shape=shape)
+    assert cache.fill_block(cap, 41)[0, 0, 0] == 41
+    # Tout le bloc reste en mémoire : reculer dedans ne redécode rien
+    assert cache.get(40)[0, 0, 0] == 40
+    assert cap.seeks == 1
+    assert cache.nbytes <= frame_bytes * 5
+
+
+def _write_test_video(path, frames=12, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+
+def test_scaled_size_keeps_ratio_and_even_dimensions():
+    assert scaled_size(3840, 2160, max_side=320) == (320, 180)
+    assert scaled_size(1920, 1080, size=(-1, 101)) == (178, 100)
+    assert scaled_size(640, 480) == (640, 480)
+
+
+@pytest.mark.parametrize("aide, attendu", [
+    ("-vsync  deprecated, use -fps_mode\n-fps_mode  set framerate mode", ("-fps_mode", "passthrough")),
+    ("-vsync  set video sync method", ("-vsync", "passthrough")),
+    ("", ("-vsync", "passthrough")),
+])
+def test_passthrough_args_prefers_fps_mode_and_falls_back_to_vsync(monkeypatch, aide, attendu):
+    from kosmos_processing import decoders
+
+    monkeypatch.setattr(decoders.subprocess, "run", lambda *a, **k: subprocess.CompletedProcess(a, 0, stdout=aide))
+    decoders.passthrough_args.cache_clear()
+    try:
+        assert decoders.passthrough_args() == attendu
+    finally:
+        decoders.passthrough_args.cache_clear()
+
+
+def test_opencv_decoder_applies_stride_scale_and_pixel_format(tmp_path):
+    video_path = tmp_path / "clip.avi"
+    _write_test_video(video_path)
+
+    with open_decoder(video_path, backend="opencv", max_side=32, pix_fmt="gray", stride=3) as decoder:
+        assert isinstance(decoder, OpenCVDecoder)
+        assert decoder.frame_count == 12 and (decoder.width, decoder.height) == (64, 48)
+        frames = []
+        while True:
+            ret, frame = decoder.read()
+            if not ret:
+                break
+            frames.append(frame)
+
+    assert len(frames) == 4
+    assert frames[0].shape == (24, 32)
+    # Une frame sur trois : niveaux 40, 100, 160, 220 (MJPG reste proche)
+    assert [int(round(f.mean() / 20)) for f in frames] == [2, 5, 8, 11]
+
+
+# Remplace ffmpeg par un petit script Python qui recopie stdin dans le fichier de sortie
+_FAKE_ENCODER = "import sys\nwith open(sys.argv[1], 'wb') as f:\n    f.write(sys.stdin.buffer.read())\n"
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    real_popen = subprocess.Popen
+
+    def popen(cmd, **kwargs):
+        return real_popen([sys.executable, "-c", _FAKE_ENCODER, cmd[-1]], **kwargs)
+
+    monkeypatch.setattr(export_module.subprocess, "Popen", popen)
+
+
+def test_export_reports_progress_until_completion(tmp_path, fake_ffmpeg):
+    video_path = tmp_path / "clip.avi"
+    _write_test_video(video_path, frames=20)
+    output = tmp_path / "out.mp4"
+    reports = []
+
+    export_module.export_video_with_filters(
+        video_path, output, 0, 1500,
+        filters={"invert": (lambda frame: 255 - frame, {})},
+        progress_cb=lambda *args: reports.append(args),
+    )
+
+    done, total, fps, eta = reports[-1]
+    assert done == total == 15
+    assert fps > 0 and eta == 0
+    assert output.stat().st_size == 15 * 64 * 48 * 3
+
+
+def test_export_pipe_can_send_yuv420p_and_reports_throughput(tmp_path, fake_ffmpeg):
+    video_path = tmp_path / "clip.avi"
+    _write_test_video(video_path, frames=20)
+    output = tmp_path / "out.mp4"
+
+    stats = export_module.export_video_with_filters(video_path, output, 0, 1500, pipe_pix_fmt="yuv420p")
+
+    # 12 bits par pixel : moitié du volume bgr24
+    frame_bytes = 64 * 48 * 3 // 2
+    assert output.stat().st_size == 15 * frame_bytes
+    assert stats["frames"] == 15 and stats["pipe_octets"] == 15 * frame_bytes
+    assert stats["pipe_pix_fmt"] == "yuv420p" and stats["pipe_mo_s"] > 0
+    # Deuxième frame (niveau 20), décodée depuis le plan I420
+    raw = np.frombuffer(output.read_bytes()[frame_bytes:2 * frame_bytes], dtype=np.uint8).reshape(72, 64)
+    bgr = cv2.cvtColor(raw, cv2.COLOR_YUV2BGR_I420)
+    assert abs(bgr.mean() - 20) < 6
+
+
+def test_export_cancellation_removes_partial_file(tmp_path, fake_ffmpeg):
+    video_path = tmp_path / "clip.avi"
+    _write_test_video(video_path, frames=20)
+    output = tmp_path / "out.mp4"
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(export_module.ExportAnnule):
+        export_module.export_video_with_filters(video_path, output, 0, 1500, cancel_event=cancel)
+    assert not output.exists()
+
+
+def test_export_feeds_preview_buffer_while_encoding_once(tmp_path, fake_ffmpeg):
+    video_path = tmp_path / "clip.avi"
+    _write_test_video(video_path, frames=20)
+    output = tmp_path / "short.mp4"
+    preview = PreviewBuffer(fps=10, speed=2, max_side=32, total_frames=15)
+
+    export_module.export_video(
+        video_path, output, 0, 1500,
+        filters={"invert": (lambda frame: 255 - frame, {})},
+        frame_cb=preview.push,
+    )
+
+    # Un seul encodage (15 frames pleine résolution) ; aperçu x2 réduit, déjà filtré et en RGB
+    assert output.stat().st_size == 15 * 64 * 48 * 3
+    assert preview.received == 15 and len(preview) == 8
+    assert preview.get(0).shape == (24, 32, 3)
+    assert preview.get(0).mean() > 200
+    assert preview.get(8) is None
+
+
+def test_preview_buffer_is_a_bounded_ring():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    preview = PreviewBuffer(speed=1, max_side=None, max_bytes=3 * frame.nbytes)
+    for level in range(5):
+        preview.push(frame + level)
+
+    assert len(preview) == 3
+    assert [int(preview.get(i).mean()) for i in range(3)] == [2, 3, 4]
+    assert not preview.complete
+    preview.finish()
+    assert preview.complete
+
+
+def test_multi_output_export_decodes_once_for_every_output(tmp_path, fake_ffmpeg, monkeypatch):
+    video_path = tmp_path / "clip.avi"
+    _write_test_video(video_path, frames=20)
+    calls = []
+    invert = lambda frame: calls.append(1) or 255 - frame
+    sorties = export_module.resoudre_sorties([
+        {"type": "video"},
+        {"type": "video", "suffixe": "_small", "hauteur": 24},
+        {"type": "images", "suffixe": "_images", "intervalle_s": 0.5, "extension": ".png"},
+        {"type": "planche", "suffixe": "_planche", "intervalle_s": 0.5, "colonnes": 2, "largeur_vignette": 32},
+    ], tmp_path / "out.mp4")
+
+    stats = export_module.export_multi(video_path, sorties, 0, 1500, {"invert": (invert, {})})
+
+    assert len(calls) == 15 # Filtres appliqués une seule fois par frame
+    assert (tmp_path / "out.mp4").stat().st_size == 15 * 64 * 48 * 3
+    assert (tmp_path / "out_small.mp4").stat().st_size == 15 * 32 * 24 * 3
+    images = sorted((tmp_path / "out_images").iterdir())
+    assert [p.name for p in images] == ["frame_000000.png", "frame_000005.png", "frame_000010.png"]
+    assert cv2.imread(str(images[1])).mean() > 130 # 255 - 100 : frame filtrée
+    sheet = cv2.imread(str(tmp_path / "out_planche.jpg"))
+    assert sheet.shape == (2 * 24, 2 * 32, 3)
+    assert len(stats["fichiers"]) == 2 + 3 + 1
+
+
+def test_filter_chain_snapshot_round_trips_through_json():
+    lut = np.arange(256, dtype=np.uint8)[::-1]
+    filters = {
+        "gamma": (ac.UnderwaterFilters.apply_gamma, {"gamma": 1.2}),
+        "curve": (ac.UnderwaterFilters.apply_lut, {"lut": lut}),
+    }
+    data = export_module.filtres_vers_json(filters)
+    restored = export_module.filtres_depuis_json(json.loads(json.dumps(data)))
+
+    assert list(restored) == ["gamma", "curve"]
+    frame = np.random.default_rng(1).integers(0, 255, (8, 8, 3), dtype=np.uint8)
+    for name, (func, kwargs) in filters.items():
+        restored_func, restored_kwargs = restored[name]
+        assert np.array_equal(func(frame, **kwargs), restored_func(frame, **restored_kwargs))
+    assert set(export_module.filtres_preset("Correction couleur")) == {"gamma", "blue_correction", "contrast"}
+
+
+def test_plan_segments_snaps_boundaries_to_keyframes():
+    assert export_module.plan_segments(0, 100, 4, min_frames=150) == [(0, 100)]
+    assert export_module.plan_segments(10, 600, 3, min_frames=100) == [(10, 200), (210, 200), (410, 200)]
+
+    keyframes = [0, 96, 192, 288, 384, 480]
+    segments = export_module.plan_segments(0, 600, 3, keyframes, min_frames=100)
+    assert segments == [(0, 192), (192, 192), (384, 216)]
+    assert sum(count for _, count in segments) == 600
+
+
+def test_segment_parts_feed_encoder_same_filtered_frames_as_serial_export(tmp_path, fake_ffmpeg):
+    # fake_ffmpeg écrit les frames brutes reçues : on compare l'entrée des encodeurs,
+    # pas le flux encodé (qui diffère aux raccords entre parties)
+    import queue
+
+    video_path = tmp_path / "clip.avi"
+    _write_test_video(video_path, frames=12)
+    filters = {"gamma": (ac.UnderwaterFilters.apply_gamma, {"gamma": 1.5})}
+
+    serial = tmp_path / "serial.raw"
+    export_module.export_video_with_filters(video_path, serial, 0, 1200, filters)
+
+    progress, stop = queue.Queue(), threading.Event()
+    parts = []
+    for index, (first, count) in enumerate(export_module.plan_segments(0, 12, 3, min_frames=4)):
+        part = tmp_path / f"part{index}.raw"
+        assert export_module._export_segment(
+            str(video_path), str(part), first, count,
+            export_module.filtres_vers_json(filters), index, progress, stop
+        ) == count
+        parts.append(part.read_bytes())
+
+    assert b"".join(parts) == serial.read_bytes()
+
+
+def test_concurrent_segment_exports_share_one_process_budget(monkeypatch):
+    budget = export_module._SegmentBudget(4)
+    monkeypatch.setattr(export_module, "_segment_budget", budget)
+    lock = threading.Lock()
+    en_cours, pic, recus = [0], [0], []
+    liberer = threading.Event()
+
+    def fake_segments(source, output, start_ms, end_ms, filters, workers, *args):
+        with lock:
+            recus.append(workers)
+            en_cours[0] += workers
+            pic[0] = max(pic[0], en_cours[0])
+        liberer.wait(5)
+        with lock:
+            en_cours[0] -= workers
+
+    monkeypatch.setattr(export_module, "_export_video_segments", fake_segments)
+    threads = [
+        threading.Thread(target=export_module.export_video_segments, args=("a", "b", 0, 1000, {}, 3))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while len(recus) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # 3 + 1 processus : le troisième export attend qu'une réservation soit rendue
+    assert sorted(recus) == [1, 3]
+    liberer.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(recus) == 3 and pic[0] <= 4
+    assert budget._libres == 4
+
+    # Annulation pendant l'attente d'un processus libre
+    budget.reserver(4)
+    annule = threading.Event()
+    annule.set()
+    with pytest.raises(export_module.ExportAnnule):
+        export_module.export_video_segments("a", "b", 0, 1000, {}, 2, cancel_event=annule)
+
+
+def test_plan_smart_cut_only_reencodes_partial_gops():
+    keyframes = [0, 50, 100, 150, 200]
+    # Coupe entre deux keyframes : bords réencodés, milieu copié
+    assert export_module.plan_smart_cut(30, 150, keyframes) == [
+        ("encode", 30, 20), ("copy", 50, 100), ("encode", 150, 30)
+    ]
+    # Coupe alignée : copie intégrale
+    assert export_module.plan_smart_cut(50, 100, keyframes) == [("copy", 50, 100)]
+    # Extrait plus court qu'un GOP ou keyframes inconnues : réencodage complet
+    assert export_module.plan_smart_cut(110, 30, keyframes) == [("encode", 110, 30)]
+    assert export_module.plan_smart_cut(0, 300, []) == [("encode", 0, 300)]
+
+
+def _read_all_frames(path):
+    cap = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def _h264_keyframe_nal_types(path):
+    """Types des NAL de chaque paquet keyframe (échantillons MP4 préfixés par leur longueur)."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_packets", "-show_data",
+         "-show_entries", "packet=flags,data", "-of", "json", str(path)],
+        capture_output=True, text=True, check=True
+    )
+    types = []
+    for packet in json.loads(result.stdout)["packets"]:
+        if "K" not in packet["flags"]:
+            continue
+        data = bytes.fromhex("".join(
+            "".join(line.split(":", 1)[1].split("  ")[0].split()) for line in packet["data"].strip().splitlines()
+        ))
+        nals, pos = [], 0
+        while pos + 4 < len(data):
+            size = int.from_bytes(data[pos:pos + 4], "big")
+            nals.append(data[pos + 4] & 0x1F)
+            pos += 4 + size
+        types.append(nals)
+    return types
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+                    reason="ffmpeg/ffprobe requis")
+def test_smart_cut_output_decodes_every_frame_with_in_band_parameter_sets(tmp_path):
+    # Source « caméra » : profil baseline (CAVLC), incompatible avec les SPS/PPS de x264 en CRF
+    source = tmp_path / "camera.mp4"
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc2=size=320x240:rate=25:duration=8",
+         "-c:v", "libx264", "-profile:v", "baseline",
+         "-x264-params", "keyint=50:min-keyint=50:scenecut=0", str(source)],
+        check=True
+    )
+    output = tmp_path / "coupe.mp4"
+    # Coupe hors keyframes : bord réencodé + GOP copié + bord réencodé
+    export_module.export_stream_copy(source, output, 1300, 5700)
+
+    first_frame, frame_count = export_module._frame_range(25, 1300, 5700)
+    decoded = _read_all_frames(output)
+    assert len(decoded) == frame_count
+    reference = _read_all_frames(source)[first_frame:first_frame + frame_count]
+    ecarts = [np.abs(a.astype(np.int16) - b.astype(np.int16)).mean() for a, b in zip(decoded, reference)]
+    assert max(ecarts) < 3
+
+    # Chaque keyframe (bords x264 comme milieu copié) porte ses propres SPS (7) et PPS (8)
+    keyframes = _h264_keyframe_nal_types(output)
+    assert len(keyframes) == 3
+    assert all(7 in nals and 8 in nals for nals in keyframes)
+
+    # Sans compter sur le concat demuxer : chaque partie est autonome
+    stream = {"codec_name": "h264", "pix_fmt": "yuv420p"}
+    for mode, part_first in (("copy", 50), ("encode", 100)):
+        part = tmp_path / f"{mode}.mp4"
+        subprocess.run(export_module._smart_cut_part_cmd(source, part, mode, part_first, 10, 25, stream),
+                       check=True, capture_output=True)
+        assert all(7 in nals and 8 in nals for nals in _h264_keyframe_nal_types(part))
+
+
+def test_sampling_plan_parsing_and_timestamps():
+    assert frame_extraction.parse_sampling_plan("2,5") == (2.5, [])
+    assert frame_extraction.parse_sampling_plan("0:30; 1:02:03 90.5") == (None, [30000, 3723000, 90500])
+    with pytest.raises(ValueError):
+        frame_extraction.parse_sampling_plan("abc")
+    assert frame_extraction.plan_timestamps(2000, every_s=0.5, timestamps_ms=[1500, 250, 5000]) == [0, 250, 500, 1000, 1500]
+
+
+def test_dataset_extraction_writes_images_and_manifest(tmp_path):
+    import csv
+
+    video_path = tmp_path / "0113.avi"
+    _write_test_video(video_path, frames=20)
+    sources = [{"nom": "0113.avi", "chemin": str(video_path), "capteurs": lambda t: {"temperature": t / 100.0}}]
+
+    manifest = frame_extraction.extract_dataset(
+        sources, tmp_path / "dataset", timestamps_ms=[1500, 200, 900], image_ext=".png", workers=2,
+        filters={"invert": (lambda frame: 255 - frame, {})},
+    )
+
+    with open(manifest, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f, delimiter=";"))
+    assert [r["timestamp_ms"] for r in rows] == ["200", "900", "1500"]
+    assert rows[1]["fichier"] == "0113_000000900ms.png" and rows[1]["temperature"] == "9.0"
+    # Frame 9 (niveau 180) inversée par le filtre
+    image = cv2.imread(str(tmp_path / "dataset" / rows[1]["fichier"]))
+    assert abs(image.mean() - (255 - 180)) < 8
+
+
+def test_frame_sink_records_unexpected_errors_without_blocking_producer():
+    class _Casse(export_module._FrameSink):
+        def handle(self, index, frame):
+            raise TypeError("filtre invalide")
+
+    sink = _Casse(maxsize=1)
+    for i in range(20): # Bien plus que la taille de la file
+        sink.put(np.zeros((4, 4, 3), dtype=np.uint8), i)
+    sink.close()
+    assert isinstance(sink.error, TypeError)
+
+    # Consommateur arrêté : put et close rendent la main et signalent l'erreur
+    sink = _Casse(maxsize=1)
+    sink.close()
+    for i in range(5):
+        sink.put(None, i)
+    sink.close()
+    assert isinstance(sink.error, RuntimeError)
+
+
+def test_capture_writer_writes_formats_in_background_with_sidecar(tmp_path):
+    frame16 = np.full((40, 60, 3), 40000, dtype=np.uint16)
+    frame8 = np.full((40, 60, 3), 120, dtype=np.uint8)
+    writer = CaptureWriter(png_compression=1, quality=80)
+    try:
+        png = writer.submit(frame16, tmp_path / "éponge" / "capture.png", {"timestamp_ms": 1500}).result()
+        jpg = writer.submit(frame16, tmp_path / "capture.jpg").result()
+        webp = writer.submit(frame8, tmp_path / "capture.webp").result()
+    finally:
+        writer.shutdown()
+
+    # PNG 16 bits conservé tel quel ; JPEG réduit à 8 bits
+    assert cv2.imread(str(png), cv2.IMREAD_UNCHANGED).dtype == np.uint16
+    assert abs(cv2.imread(str(jpg)).mean() - 40000 / 256) < 3
+    assert abs(cv2.imread(str(webp)).mean() - 120) < 3
+    sidecar = json.loads(png.with_suffix(".json").read_text(encoding="utf-8"))
+    assert sidecar["timestamp_ms"] == 1500 and sidecar["profondeur_bits"] == 16
+    assert (sidecar["largeur"], sidecar["hauteur"], sidecar["fichier"]) == (60, 40, "capture.png")
+    assert not jpg.with_suffix(".json").exists()
+
+
+def test_storyboards_decode_each_video_once_and_index_the_sprite(tmp_path, monkeypatch):
+    monkeypatch.setattr("kosmos_processing.decoders.ffmpeg_available", lambda: False)
+    videos = [tmp_path / "0113.avi", tmp_path / "0114.avi"]
+    for path in videos:
+        _write_test_video(path, frames=20)
+
+    results = storyboard.generate_storyboards(videos, tmp_path / "sb", workers=2, tiles=4, columns=3, tile_width=32)
+
+    paths = results[str(videos[0])]
+    index = json.loads(paths["index"].read_text(encoding="utf-8"))
+    assert (index["largeur"], index["colonnes"], index["duree_ms"]) == (32, 3, 2000)
+    # Vignettes réparties sur la durée (pas de 5 frames, dernière frame de chaque pas avec OpenCV)
+    assert [v["timestamp_ms"] for v in index["vignettes"]] == [400, 900, 1400, 1900]
+    assert (index["vignettes"][3]["x"], index["vignettes"][3]["y"]) == (0, index["hauteur"])
+    sprite = cv2.imread(str(paths["sprite"]))
+    assert sprite.shape[:2] == (2 * index["hauteur"], 3 * 32)
+    # Frame 4 (niveau 80) dans la première vignette du sprite
+    assert abs(sprite[:index["hauteur"], :32].mean() - 80) < 8
+
+    # Storyboard à jour : réutilisé sans relire la vidéo
+    monkeypatch.setattr(storyboard, "open_decoder", lambda *a, **k: pytest.fail("vidéo relue"))
+    assert storyboard.load_storyboard_index(videos[1], tmp_path / "sb")["video"] == "0114.avi"
+    assert storyboard.generate_storyboard(videos[1], tmp_path / "sb") is not None
+
+
+def test_storyboard_files_of_same_stem_videos_do_not_collide(tmp_path):
+    paths_mp4 = storyboard.storyboard_paths(tmp_path / "0113.mp4", tmp_path / "sb")
+    paths_avi = storyboard.storyboard_paths(tmp_path / "0113.avi", tmp_path / "sb")
+    assert not set(paths_mp4.values()) & set(paths_avi.values())
+    assert paths_avi["planche"].name == "0113.avi_storyboard.jpg"
+
+
+def test_activity_summary_keeps_padded_active_passages_in_one_pass(tmp_path, fake_ffmpeg, monkeypatch):
+    video_path = tmp_path / "0113.avi"
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(40):
+        frame = np.full((48, 64, 3), 90, dtype=np.uint8)
+        if 15 <= i < 20: # Sujet qui traverse l'image
+            x = (i - 15) * 8
+            cv2.rectangle(frame, (x, 10), (x + 25, 35), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    embedded = []
+    monkeypatch.setattr(activity_summary, "_inscrire_chapitres", lambda path, chapitres: embedded.append(chapitres))
+    output = tmp_path / "resume.mp4"
+
+    stats = activity_summary.export_activity_summary(
+        video_path, output, filters={"invert": (lambda frame: 255 - frame, {})},
+        pad_before_s=0.3, pad_after_s=0.2, min_area=300,
+    )
+
+    # Frames actives 15 à 19, 3 frames de marge avant et 2 après
+    assert stats["frames_source"] == 40 and stats["frames"] == 10
+    assert output.stat().st_size == 10 * 64 * 48 * 3
+    chapitre = stats["chapitres"][0]
+    assert len(stats["chapitres"]) == 1
+    assert (chapitre["debut_ms"], chapitre["fin_ms"], chapitre["debut_resume_ms"]) == (1200, 2200, 0)
+    assert embedded == [stats["chapitres"]]
+    saved = json.loads(activity_summary.chapters_path(output).read_text(encoding="utf-8"))
+    assert saved["chapitres"] == stats["chapitres"]
+    # Filtres appliqués aux seules frames gardées : fond inversé
+    first = np.frombuffer(output.read_bytes()[:64 * 48 * 3], dtype=np.uint8)
+    assert abs(first.mean() - (255 - 90)) < 8
+
+
+def test_activity_condenser_merges_passages_closer_than_the_padding():
+    condenser = activity_summary.ActivityCondenser(pad_before=2, pad_after=1)
+    actives = {5, 9, 20}
+    kept = [index for i in range(25) for index, _ in condenser.push(i, None, i in actives)]
+    assert kept == [3, 4, 5, 6, 7, 8, 9, 10, 18, 19, 20, 21]
+    assert condenser.segments == [[3, 10], [18, 21]]
+    chapitres = activity_summary.summary_chapters(condenser.segments, fps=10)
+    assert [c["debut_resume_ms"] for c in chapitres] == [0, 800]
+
+
+def test_probe_reads_mp4_metadata_from_the_moov_atom(tmp_path, monkeypatch):
+    video_path = tmp_path / "0113.mp4"
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    # Aucun décodeur ni ffprobe pour un MP4 sain
+    monkeypatch.setattr(probe, "probe_opencv", lambda path: pytest.fail("décodeur ouvert"))
+    monkeypatch.setattr(probe, "probe_ffprobe", lambda path: pytest.fail("ffprobe lancé"))
+
+    info = probe.probe_media(video_path)
+
+    assert info["source"] == "mp4" and not info["corrompu"]
+    assert (info["largeur"], info["hauteur"], info["codec"]) == (64, 48, "mpeg4")
+    assert info["nb_frames"] == 30 and info["fps"] == 10 and info["duree_s"] == pytest.approx(3.0)
+    assert 1 <= info["nb_keyframes"] <= 30
+
+    # Fichier coupé en cours d'écriture : signalé comme corrompu
+    data = video_path.read_bytes()
+    tronque = tmp_path / "0114.mp4"
+    tronque.write_bytes(data[:len(data) - 16])
+    assert probe.probe_mp4(tronque)["corrompu"]
@@ -105,6 +105,16 @@ class AccueilKosmosView(QWidget):
         """Affiche une boîte de dialogue d'erreur"""
         QMessageBox.critical(self, title, message)
 
+    def ask_confirmation(self, title, message):
+        """Demande une confirmation à l'utilisateur"""
+        reponse = QMessageBox.question(
+            self,
+            title,
+            message,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        return reponse == QMessageBox.StandardButton.Yes
+
     def open_new_campaign_dialog(self):
         """Ouvre le dialogue de création de nouvelle campagne"""
         dialogue = FenetreNouvelleCampagne(self)
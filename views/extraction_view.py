@@ -9,7 +9,7 @@ from PyQt6.QtWidgets import QPushButton, QGroupBox, QVBoxLayout
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGridLayout, QMessageBox, QInputDialog
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGridLayout, QMessageBox, QInputDialog, QProgressDialog
 from PyQt6.QtCore import Qt, pyqtSignal
 
 # Import des composants depuis components/
@@ -270,6 +270,18 @@ class ExtractionView(QWidget):
                     self.extraction_tools.short_clicked.connect(
                         self.controller.on_create_short
                     )
+                if hasattr(self.extraction_tools, 'batch_export_clicked'):
+                    self.extraction_tools.batch_export_clicked.connect(
+                        self.controller.on_batch_export
+                    )
+                if hasattr(self.extraction_tools, 'dataset_clicked'):
+                    self.extraction_tools.dataset_clicked.connect(
+                        self.controller.on_extract_dataset
+                    )
+                if hasattr(self.extraction_tools, 'summary_clicked'):
+                    self.extraction_tools.summary_clicked.connect(
+                        self.controller.on_activity_summary
+                    )
                 # if hasattr(self.extraction_tools, 'crop_clicked'):
                 #     self.extraction_tools.crop_clicked.connect(
                 #         self.controller.on_crop
@@ -387,7 +399,9 @@ class ExtractionView(QWidget):
             # Transmettre les données temporelles au lecteur
             if hasattr(self.video_player, 'set_timeseries_data') and 'timeseries_data' in video_data:
                 self.video_player.set_timeseries_data(video_data['timeseries_data'])
-            if hasattr(self.video_player, 'load_video') and 'path' in video_data:
+            if len(video_data.get('stream_paths', [])) > 1 and hasattr(self.video_player, 'load_videos'):
+                self.video_player.load_videos(video_data['stream_paths'], video_data.get('stream_offsets_ms'))
+            elif hasattr(self.video_player, 'load_video') and 'path' in video_data:
                 self.video_player.load_video(video_data['path'])
         
     def update_histogram(self, histogram_data=None):
@@ -466,7 +480,7 @@ class ExtractionView(QWidget):
         capture_name, ok_pressed = QInputDialog.getText(
             self,
             "Nommer la capture",
-            "Entrez le nom de la capture (sans extension) :",
+            "Entrez le nom de la capture\n(extension .png, .jpg ou .webp ; PNG par défaut) :",
         )
         if ok_pressed and capture_name:
             return capture_name
@@ -499,14 +513,161 @@ class ExtractionView(QWidget):
             return selected_duration_str
         return None
 
-    def open_short_preview(self, preview_path):
-        """Ouvre la fenêtre d'aperçu du short."""
-        preview_dialog = ShortPreviewDialog(preview_path, self)
+    def open_short_preview(self, preview):
+        """Ouvre la fenêtre d'aperçu du short (lue depuis le PreviewBuffer de l'export en cours)."""
+        preview_dialog = ShortPreviewDialog(preview, self)
         accepted = preview_dialog.exec()
         if accepted:
             return preview_dialog.get_short_name()
         return None
 
+    def _creer_dialogue_progression(self, titre, fenetre, on_cancel):
+        """Fenêtre de progression non modale (le reste de l'interface reste utilisable)."""
+        dialog = QProgressDialog(titre, "Annuler", 0, 100, self)
+        dialog.setWindowTitle(fenetre)
+        dialog.setWindowModality(Qt.WindowModality.NonModal)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.setMinimumDuration(0)
+        dialog.setValue(0)
+        dialog.canceled.connect(on_cancel)
+        dialog.canceled.connect(lambda: dialog.setLabelText("Annulation en cours..."))
+        dialog.show()
+        return dialog
+
+    def open_export_progress(self, titre, on_cancel):
+        """Affiche la progression des exports."""
+        self.close_export_progress()
+        self.export_progress_dialog = self._creer_dialogue_progression(titre, "Export", on_cancel)
+        self._export_progress_title = titre
+
+    def update_export_progress(self, done, total, fps, eta_s, details=""):
+        """Met à jour la progression des exports (frames, vitesse, temps restant et état de la file)."""
+        dialog = getattr(self, 'export_progress_dialog', None)
+        if dialog is None or dialog.wasCanceled():
+            return
+        dialog.setMaximum(max(total, 1))
+        dialog.setValue(min(done, max(total, 1)))
+        eta_str = f"{int(eta_s // 60):02d}:{int(eta_s % 60):02d}" if eta_s >= 0 else "--:--"
+        lines = [self._export_progress_title, f"{done}/{total} frames — {fps:.1f} fps — reste {eta_str}"]
+        if details:
+            lines.append(details)
+        dialog.setLabelText("\n".join(lines))
+
+    def close_export_progress(self):
+        """Ferme la fenêtre de progression de l'export."""
+        dialog = getattr(self, 'export_progress_dialog', None)
+        if dialog is not None:
+            dialog.canceled.disconnect()
+            dialog.close()
+            dialog.deleteLater()
+        self.export_progress_dialog = None
+
+    def open_dataset_progress(self, on_cancel):
+        """Affiche la progression de l'extraction d'images (indépendante de celle des exports)."""
+        self.close_dataset_progress()
+        self.dataset_progress_dialog = self._creer_dialogue_progression(
+            "Extraction d'images", "Extraction d'images", on_cancel
+        )
+
+    def update_dataset_progress(self, done, total, rate, eta_s):
+        dialog = getattr(self, 'dataset_progress_dialog', None)
+        if dialog is None or dialog.wasCanceled():
+            return
+        dialog.setMaximum(max(total, 1))
+        dialog.setValue(min(done, max(total, 1)))
+        eta_str = f"{int(eta_s // 60):02d}:{int(eta_s % 60):02d}" if eta_s >= 0 else "--:--"
+        dialog.setLabelText(f"Extraction d'images\n{done}/{total} images — {rate:.1f} img/s — reste {eta_str}")
+
+    def close_dataset_progress(self):
+        dialog = getattr(self, 'dataset_progress_dialog', None)
+        if dialog is not None:
+            dialog.canceled.disconnect()
+            dialog.close()
+            dialog.deleteLater()
+        self.dataset_progress_dialog = None
+
+    def ask_dataset_options(self, presets):
+        """
+        Demande le plan d'échantillonnage puis le préréglage de filtres de l'extraction
+        d'images. Retourne (plan, préréglage) ou None si annulé.
+        """
+        plan, ok = QInputDialog.getText(
+            self,
+            "Extraction d'images",
+            "Intervalle en secondes (ex : 5)\nou liste d'instants (ex : 0:30; 1:15; 90) :",
+            text="5"
+        )
+        if not ok or not plan.strip():
+            return None
+        preset, ok = QInputDialog.getItem(
+            self,
+            "Extraction d'images",
+            "Préréglage de filtres appliqué aux images :",
+            presets,
+            0,
+            False
+        )
+        if not ok:
+            return None
+        return plan, preset
+
+    def ask_summary_options(self, presets, pad_before_s, pad_after_s):
+        """
+        Demande les marges (secondes gardées avant et après chaque passage actif) et le
+        préréglage de filtres du résumé d'activité. Retourne (avant, après, préréglage)
+        ou None si annulé.
+        """
+        avant, ok = QInputDialog.getDouble(
+            self, "Résumé d'activité", "Marge avant chaque passage (s) :", pad_before_s, 0.0, 30.0, 1
+        )
+        if not ok:
+            return None
+        apres, ok = QInputDialog.getDouble(
+            self, "Résumé d'activité", "Marge après chaque passage (s) :", pad_after_s, 0.0, 60.0, 1
+        )
+        if not ok:
+            return None
+        preset, ok = QInputDialog.getItem(
+            self,
+            "Résumé d'activité",
+            "Préréglage de filtres appliqué au résumé :",
+            presets,
+            0,
+            False
+        )
+        if not ok:
+            return None
+        return avant, apres, preset
+
+    def ask_export_preset(self, presets):
+        """Demande le préréglage de filtres à utiliser pour l'export par lot."""
+        preset, ok = QInputDialog.getItem(
+            self,
+            "Export par lot",
+            "Exporter toutes les vidéos conservées avec le préréglage :",
+            presets,
+            0,
+            False
+        )
+        if ok:
+            return preset
+        return None
+
+    def ask_output_profile(self, profiles):
+        """Demande les sorties à produire pour chaque vidéo de l'export par lot."""
+        profile, ok = QInputDialog.getItem(
+            self,
+            "Export par lot",
+            "Sorties à produire pour chaque vidéo :",
+            profiles,
+            0,
+            False
+        )
+        if ok:
+            return profile
+        return None
+
     def detach_video_player(self):
         """Détache le lecteur dans une nouvelle fenêtre."""
         if not hasattr(self, 'video_player'):
@@ -11,7 +11,7 @@ sys.path.insert(0, str(project_root))
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame,
-    QMessageBox, QPushButton, QMenu, QFileDialog
+    QMessageBox, QPushButton, QMenu, QFileDialog, QProgressDialog
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QPoint, QTimer
 from PyQt6.QtGui import QFont, QAction, QPalette, QColor
@@ -37,6 +37,7 @@ class ImportationKosmosView(QWidget):
         super().__init__(parent)
         self.controller = controller
         self.auto_open = True
+        self.import_progress_dialog = None
         self.init_ui()
     
     def showEvent(self, event):
@@ -187,6 +188,60 @@ class ImportationKosmosView(QWidget):
         """Affiche une boîte de dialogue d'information"""
         QMessageBox.information(self, title, message)
 
+    def open_import_progress(self, on_cancel):
+        """Affiche la progression de l'importation (la fenêtre reste réactive)."""
+        self.close_import_progress()
+        self._import_stats = {'dossiers': (0, 0), 'videos': 0, 'sans_meta': 0, 'derniere': ""}
+        dialog = QProgressDialog("Analyse des dossiers...", "Annuler", 0, 100, self)
+        dialog.setWindowTitle("Importation")
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.setMinimumDuration(0)
+        dialog.setValue(0)
+        dialog.canceled.connect(on_cancel)
+        dialog.canceled.connect(lambda: dialog.setLabelText("Annulation en cours..."))
+        dialog.show()
+        self.import_progress_dialog = dialog
+
+    def update_import_progress(self, done, total):
+        """Met à jour le nombre de dossiers analysés."""
+        self._import_stats['dossiers'] = (done, total)
+        self._rafraichir_import_progress()
+
+    def add_imported_video(self, nom, avec_metadata):
+        """Vidéo analysée pendant l'importation (reçue au fil de l'eau)."""
+        self._import_stats['videos'] += 1
+        if not avec_metadata:
+            self._import_stats['sans_meta'] += 1
+        self._import_stats['derniere'] = nom
+        self._rafraichir_import_progress()
+
+    def _rafraichir_import_progress(self):
+        dialog = self.import_progress_dialog
+        if dialog is None or dialog.wasCanceled():
+            return
+        done, total = self._import_stats['dossiers']
+        dialog.setMaximum(max(total, 1))
+        dialog.setValue(min(done, max(total, 1)))
+        lines = [
+            f"Dossiers analysés : {done}/{total}",
+            f"📹 Vidéos trouvées : {self._import_stats['videos']} "
+            f"(dont {self._import_stats['sans_meta']} sans métadonnées)",
+        ]
+        if self._import_stats['derniere']:
+            lines.append(f"Dernière : {self._import_stats['derniere']}")
+        dialog.setLabelText("\n".join(lines))
+
+    def close_import_progress(self):
+        """Ferme la fenêtre de progression de l'importation."""
+        dialog = self.import_progress_dialog
+        if dialog is not None:
+            dialog.canceled.disconnect()
+            dialog.close()
+            dialog.deleteLater()
+        self.import_progress_dialog = None
+
     def ask_confirmation(self, title, message):
         """Demande une confirmation à l'utilisateur"""
         reponse = QMessageBox.question(
@@ -164,6 +164,7 @@ class TriKosmosView(QWidget):
         self.video_list.video_selected.connect(self.on_video_selected_from_list)
         self.video_list.rename_requested.connect(self.on_renommer)
         self.video_list.delete_requested.connect(self.on_supprimer)
+        self.video_list.storyboards_requested.connect(self.on_generer_storyboards)
         
         return self.video_list
     
@@ -199,6 +200,10 @@ class TriKosmosView(QWidget):
                 self.controller.succes_operation.connect(self.afficher_succes)
             if hasattr(self.controller, 'erreur_operation'):
                 self.controller.erreur_operation.connect(self.afficher_erreur)
+            if hasattr(self.controller, 'storyboard_pret'):
+                self.controller.storyboard_pret.connect(self.on_storyboard_pret)
+            if hasattr(self.controller, 'duree_resolue'):
+                self.controller.duree_resolue.connect(self.video_list.update_video_duration)
     
     def afficher_succes(self, message):
         QMessageBox.information(self, "Succès", message)
@@ -219,6 +224,9 @@ class TriKosmosView(QWidget):
             if len(videos) > 0:
                 self.video_list.select_first_row()
                 self.controller.selectionner_video(videos[0].nom)
+
+        if hasattr(self.controller, 'lancer_resolution_durees'):
+            self.controller.lancer_resolution_durees()
     
     # Méthodes d'extraction déplacées dans ApercuVideos
 
@@ -233,8 +241,7 @@ class TriKosmosView(QWidget):
         print(f"\n📹 Vidéo sélectionnée : {video.nom}")
         
         if self.controller:
-            self.controller.charger_metadonnees_depuis_json(video)
-            self.controller.charger_metadonnees_communes_depuis_json(video)
+            self.controller.charger_toutes_metadonnees_json(video)
         
         # Utilisation du nouveau composant pour afficher les métadonnées
         self.formulaire_metadata.remplir_communes(video.get_formatted_metadata_communes())
@@ -246,6 +253,22 @@ class TriKosmosView(QWidget):
                 self.apercu_videos.charger_previews(video.chemin, self.current_seek_info)
             except Exception as e:
                 print(f"⚠️ Aperçus vidéo non disponibles: {e}")
+            if hasattr(self.controller, 'chemin_storyboard'):
+                planche = self.controller.chemin_storyboard(video)
+                self.apercu_videos.afficher_storyboard(planche)
+                # Seul le storyboard de la vidéo affichée est généré à la demande
+                if planche is None and hasattr(self.controller, 'lancer_storyboard'):
+                    self.controller.lancer_storyboard(video)
+
+    def on_generer_storyboards(self):
+        """Bouton Storyboards : génération pour toute la campagne."""
+        if self.controller and hasattr(self.controller, 'lancer_storyboards'):
+            self.controller.lancer_storyboards()
+
+    def on_storyboard_pret(self, video_path, planche):
+        """Storyboard généré en arrière-plan : affiché s'il concerne la vidéo sélectionnée."""
+        if self.video_selectionnee and os.path.normpath(self.video_selectionnee.chemin) == os.path.normpath(video_path):
+            self.apercu_videos.afficher_storyboard(planche)
     
     def on_renommer(self):
         if not self.video_selectionnee: